@@ -3,6 +3,9 @@ ASGI config for Zarya project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Поток живых событий (/live/events/) требует ASGI-сервера:
+gunicorn cosmo.asgi:application -k uvicorn.workers.UvicornWorker
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
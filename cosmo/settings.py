@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 import os
 from pathlib import Path
 
+import django
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -68,19 +70,102 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'cosmo.wsgi.application'
+# Поток живых событий (/live/events/) рассчитан на ASGI-сервер:
+# gunicorn cosmo.asgi:application -k uvicorn.workers.UvicornWorker
+ASGI_APPLICATION = 'cosmo.asgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Профиль базы задается окружением: DB_ENGINE=sqlite (по умолчанию) или postgresql
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite').lower()
+
+# Постоянные соединения: сколько секунд держать соединение между запросами.
+# По умолчанию выключены: под ASGI (cosmo.asgi, uvicorn) каждый поток запроса
+# держал бы свое соединение. Включать (например, 60) только под WSGI.
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', '0'))
+
+if DB_ENGINE in ('postgres', 'postgresql'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'cosmo'),
+            'USER': os.environ.get('DB_USER', 'cosmo'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    # Пул соединений psycopg (Django 5.1+, пакет psycopg[pool])
+    if os.environ.get('DB_POOL', '').lower() in ('1', 'true', 'yes'):
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+            'timeout': int(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        }
+        # Пул сам переиспользует соединения, постоянные соединения с ним несовместимы
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                # Ожидание блокировки вместо немедленной ошибки "database is locked"
+                'timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000')) / 1000,
+            },
+        }
     }
+    # Запись сразу берет блокировку (BEGIN IMMEDIATE), чтобы не ловить взаимоблокировку при повышении уровня
+    if django.VERSION >= (5, 1):
+        DATABASES['default']['OPTIONS']['transaction_mode'] = 'IMMEDIATE'
+
+# PRAGMA для каждого нового соединения SQLite (см. weather/database.py).
+# WAL позволяет читать во время записи, synchronous=NORMAL безопасен в режиме WAL.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', '-20000')),  # в КиБ (отрицательное значение)
+    'temp_store': 'MEMORY',
 }
 
 
+# Политика хранения: алерты старше N дней переносятся в архив (manage.py archive_alerts)
+ALERT_RETENTION_DAYS = int(os.environ.get('ALERT_RETENTION_DAYS', '365'))
+
+# Доставка живых событий между воркерами: 'database' (журнал LiveEvent) или 'memory' (один процесс)
+LIVE_EVENTS_BACKEND = os.environ.get('LIVE_EVENTS_BACKEND', 'database')
+
+# Время жизни фрагментов детальной страницы NOAA, сек. Ключи фрагментов включают
+# версию снимка NOAA и версию данных в базе, поэтому загрузка сбрасывает их сразу;
+# 0 — кэширование фрагментов выключено
+NOAA_FRAGMENT_TTL = int(os.environ.get('NOAA_FRAGMENT_TTL', '3600'))
+# Сколько секунд браузер ждет панель детальной страницы (данные NOAA загружает manage.py run_fetchers)
+NOAA_PANEL_TIMEOUT = float(os.environ.get('NOAA_PANEL_TIMEOUT', '8'))
+
+# Очистка базы из админ-панели выполняется в фоновом потоке (прогресс опрашивается страницей)
+ALERT_PURGE_BACKGROUND = True
+
+# Оповещения по подпискам (manage.py run_notifier): адрес сайта для ссылок и почта
+NOTIFY_SITE_URL = os.environ.get('NOTIFY_SITE_URL', 'http://localhost:8000')
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', '25'))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', '') == '1'
+EMAIL_TIMEOUT = 10
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'cosmo@localhost')
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
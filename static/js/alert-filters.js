@@ -0,0 +1,10 @@
+// Фильтры списка алертов: сортировка и фильтрация выполняются на сервере,
+// здесь форма только отправляется сразу после выбора значения
+
+document.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll('form.alert-filters').forEach(form => {
+        form.querySelectorAll('select, input[type="checkbox"]').forEach(control => {
+            control.addEventListener('change', () => form.submit());
+        });
+    });
+});
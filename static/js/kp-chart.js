@@ -0,0 +1,88 @@
+// График индекса Kp в админ-панели: столбцы суточного максимума (цвет — уровень G),
+// линия скользящего максимума за 24 ч и сводка бурь из /api/kp/
+
+const KP_COLORS = ['#198754', '#ffc107', '#fd7e14', '#dc3545', '#b02a37', '#6f42c1'];
+const KP_ROLLING_MAX_DAYS = 90;  // для длинных окон достаточно суточных значений
+
+function kpLevel(kp) {
+    return Math.min(Math.max(Math.floor(kp + 1e-6) - 4, 0), 5);
+}
+
+function drawKpChart(container) {
+    const svg = container.querySelector('svg');
+    const status = container.querySelector('.kp-chart-status');
+    const summary = container.querySelector('.kp-chart-summary');
+    const days = parseInt(container.dataset.days, 10);
+    const width = svg.clientWidth || 800;
+    const height = 160;
+    const fields = ['daily', 'storm_days', 'g_distribution'];
+    if (days <= KP_ROLLING_MAX_DAYS) {
+        fields.push('rolling_max_24h');
+    }
+
+    status.textContent = 'Загрузка...';
+    fetch(`${container.dataset.url}?${new URLSearchParams({days, fields: fields.join(',')})}`)
+        .then(response => response.json())
+        .then(data => {
+            svg.setAttribute('viewBox', `0 0 ${width} ${height}`);
+            svg.innerHTML = '';
+            summary.textContent = '';
+            if (!data.daily || data.daily.time.length === 0) {
+                status.textContent = 'Нет данных Kp за выбранный период';
+                return;
+            }
+
+            const x = t => (t - data.start) / (data.end - data.start) * width;
+            const y = kp => height - 5 - kp / 9 * (height - 10);
+            const barWidth = Math.max(width / days - 1, 1);
+            data.daily.time.forEach((t, i) => {
+                const kp = data.daily.kp_max[i];
+                if (kp === null) {
+                    return;
+                }
+                const bar = document.createElementNS('http://www.w3.org/2000/svg', 'rect');
+                bar.setAttribute('x', x(t));
+                bar.setAttribute('y', y(kp));
+                bar.setAttribute('width', barWidth);
+                bar.setAttribute('height', height - 5 - y(kp));
+                bar.setAttribute('fill', KP_COLORS[kpLevel(kp)]);
+                svg.appendChild(bar);
+            });
+
+            if (data.rolling_max_24h) {
+                const points = data.rolling_max_24h.time
+                    .map((t, i) => [t, data.rolling_max_24h.value[i]])
+                    .filter(([, kp]) => kp !== null)
+                    .map(([t, kp]) => `${x(t)},${y(kp)}`);
+                const line = document.createElementNS('http://www.w3.org/2000/svg', 'polyline');
+                line.setAttribute('points', points.join(' '));
+                line.setAttribute('fill', 'none');
+                line.setAttribute('stroke', '#0d6efd');
+                line.setAttribute('stroke-width', '1.5');
+                line.setAttribute('vector-effect', 'non-scaling-stroke');
+                svg.appendChild(line);
+            }
+
+            const storms = data.storm_days;
+            const levels = [1, 2, 3, 4, 5].filter(level => storms[`G${level}`]).map(level => `G${level}: ${storms[`G${level}`]}`);
+            status.textContent = `${data.samples} трехчасовых значений, ${data.daily.time.length} суток`;
+            summary.textContent = `Суток с бурей: ${storms.total}${levels.length ? ` (${levels.join(', ')})` : ''} · `
+                + 'Доля интервалов: ' + Object.entries(data.g_distribution)
+                    .map(([level, value]) => `${level} ${(value.share * 100).toFixed(1)}%`).join(', ');
+        })
+        .catch(() => { status.textContent = 'Не удалось загрузить данные Kp'; });
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll('.kp-chart').forEach(container => {
+        const card = container.closest('.card');
+        card.querySelectorAll('[data-kp-days]').forEach(button => {
+            button.addEventListener('click', () => {
+                container.dataset.days = button.dataset.kpDays;
+                button.parentElement.querySelectorAll('.btn').forEach(b => b.classList.toggle('active', b === button));
+                drawKpChart(container);
+            });
+        });
+        drawKpChart(container);
+    });
+});
@@ -0,0 +1,76 @@
+// Живые обновления страницы NOAA: новые алерты и смена шкал R/S/G из /live/events/ (SSE)
+
+const SCALE_NAMES = ['R', 'S', 'G'];
+
+function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text == null ? '' : String(text);
+    return div.innerHTML;
+}
+
+function severityBadge(severity) {
+    if (severity >= 4) return 'bg-danger';
+    if (severity >= 3) return 'bg-warning';
+    if (severity >= 2) return 'bg-info';
+    if (severity >= 1) return 'bg-success';
+    return 'bg-secondary';
+}
+
+function formatIssueTime(value) {
+    const date = new Date(value);
+    if (isNaN(date)) return '';
+    const pad = number => String(number).padStart(2, '0');
+    return `${pad(date.getUTCDate())}.${pad(date.getUTCMonth() + 1)}.${date.getUTCFullYear()} `
+        + `${pad(date.getUTCHours())}:${pad(date.getUTCMinutes())} UTC`;
+}
+
+function prependAlert(alert) {
+    const container = document.getElementById('liveAlerts');
+    const tbody = container && container.querySelector('tbody');
+    if (!tbody || container.dataset.firstPage !== '1' || tbody.querySelector(`[data-alert="${alert.id}"]`)) {
+        return;
+    }
+    const summary = (alert.summary || '').split(/\s+/).slice(0, 8).join(' ');
+    const row = document.createElement('tr');
+    row.className = 'table-warning live-new';
+    row.dataset.alert = alert.id;
+    row.innerHTML = `
+        <td><span class="badge bg-primary">${escapeHtml(alert.message_code)}-${escapeHtml(alert.serial_number)}</span></td>
+        <td><span class="badge ${alert.noaa_scale ? severityBadge(alert.severity) : 'bg-secondary'}">${escapeHtml(alert.noaa_scale || 'НЕТ')}</span></td>
+        <td>${summary ? `<small>${escapeHtml(summary)}</small>` : '<small class="text-muted">НЕТ</small>'}</td>
+        <td><small>${formatIssueTime(alert.issue_time)}</small></td>
+        <td><a href="${escapeHtml(alert.url)}" class="btn btn-sm btn-outline-secondary"><i class="fas fa-info-circle"></i> Подробнее</a></td>`;
+    tbody.prepend(row);
+}
+
+function updateScales(scales) {
+    SCALE_NAMES.forEach(name => {
+        const box = document.querySelector(`[data-scale="${name}"]`);
+        if (!box) return;
+        const level = parseInt(scales[name], 10) || 0;
+        box.classList.remove('level-0', 'level-1', 'level-2-plus');
+        box.classList.add(level === 0 ? 'level-0' : level === 1 ? 'level-1' : 'level-2-plus');
+        box.querySelector('.condition-value').textContent = `${name}${level}`;
+    });
+}
+
+function showResyncNotice() {
+    if (document.getElementById('liveResync')) return;
+    const notice = document.createElement('div');
+    notice.id = 'liveResync';
+    notice.className = 'alert alert-info';
+    notice.innerHTML = 'Пропущены обновления. <a href="" class="alert-link">Обновить страницу</a>';
+    const container = document.getElementById('liveAlerts');
+    if (container) container.before(notice);
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    const container = document.getElementById('liveAlerts');
+    if (!container || !window.EventSource) return;
+
+    // EventSource сам переподключается и присылает Last-Event-ID
+    const source = new EventSource(container.dataset.url);
+    source.addEventListener('alert', event => prependAlert(JSON.parse(event.data)));
+    source.addEventListener('conditions', event => updateScales(JSON.parse(event.data).scales));
+    source.addEventListener('resync', showResyncNotice);
+});
@@ -0,0 +1,32 @@
+// Панели детальной страницы NOAA: HTML-фрагменты загружаются после страницы,
+// у каждой панели свой таймаут и заглушка на случай ошибки
+
+function loadNoaaPanel(panel) {
+    const timeout = (parseFloat(panel.dataset.timeout) || 10) * 1000;
+    const controller = new AbortController();
+    const timer = setTimeout(() => controller.abort(), timeout + 2000);
+
+    fetch(panel.dataset.panelUrl, {signal: controller.signal})
+        .then(response => response.text().then(html => ({ok: response.ok, html})))
+        .then(({ok, html}) => {
+            panel.innerHTML = html;
+            panel.classList.toggle('noaa-panel-error', !ok);
+        })
+        .catch(() => {
+            panel.classList.add('noaa-panel-error');
+            panel.innerHTML = '<div class="alert alert-warning">'
+                + '<i class="fas fa-exclamation-triangle"></i> Панель не загрузилась. '
+                + '<a href="#" class="alert-link noaa-panel-retry">Повторить</a></div>';
+            panel.querySelector('.noaa-panel-retry').addEventListener('click', event => {
+                event.preventDefault();
+                panel.innerHTML = '<div class="noaa-panel-placeholder text-muted">'
+                    + '<i class="fas fa-spinner fa-spin"></i> Загрузка...</div>';
+                loadNoaaPanel(panel);
+            });
+        })
+        .finally(() => clearTimeout(timer));
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll('.noaa-panel[data-panel-url]').forEach(loadNoaaPanel);
+});
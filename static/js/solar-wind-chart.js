@@ -0,0 +1,61 @@
+// График солнечного ветра: полоса min/max и прореженная линия (LTTB) из /api/solar-wind/chart/
+
+function drawSolarWindChart(container) {
+    const svg = container.querySelector('svg');
+    const status = container.querySelector('.chart-status');
+    const width = svg.clientWidth || 800;
+    const height = 220;
+    const params = new URLSearchParams({
+        field: container.dataset.field,
+        window: container.dataset.window,
+        width: Math.round(width),
+    });
+
+    status.textContent = 'Загрузка...';
+    fetch(`${container.dataset.url}?${params}`)
+        .then(response => response.json())
+        .then(chart => {
+            svg.setAttribute('viewBox', `0 0 ${width} ${height}`);
+            svg.innerHTML = '';
+            if (!chart.series || chart.series.time.length === 0) {
+                status.textContent = 'Нет данных за выбранный период';
+                return;
+            }
+
+            const low = Math.min(...chart.buckets.min);
+            const high = Math.max(...chart.buckets.max);
+            const x = t => (t - chart.start) / (chart.end - chart.start) * width;
+            const y = v => height - 10 - (v - low) / ((high - low) || 1) * (height - 20);
+
+            // Полоса min/max по столбцам
+            const upper = chart.buckets.time.map((t, i) => `${x(t)},${y(chart.buckets.max[i])}`);
+            const lower = chart.buckets.time.map((t, i) => `${x(t)},${y(chart.buckets.min[i])}`).reverse();
+            const band = document.createElementNS('http://www.w3.org/2000/svg', 'polygon');
+            band.setAttribute('points', upper.concat(lower).join(' '));
+            band.setAttribute('class', 'chart-band');
+            svg.appendChild(band);
+
+            const line = document.createElementNS('http://www.w3.org/2000/svg', 'polyline');
+            line.setAttribute('points', chart.series.time.map((t, i) => `${x(t)},${y(chart.series.value[i])}`).join(' '));
+            line.setAttribute('class', 'chart-line');
+            svg.appendChild(line);
+
+            const resolution = chart.resolution === 'raw' ? 'исходные отсчеты' : `агрегаты по ${chart.resolution / 60} мин`;
+            status.textContent = `min ${low} · max ${high} · ${chart.points} точек (${resolution})`;
+        })
+        .catch(() => { status.textContent = 'Не удалось загрузить график'; });
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll('.solar-wind-chart').forEach(container => {
+        container.querySelectorAll('[data-chart-window], [data-chart-field]').forEach(button => {
+            button.addEventListener('click', () => {
+                const key = button.dataset.chartWindow ? 'window' : 'field';
+                container.dataset[key] = button.dataset.chartWindow || button.dataset.chartField;
+                button.parentElement.querySelectorAll('.btn').forEach(b => b.classList.toggle('active', b === button));
+                drawSolarWindChart(container);
+            });
+        });
+        drawSolarWindChart(container);
+    });
+});
@@ -1,13 +1,18 @@
 from django.contrib import admin
-from .models import SpaceWeatherAlert, AlertComment
+from django.db.models import Count
+from .models import (
+    SpaceWeatherAlert, AlertComment, ArchivedAlert, KpIndexSample, NotificationDelivery, NotificationSubscription,
+    SolarWindPlasmaSample,
+)
 
 
 @admin.register(SpaceWeatherAlert)
 class SpaceWeatherAlertAdmin(admin.ModelAdmin):
-    list_display = ('message_code', 'serial_number', 'warning_type', 'noaa_scale', 'issue_time', 'is_active', 'severity_level')
-    list_filter = ('noaa_scale', 'warning_condition', 'is_processed', 'issue_time')
-    search_fields = ('message_code', 'serial_number', 'warning_type', 'full_message')
-    readonly_fields = ('created_at', 'is_active', 'severity_level')
+    list_display = ('message_code', 'serial_number', 'warning_type', 'noaa_scale', 'severity', 'issue_time', 'active_until', 'is_active', 'comment_count')
+    list_filter = ('severity', 'noaa_scale', 'warning_condition', 'is_processed', 'issue_time')
+    # full_message хранится сжатым, поиск по нему в базе невозможен
+    search_fields = ('message_code', 'serial_number', 'warning_type')
+    readonly_fields = ('created_at', 'severity', 'active_until', 'is_active')
     
     fieldsets = (
         ('Основная информация', {
@@ -23,12 +28,57 @@ class SpaceWeatherAlertAdmin(admin.ModelAdmin):
             'fields': ('full_message', 'potential_impacts')
         }),
         ('Метаданные', {
-            'fields': ('created_at', 'is_processed', 'is_active', 'severity_level')
+            'fields': ('created_at', 'is_processed', 'severity', 'active_until', 'is_active')
         }),
     )
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related()
+        # Полный текст нужен только на странице редактирования
+        return super().get_queryset(request).defer('full_message').annotate(comment_count=Count('comments'))
+    
+    def comment_count(self, obj):
+        return obj.comment_count
+    comment_count.short_description = 'Комментарии'
+    comment_count.admin_order_field = 'comment_count'
+
+
+@admin.register(ArchivedAlert)
+class ArchivedAlertAdmin(admin.ModelAdmin):
+    list_display = ('message_code', 'serial_number', 'kind', 'original_id', 'issue_time', 'archived_at')
+    list_filter = ('kind', 'archived_at')
+    search_fields = ('message_code', 'serial_number')
+    readonly_fields = ('kind', 'original_id', 'message_code', 'serial_number', 'issue_time', 'payload', 'archived_at')
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('payload')
+
+
+@admin.register(SolarWindPlasmaSample)
+class SolarWindPlasmaSampleAdmin(admin.ModelAdmin):
+    list_display = ('time_tag', 'density', 'speed', 'temperature')
+    date_hierarchy = 'time_tag'
+
+
+@admin.register(KpIndexSample)
+class KpIndexSampleAdmin(admin.ModelAdmin):
+    list_display = ('time_tag', 'kp', 'ap')
+    date_hierarchy = 'time_tag'
+
+
+@admin.register(NotificationSubscription)
+class NotificationSubscriptionAdmin(admin.ModelAdmin):
+    list_display = ('name', 'channel', 'target', 'min_severity', 'code_families', 'is_active', 'created_at')
+    list_filter = ('channel', 'is_active', 'min_severity')
+    search_fields = ('name', 'target')
+
+
+@admin.register(NotificationDelivery)
+class NotificationDeliveryAdmin(admin.ModelAdmin):
+    list_display = ('alert_id', 'subscription', 'channel', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status', 'channel')
+    search_fields = ('alert_id', 'last_error')
+    readonly_fields = ('subscription', 'channel', 'alert_id', 'payload', 'attempts', 'last_error', 'created_at', 'sent_at')
+    list_select_related = ('subscription',)
 
 
 @admin.register(AlertComment)
@@ -47,4 +97,5 @@ class AlertCommentAdmin(admin.ModelAdmin):
     alert_identifier.short_description = 'Предупреждение'
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('content_type')
+        # Алерты для колонки "Предупреждение" загружаются одним запросом на тип
+        return super().get_queryset(request).select_related('content_type').with_alerts()
@@ -0,0 +1,238 @@
+"""
+Цепочки сообщений NOAA об одном событии (AlertChain).
+
+Продление предупреждения ("Extension to Serial Number"), продолжение
+алерта ("Continuation of Serial Number") и отмена ("Cancel Serial Number")
+ссылаются на серийный номер предыдущего сообщения. При загрузке ссылка
+разрешается в predecessor, а для всего события пересчитываются root
+(исходное сообщение) и is_current (последнее сообщение). Поэтому
+действующие предупреждения и история события — один запрос по индексу
+(AlertChain.objects.effective() и .history()).
+
+Сообщения могут приходить не по порядку: продление, загруженное раньше
+исходного предупреждения, привязывается, когда исходное появится.
+
+Серийные номера NOAA короткие и повторяются у разных кодов и через
+годы, поэтому ссылка разрешается только внутри семейства явления
+(code_family: WARK04, ALTK04 и их продления — одно семейство 'K') и
+только на сообщение не старше CHAIN_LINK_WINDOW.
+"""
+
+import re
+from datetime import timedelta
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Q
+
+from .models import ALERT_MODELS, AlertChain
+
+
+# Строки ссылок в тексте сообщения -> тип связи
+REFERENCE_PATTERNS = (
+    (AlertChain.RELATION_EXTENSION, re.compile(r'^Extension to Serial Number:\s*(\d+)', re.MULTILINE)),
+    (AlertChain.RELATION_CONTINUATION, re.compile(r'^Continuation of Serial Number:\s*(\d+)', re.MULTILINE)),
+    (AlertChain.RELATION_CANCEL, re.compile(r'^Cancel Serial Number:\s*(\d+)', re.MULTILINE)),
+)
+# Префикс кода сообщения (тип и явление: WARK, ALTE, WATA...) — запасное совпадение, если код ссылки другой
+CODE_PREFIX_LENGTH = 4
+# Насколько раньше ссылающегося сообщения может быть выпущено предыдущее
+CHAIN_LINK_WINDOW = timedelta(days=7)
+
+
+def code_family(message_code):
+    """Явление кода сообщения без типа (WAR, ALT, WAT, SUM): 'K' для WARK04 и ALTK04"""
+    return (message_code or '')[3:4]
+
+
+def chain_keys(entries):
+    """Ключи (семейство, номер), затрагивающие события звеньев: собственные и из ссылок"""
+    return {
+        (code_family(entry.message_code), serial)
+        for entry in entries
+        for serial in (entry.serial_number, entry.reference_serial)
+        if serial
+    }
+
+
+def parse_alert_reference(message):
+    """Тип связи и серийный номер предыдущего сообщения: ('original', '') без ссылки"""
+    for relation, pattern in REFERENCE_PATTERNS:
+        match = pattern.search(message or '')
+        if match:
+            return relation, match.group(1)
+    return AlertChain.RELATION_ORIGINAL, ''
+
+
+def build_chain_entry(alert):
+    """Создает (не сохраняя) звено цепочки для алерта любого типа"""
+    relation, reference_serial = parse_alert_reference(alert.full_message)
+    return AlertChain(
+        content_type=ContentType.objects.get_for_model(alert),
+        object_id=alert.pk,
+        message_code=alert.message_code,
+        serial_number=alert.serial_number,
+        issue_time=alert.issue_time,
+        severity=alert.severity,
+        active_until=alert.active_until,
+        relation=relation,
+        reference_serial=reference_serial,
+    )
+
+
+def find_predecessor(entry, candidates):
+    """
+    Предыдущее сообщение для entry среди сообщений с номером из ссылки.
+
+    Сначала тот же код сообщения, затем тот же префикс кода; только
+    выпущенные раньше (это же исключает циклы), но не раньше чем за
+    CHAIN_LINK_WINDOW, из них самое позднее.
+    """
+    earliest = entry.issue_time - CHAIN_LINK_WINDOW
+    earlier = [row for row in candidates if earliest <= row.issue_time < entry.issue_time]
+    for matches in (
+        lambda row: row.message_code == entry.message_code,
+        lambda row: row.message_code[:CODE_PREFIX_LENGTH] == entry.message_code[:CODE_PREFIX_LENGTH],
+    ):
+        found = [row for row in earlier if matches(row)]
+        if found:
+            return max(found, key=lambda row: (row.issue_time, row.pk))
+    return None
+
+
+def link_entries(entries):
+    """
+    Пересчитывает predecessor, root и is_current для сохраненных звеньев.
+
+    entries должны содержать события целиком (см. load_events).
+    Возвращает измененные звенья.
+    """
+    by_serial = {}
+    for entry in entries:
+        by_serial.setdefault((code_family(entry.message_code), entry.serial_number), []).append(entry)
+
+    predecessors = {}
+    for entry in entries:
+        if entry.reference_serial:
+            key = (code_family(entry.message_code), entry.reference_serial)
+            predecessor = find_predecessor(entry, by_serial.get(key, ()))
+            if predecessor is not None:
+                predecessors[entry.pk] = predecessor
+
+    roots = {}
+    latest = {}
+    for entry in entries:
+        root = entry
+        while root.pk in predecessors:
+            root = predecessors[root.pk]
+        roots[entry.pk] = root
+        if root.pk not in latest or (entry.issue_time, entry.pk) > (latest[root.pk].issue_time, latest[root.pk].pk):
+            latest[root.pk] = entry
+
+    changed = []
+    for entry in entries:
+        predecessor = predecessors.get(entry.pk)
+        state = (
+            predecessor.pk if predecessor else None,
+            roots[entry.pk].pk,
+            latest[roots[entry.pk].pk] is entry,
+        )
+        if (entry.predecessor_id, entry.root_id, entry.is_current) != state:
+            entry.predecessor_id, entry.root_id, entry.is_current = state
+            changed.append(entry)
+    return changed
+
+
+def load_events(seeds):
+    """
+    Звенья событий, которые затрагивают звенья seeds (сохраненные или нет).
+
+    На каждом шаге догружаются сообщения того же семейства с номерами из
+    ссылок и сообщения, ссылающиеся на уже загруженные номера, не дальше
+    CHAIN_LINK_WINDOW от уже найденных; события — это несколько сообщений,
+    поэтому шагов (запросов) немного.
+    """
+    entries = {}
+    times = [seed.issue_time for seed in seeds]
+    pending = chain_keys(seeds)
+    seen = set()
+    while pending:
+        seen |= pending
+        found = AlertChain.objects.filter(
+            Q(serial_number__in={serial for _, serial in pending})
+            | Q(reference_serial__in={serial for _, serial in pending}),
+            issue_time__gte=min(times) - CHAIN_LINK_WINDOW,
+            issue_time__lte=max(times) + CHAIN_LINK_WINDOW,
+        )
+        for entry in found:
+            if chain_keys([entry]) & pending:
+                entries[entry.pk] = entry
+                times.append(entry.issue_time)
+        pending = chain_keys(entries.values()) - seen
+    return list(entries.values())
+
+
+def relink_events(seeds):
+    """Пересчитывает события, которые затрагивают звенья seeds"""
+    changed = link_entries(load_events(seeds))
+    if changed:
+        AlertChain.objects.bulk_update(changed, ['predecessor', 'root', 'is_current'])
+    return changed
+
+
+def chain_alerts(alerts):
+    """Добавляет в цепочки пачку новых алертов (после bulk_create)"""
+    entries = [build_chain_entry(alert) for alert in alerts]
+    with transaction.atomic():
+        AlertChain.objects.bulk_create(entries, ignore_conflicts=True)
+        relink_events(entries)
+    return entries
+
+
+def chain_alert(alert):
+    """Создает или обновляет звено алерта и пересчитывает его событие (и прежнее, если ссылка изменилась)"""
+    entry = build_chain_entry(alert)
+    with transaction.atomic():
+        previous = AlertChain.objects.select_for_update().filter(
+            content_type=entry.content_type,
+            object_id=entry.object_id,
+        ).first()
+        seeds = [entry]
+        if previous:
+            entry.pk = previous.pk
+            entry.predecessor_id, entry.root_id, entry.is_current = previous.predecessor_id, previous.root_id, previous.is_current
+            seeds.append(previous)
+        entry.save()
+        relink_events(seeds)
+
+
+def unchain_alert(alert):
+    """Удаляет звено алерта; следующие сообщения события пересчитываются (и могут стать исходными)"""
+    with transaction.atomic():
+        entries = list(AlertChain.objects.select_for_update().filter(
+            content_type=ContentType.objects.get_for_model(alert),
+            object_id=alert.pk,
+        ))
+        if entries:
+            AlertChain.objects.filter(pk__in=[entry.pk for entry in entries]).delete()
+            relink_events(entries)
+
+
+def rebuild_alert_chain(batch_size=500):
+    """Полностью пересоздает цепочки по всем таблицам алертов"""
+    AlertChain.objects.all().delete()
+    for model in ALERT_MODELS:
+        entries = [build_chain_entry(alert) for alert in model.objects.all().iterator()]
+        AlertChain.objects.bulk_create(entries, batch_size=batch_size)
+    changed = link_entries(list(AlertChain.objects.all()))
+    AlertChain.objects.bulk_update(changed, ['predecessor', 'root', 'is_current'], batch_size=batch_size)
+    return AlertChain.objects.count()
+
+
+def event_history(alert):
+    """История события, в которое входит алерт: один запрос с подзапросом за root"""
+    root = AlertChain.objects.filter(
+        content_type=ContentType.objects.get_for_model(alert),
+        object_id=alert.pk,
+    ).values('root_id')
+    return AlertChain.objects.filter(root_id__in=root).order_by('issue_time', 'pk')
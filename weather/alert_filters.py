@@ -0,0 +1,152 @@
+"""
+Сортировка и фильтры ленты алертов на стороне сервера.
+
+Детальная страница NOAA, админ-панель и /api/alerts/ принимают одинаковые
+параметры и сортируют в SQL с keyset-пагинацией. Для каждой сортировки
+есть составной индекс AlertIndex, последние поля которого делают ключ
+уникальным; все поля ключа идут в одном направлении, поэтому страница —
+один диапазонный запрос по индексу и при прямом, и при обратном порядке.
+
+Параметры запроса:
+
+* sort — time, severity, code или type, с '-' — по убыванию (по умолчанию -time);
+* type — семейства алертов через запятую (k,t,...);
+* min_severity — минимальный уровень серьезности (0-5);
+* active=1 — только алерты, период действия которых не закончился;
+* code — начало кода сообщения (например, WARK).
+"""
+
+from urllib.parse import urlencode
+
+from django.contrib.contenttypes.models import ContentType
+
+from .models import ALERT_KINDS
+
+
+# Сортировка -> поля ключа (совпадают с составными индексами AlertIndex)
+ALERT_SORTS = {
+    'time': ('issue_time', 'content_type_id', 'object_id'),
+    'severity': ('severity', 'issue_time', 'content_type_id', 'object_id'),
+    'code': ('message_code', 'issue_time', 'content_type_id', 'object_id'),
+    'type': ('content_type_id', 'issue_time', 'object_id'),
+}
+DEFAULT_SORT = '-time'
+MAX_SEVERITY = 5
+
+# Подписи семейств алертов (фильтр списков и детальная страница)
+ALERT_KIND_LABELS = {
+    'legacy': 'Legacy',
+    't': 'T-Radio',
+    'k': 'K-Geomagnetic',
+    'e': 'E-Electron',
+    'a': 'A-Forecast',
+}
+
+
+class AlertListParams:
+    """Сортировка и фильтры списка алертов из параметров запроса"""
+
+    def __init__(self, sort=DEFAULT_SORT, kinds=(), min_severity=0, active=False, code=''):
+        self.sort = sort
+        self.kinds = list(kinds)
+        self.min_severity = min_severity
+        self.active = active
+        self.code = code
+
+    @classmethod
+    def from_query(cls, query, strict=False):
+        """
+        Разбирает QueryDict. Неверные значения на страницах игнорируются,
+        а при strict=True (API) вызывают ValueError с описанием ошибки.
+        """
+        params = cls()
+
+        def invalid(message):
+            if strict:
+                raise ValueError(message)
+
+        sort = query.get('sort', '').strip()
+        if sort:
+            if sort.lstrip('-') in ALERT_SORTS:
+                params.sort = sort
+            else:
+                invalid(f"Неизвестная сортировка: {sort}; доступны: {', '.join(ALERT_SORTS)}")
+
+        kinds = [kind for kind in query.get('type', '').split(',') if kind]
+        unknown = [kind for kind in kinds if kind not in ALERT_KINDS]
+        if unknown:
+            invalid(f"Неизвестный тип: {', '.join(unknown)}; доступны: {', '.join(ALERT_KINDS)}")
+        params.kinds = [kind for kind in kinds if kind in ALERT_KINDS]
+
+        min_severity = query.get('min_severity', '')
+        if min_severity:
+            try:
+                params.min_severity = max(0, min(int(min_severity), MAX_SEVERITY))
+            except ValueError:
+                invalid("Параметр min_severity должен быть целым числом")
+
+        params.active = query.get('active') in ('1', 'true', 'on')
+        params.code = query.get('code', '').strip().upper()[:20]
+        return params
+
+    @property
+    def ordering(self):
+        """Поля сортировки для KeysetPaginator"""
+        prefix = '-' if self.sort.startswith('-') else ''
+        return [prefix + name for name in ALERT_SORTS[self.sort.lstrip('-')]]
+
+    def filter(self, queryset):
+        """Применяет фильтры к queryset ленты (AlertIndex)"""
+        if self.kinds:
+            content_types = ContentType.objects.get_for_models(*(ALERT_KINDS[kind] for kind in self.kinds))
+            queryset = queryset.filter(content_type__in=content_types.values())
+        if self.min_severity:
+            queryset = queryset.min_severity(self.min_severity)
+        if self.active:
+            queryset = queryset.active()
+        if self.code:
+            queryset = queryset.filter(message_code__startswith=self.code)
+        return queryset
+
+    def as_query(self, **changes):
+        """Параметры (без значений по умолчанию) с заменами changes"""
+        values = {
+            'sort': self.sort,
+            'type': ','.join(self.kinds),
+            'min_severity': self.min_severity,
+            'active': 1 if self.active else '',
+            'code': self.code,
+        }
+        values.update(changes)
+        if values['sort'] == DEFAULT_SORT:
+            values['sort'] = ''
+        return {name: value for name, value in values.items() if value}
+
+    @property
+    def query_string(self):
+        """Текущие параметры для ссылок пагинации и ключа кэша фрагмента"""
+        return urlencode(self.as_query())
+
+    @property
+    def is_default(self):
+        """Лента без фильтров, новые сверху (в нее попадают живые обновления)"""
+        return not self.as_query()
+
+    @property
+    def sort_links(self):
+        """Ссылки заголовков таблицы: повторный выбор колонки меняет направление"""
+        links = {}
+        for name in ALERT_SORTS:
+            # Первый выбор колонки: время и серьезность — по убыванию, код и тип — по возрастанию
+            sort = f"-{name}" if name in ('time', 'severity') else name
+            if self.sort.lstrip('-') == name:
+                sort = self.sort[1:] if self.sort.startswith('-') else f"-{name}"
+            links[name] = urlencode(self.as_query(sort=sort))
+        return links
+
+    @property
+    def sort_icons(self):
+        """Иконки заголовков таблицы (Font Awesome)"""
+        icons = {name: 'fa-sort' for name in ALERT_SORTS}
+        icons[self.sort.lstrip('-')] = 'fa-sort-down' if self.sort.startswith('-') else 'fa-sort-up'
+        return icons
@@ -0,0 +1,149 @@
+"""
+Поддержка денормализованной ленты алертов (AlertIndex).
+
+Запись ленты обновляется при сохранении и удалении алерта любого типа,
+поэтому списки строятся одним запросом ORDER BY issue_time LIMIT ...
+вместо объединения пяти таблиц в Python. Вместе с лентой обновляются
+цепочки сообщений о событиях (alert_chain.py).
+"""
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Q
+
+from .alert_chain import chain_alert, chain_alerts, rebuild_alert_chain, unchain_alert
+from .alert_stats import apply_stat_deltas, merge_deltas, rebuild_alert_stats, stat_deltas
+from .live import publish_new_alerts
+from .models import ALERT_MODELS, AlertIndex, touch_content_version
+from .notifications import enqueue_notifications
+from .search import index_search_documents, rebuild_search_index, remove_search_documents, search_backend
+
+
+def build_index_entry(alert):
+    """Создает (не сохраняя) запись ленты для алерта любого типа"""
+    summary = getattr(alert, 'potential_impacts', None) or getattr(alert, 'description', None) or ''
+    return AlertIndex(
+        content_type=ContentType.objects.get_for_model(alert),
+        object_id=alert.pk,
+        issue_time=alert.issue_time,
+        message_code=alert.message_code,
+        serial_number=alert.serial_number,
+        noaa_scale=getattr(alert, 'noaa_scale', None),
+        severity=alert.severity,
+        valid_from=getattr(alert, 'valid_from', None),
+        active_until=alert.active_until,
+        title=(alert.warning_type or '')[:200],
+        summary=summary[:255],
+    )
+
+
+def index_alert(alert):
+    """Создает или обновляет запись ленты для алерта (и статистику)"""
+    entry = build_index_entry(alert)
+    with transaction.atomic():
+        previous = AlertIndex.objects.select_for_update().filter(
+            content_type=entry.content_type,
+            object_id=entry.object_id,
+        ).first()
+        deltas = stat_deltas([entry])
+        if previous:
+            entry.pk = previous.pk
+            deltas = merge_deltas(deltas, stat_deltas([previous], sign=-1))
+        entry.save()
+        apply_stat_deltas(deltas)
+        index_search_documents([(entry.pk, alert)])
+        chain_alert(alert)
+        touch_content_version()
+
+
+def index_alerts(alerts):
+    """
+    Добавляет в ленту пачку новых алертов (после bulk_create сигналы не отправляются).
+
+    Алерты, которые уже есть в ленте (их вставила параллельная загрузка между
+    проверкой дубликатов и bulk_create), пропускаются, иначе статистика, живые
+    события и оповещения учли бы их дважды. Возвращает добавленные алерты.
+    """
+    alerts = without_index_entries(alerts)
+    if not alerts:
+        return []
+    entries = [build_index_entry(alert) for alert in alerts]
+    with transaction.atomic():
+        AlertIndex.objects.bulk_create(entries, ignore_conflicts=True)
+        apply_stat_deltas(stat_deltas(entries))
+        if search_backend() is not None:
+            index_search_documents(with_index_ids(alerts))
+        chain_alerts(alerts)
+        touch_content_version()
+        publish_new_alerts(alerts)
+        enqueue_notifications(alerts)
+    return alerts
+
+
+def without_index_entries(alerts):
+    """Алерты пачки, у которых еще нет записи ленты (один запрос на все типы)"""
+    by_type = {}
+    for alert in alerts:
+        by_type.setdefault(ContentType.objects.get_for_model(alert).pk, []).append(alert.pk)
+    if not by_type:
+        return []
+    condition = Q()
+    for content_type_id, object_ids in by_type.items():
+        condition |= Q(content_type_id=content_type_id, object_id__in=object_ids)
+    indexed = set(AlertIndex.objects.filter(condition).values_list('content_type_id', 'object_id'))
+    return [
+        alert for alert in alerts
+        if (ContentType.objects.get_for_model(alert).pk, alert.pk) not in indexed
+    ]
+
+
+def with_index_ids(alerts):
+    """
+    Пары (AlertIndex.id, алерт) для пачки алертов.
+
+    bulk_create(ignore_conflicts=True) не возвращает первичные ключи,
+    поэтому id записей ленты читаются одним запросом на тип алертов.
+    """
+    by_model = {}
+    for alert in alerts:
+        by_model.setdefault(type(alert), []).append(alert)
+    pairs = []
+    for model, model_alerts in by_model.items():
+        index_ids = dict(
+            AlertIndex.objects.filter(
+                content_type=ContentType.objects.get_for_model(model),
+                object_id__in=[alert.pk for alert in model_alerts],
+            ).values_list('object_id', 'id')
+        )
+        pairs.extend((index_ids.get(alert.pk), alert) for alert in model_alerts)
+    return pairs
+
+
+def unindex_alert(alert):
+    """Удаляет запись ленты для алерта (и уменьшает статистику)"""
+    with transaction.atomic():
+        entries = list(AlertIndex.objects.select_for_update().filter(
+            content_type=ContentType.objects.get_for_model(alert),
+            object_id=alert.pk,
+        ))
+        if entries:
+            AlertIndex.objects.filter(pk__in=[entry.pk for entry in entries]).delete()
+            apply_stat_deltas(stat_deltas(entries, sign=-1))
+            remove_search_documents([entry.pk for entry in entries])
+            touch_content_version()
+        unchain_alert(alert)
+
+
+def rebuild_alert_index(batch_size=500):
+    """Полностью пересоздает ленту (а также статистику, поисковый индекс и цепочки) по всем таблицам алертов"""
+    AlertIndex.objects.all().delete()
+    created = 0
+    for model in ALERT_MODELS:
+        entries = [build_index_entry(alert) for alert in model.objects.all().iterator()]
+        AlertIndex.objects.bulk_create(entries, batch_size=batch_size)
+        created += len(entries)
+    rebuild_alert_stats()
+    rebuild_search_index(batch_size=batch_size)
+    rebuild_alert_chain(batch_size=batch_size)
+    touch_content_version()
+    return created
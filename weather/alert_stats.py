@@ -0,0 +1,132 @@
+"""
+Инкрементальная статистика алертов (AlertDailyStat).
+
+Счетчики по семейству и дню обновляются в той же транзакции, что и лента
+алертов, поэтому карточки админ-панели читают несколько предагрегированных
+строк вместо десятка COUNT(*) по всем таблицам.
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import AlertDailyStat, AlertIndex, alert_kind
+
+
+def utc_day(value):
+    """Дата (UTC) для момента времени"""
+    return timezone.localtime(value, dt_timezone.utc).date()
+
+
+def stat_deltas(entries, sign=1):
+    """Изменения счетчиков {(семейство, день): Counter} для записей ленты"""
+    deltas = {}
+    for entry in entries:
+        family = alert_kind(ContentType.objects.get_for_id(entry.content_type_id).model_class())
+        deltas.setdefault((family, utc_day(entry.issue_time)), Counter())['issued'] += sign
+        if entry.active_until:
+            deltas.setdefault((family, utc_day(entry.active_until)), Counter())['expiring'] += sign
+    return deltas
+
+
+def merge_deltas(*parts):
+    merged = {}
+    for part in parts:
+        for key, counter in part.items():
+            merged.setdefault(key, Counter()).update(counter)
+    return merged
+
+
+def apply_stat_deltas(deltas):
+    """
+    Применяет изменения счетчиков: одно чтение с блокировкой и один upsert.
+
+    Вызывается внутри транзакции, в которой меняется лента алертов.
+    """
+    deltas = {key: counter for key, counter in deltas.items() if any(counter.values())}
+    if not deltas:
+        return
+    with transaction.atomic():
+        current = {
+            (row.family, row.day): row
+            for row in AlertDailyStat.objects.select_for_update().filter(
+                family__in={family for family, _ in deltas},
+                day__in={day for _, day in deltas},
+            )
+        }
+        rows = []
+        for (family, day), counter in deltas.items():
+            row = current.get((family, day)) or AlertDailyStat(family=family, day=day)
+            row.issued += counter['issued']
+            row.expiring += counter['expiring']
+            rows.append(row)
+        AlertDailyStat.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['family', 'day'],
+            update_fields=['issued', 'expiring'],
+        )
+
+
+def rebuild_alert_stats():
+    """Пересчитывает статистику с нуля по ленте алертов"""
+    issued = (
+        AlertIndex.objects.annotate(day=TruncDate('issue_time', tzinfo=dt_timezone.utc))
+        .values('content_type', 'day').annotate(count=Count('id'))
+    )
+    expiring = (
+        AlertIndex.objects.filter(active_until__isnull=False)
+        .annotate(day=TruncDate('active_until', tzinfo=dt_timezone.utc))
+        .values('content_type', 'day').annotate(count=Count('id'))
+    )
+    deltas = {}
+    for counter_name, rows in (('issued', issued), ('expiring', expiring)):
+        for row in rows:
+            family = alert_kind(ContentType.objects.get_for_id(row['content_type']).model_class())
+            deltas.setdefault((family, row['day']), Counter())[counter_name] += row['count']
+
+    with transaction.atomic():
+        AlertDailyStat.objects.all().delete()
+        AlertDailyStat.objects.bulk_create(
+            AlertDailyStat(family=family, day=day, issued=counter['issued'], expiring=counter['expiring'])
+            for (family, day), counter in deltas.items()
+        )
+    return len(deltas)
+
+
+def dashboard_stats(now=None):
+    """Карточки админ-панели: всего, активных и за последнюю неделю"""
+    now = now or timezone.now()
+    today = utc_day(now)
+    totals = AlertDailyStat.objects.aggregate(
+        total=Sum('issued'),
+        recent=Sum('issued', filter=Q(day__gte=today - timedelta(days=7))),
+        expiring_later=Sum('expiring', filter=Q(day__gt=today)),
+    )
+    # Алерты, истекающие сегодня, досчитываем точно по индексу active_until
+    tomorrow = datetime.combine(today + timedelta(days=1), datetime.min.time(), tzinfo=dt_timezone.utc)
+    expiring_today = AlertIndex.objects.filter(active_until__gte=now, active_until__lt=tomorrow).count()
+    return {
+        'total_alerts': totals['total'] or 0,
+        'active_alerts': (totals['expiring_later'] or 0) + expiring_today,
+        'recent_alerts': totals['recent'] or 0,
+    }
+
+
+def daily_alert_counts(days=14, now=None):
+    """Количество выпущенных алертов по дням за последние days дней (для графика)"""
+    today = utc_day(now or timezone.now())
+    start = today - timedelta(days=days - 1)
+    counts = dict(
+        AlertDailyStat.objects.filter(day__gte=start)
+        .values_list('day').annotate(total=Sum('issued')).values_list('day', 'total')
+    )
+    series = [(start + timedelta(days=i), counts.get(start + timedelta(days=i), 0)) for i in range(days)]
+    peak = max((count for _, count in series), default=0) or 1
+    return [{'day': day, 'count': count, 'percent': round(count * 100 / peak)} for day, count in series]
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class WeatherConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'weather'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .database import configure_sqlite_connection
+
+        connection_created.connect(configure_sqlite_connection, dispatch_uid='weather_sqlite_pragmas')
@@ -0,0 +1,125 @@
+"""
+Локальные серверы-заглушки SMTP и HTTP для бенчмарка и тестов оповещений.
+
+Серверы работают в отдельном потоке со своим циклом событий, принимают
+письма и запросы вебхуков без доставки и считают принятое.
+"""
+
+import asyncio
+import threading
+
+from aiohttp import web
+
+
+class StandInServers:
+    """
+    SMTP (минимальный диалог EHLO/MAIL/RCPT/DATA/QUIT) и HTTP на 127.0.0.1.
+
+    webhook_status — код ответа вебхука (например, 500 для проверки повторов),
+    delay — задержка ответа на письмо и на запрос, секунд.
+    """
+
+    def __init__(self, webhook_status=200, delay=0.0):
+        self.webhook_status = webhook_status
+        self.delay = delay
+        self.smtp_port = None
+        self.http_port = None
+        self.messages = 0  # принято писем
+        self.smtp_sessions = 0
+        self.requests = 0  # запросов вебхуков
+        self.alerts = 0  # алертов во всех запросах
+        self.loop = None
+        self.thread = None
+        self.ready = threading.Event()
+
+    def webhook_url(self, path='hook'):
+        return f"http://127.0.0.1:{self.http_port}/{path}"
+
+    # --- SMTP ---
+
+    async def handle_smtp(self, reader, writer):
+        self.smtp_sessions += 1
+
+        async def reply(line):
+            writer.write(f"{line}\r\n".encode())
+            await writer.drain()
+
+        await reply('220 stand-in ESMTP')
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode(errors='replace').strip().upper()
+                if command.startswith(('EHLO', 'HELO')):
+                    await reply('250 stand-in')
+                elif command == 'DATA':
+                    await reply('354 End data with <CR><LF>.<CR><LF>')
+                    while (await reader.readline()) not in (b'.\r\n', b'.\n', b''):
+                        pass
+                    if self.delay:
+                        await asyncio.sleep(self.delay)
+                    self.messages += 1
+                    await reply('250 OK queued')
+                elif command == 'QUIT':
+                    await reply('221 Bye')
+                    break
+                else:
+                    # MAIL FROM, RCPT TO, RSET, NOOP
+                    await reply('250 OK')
+        finally:
+            writer.close()
+
+    # --- HTTP ---
+
+    async def handle_webhook(self, request):
+        data = await request.json()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.requests += 1
+        if self.webhook_status < 300:
+            self.alerts += len(data.get('alerts', []))
+        return web.json_response({'ok': self.webhook_status < 300}, status=self.webhook_status)
+
+    # --- Поток серверов ---
+
+    async def start_servers(self):
+        self.smtp_server = await asyncio.start_server(self.handle_smtp, '127.0.0.1', 0)
+        self.smtp_port = self.smtp_server.sockets[0].getsockname()[1]
+
+        app = web.Application()
+        app.router.add_post('/{path:.*}', self.handle_webhook)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        self.http_port = self.runner.addresses[0][1]
+
+    async def stop_servers(self):
+        self.smtp_server.close()
+        await self.smtp_server.wait_closed()
+        await self.runner.cleanup()
+
+    def serve(self):
+        self.loop = asyncio.new_event_loop()
+        self.loop.run_until_complete(self.start_servers())
+        self.ready.set()
+        self.loop.run_forever()
+        self.loop.run_until_complete(self.stop_servers())
+        self.loop.close()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        return self
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
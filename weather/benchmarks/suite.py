@@ -0,0 +1,582 @@
+"""
+Бенчмарки парсинга и импорта алертов NOAA.
+
+Корпус alerts_corpus.json содержит записанные сообщения всех семейств кодов
+(ALTK, WARK, WATA, ALTEF, ALTTP, ALTXMF, SUMX, WARPX, ALTPX, SUMPX, WARSUD, ...)
+в формате ответа alerts.json. Запуск: python manage.py bench
+"""
+
+import json
+import math
+import os
+import platform
+import re
+import itertools
+import statistics
+import threading
+import time
+from contextlib import contextmanager, nullcontext, redirect_stdout
+from datetime import timedelta
+from pathlib import Path
+
+import django
+from asgiref.sync import async_to_sync
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+import utils.translation
+from utils.translation import AutoTranslator
+from ..ingest import existing_alert_keys, import_alerts
+from ..charts import build_chart, cached_chart, chart_window, invalidate_rollups
+from ..kp_stats import kp_statistics, window_statistics
+from ..models import AlertIndex, KpIndexSample, NotificationDelivery, NotificationSubscription, SolarWindPlasmaSample
+from ..notifications import EmailChannel, NotificationEngine, WebhookChannel
+from ..search import SEARCH_TABLE, search_alerts, search_backend
+from ..timeseries import read_window
+from ..fetchers import save_source_data
+from ..views.noaa_views import parse_alert_message, save_alert_to_db
+from .servers import StandInServers
+
+
+CORPUS_PATH = Path(__file__).resolve().parent / 'alerts_corpus.json'
+
+# Параметры бенчмарка concurrent: потоки-читатели и размер пачки импорта
+CONCURRENT_READERS = 4
+CONCURRENT_BATCH = 25
+
+# Подписки бенчмарка notify: по столько адресов email и вебхуков; сдвиг номеров его алертов
+NOTIFY_SUBSCRIPTIONS = 5
+NOTIFY_SERIAL_OFFSET = 900_000_000
+
+BENCHMARKS = {}
+
+
+def benchmark(name, transactional=True):
+    """
+    Регистрирует бенчмарк под указанным именем.
+
+    transactional=False — бенчмарк сам фиксирует данные (например, пишет из
+    нескольких потоков) и не оборачивается в откатываемую транзакцию.
+    """
+    def decorator(func):
+        func.transactional = transactional
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+class FakeTranslator(AutoTranslator):
+    """Переводчик без обращения к Google Translate (возвращает исходный текст)"""
+
+    def translate_text(self, text):
+        return text
+
+
+@contextmanager
+def fake_translator():
+    """Временно подменяет глобальный переводчик на FakeTranslator"""
+    original = utils.translation.translator
+    utils.translation.translator = FakeTranslator()
+    try:
+        yield
+    finally:
+        utils.translation.translator = original
+
+
+@contextmanager
+def rollback():
+    """Выполняет блок в транзакции, которая всегда откатывается"""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def load_corpus(scale=1):
+    """
+    Загружает корпус алертов.
+
+    При scale > 1 корпус размножается с уникальными серийными номерами,
+    чтобы копии не считались дубликатами.
+    """
+    with open(CORPUS_PATH, encoding='utf-8') as f:
+        corpus = json.load(f)
+
+    entries = []
+    for copy in range(scale):
+        entries.extend(renumber(corpus, copy * 100000) if copy else corpus)
+    return entries
+
+
+def renumber(corpus, offset):
+    """Копия корпуса со сдвинутыми на offset серийными номерами (и ссылками на них)"""
+    entries = []
+    for entry in corpus:
+        entry = dict(entry)
+        entry['message'] = re.sub(
+            r'(?m)^((?:Extension to |Continuation of |Cancel )?Serial Number:)\s*(\d+)',
+            lambda m: f"{m.group(1)} {int(m.group(2)) + offset}",
+            entry['message'],
+        )
+        entries.append(entry)
+    return entries
+
+
+@benchmark('parse')
+def bench_parse(corpus):
+    """parse_alert_message для каждого сообщения корпуса"""
+    def run():
+        for entry in corpus:
+            parse_alert_message(entry)
+    return run
+
+
+@benchmark('dedup')
+def bench_dedup(corpus):
+    """Проверка дубликатов по всем таблицам при заполненной базе"""
+    import_alerts(corpus)
+    parsed = [parse_alert_message(entry) for entry in corpus]
+
+    keys = {(data.get('message_code', ''), data.get('serial_number', '')) for data in parsed}
+
+    def run():
+        existing_alert_keys(keys)
+    return run
+
+
+@benchmark('db_write')
+def bench_db_write(corpus):
+    """save_alert_to_db в пустую базу (перевод подменен)"""
+    parsed = [parse_alert_message(entry) for entry in corpus]
+
+    def run():
+        with rollback():
+            for data in parsed:
+                save_alert_to_db(data)
+    return run
+
+
+@benchmark('pipeline')
+def bench_pipeline(corpus):
+    """Полный импорт: парсинг, дедупликация и запись"""
+    def run():
+        with rollback():
+            import_alerts(corpus)
+    return run
+
+
+@benchmark('concurrent', transactional=False)
+def bench_concurrent(corpus):
+    """
+    Импорт пачками в одном потоке, пока CONCURRENT_READERS потоков отдают
+    страницы (лента админ-панели и детальные страницы алертов).
+
+    Замеряется время импорта; в extra — задержки и ошибки читателей.
+    """
+    import_alerts(corpus)  # страницам есть что показывать
+    session_client = Client()
+    session = session_client.session
+    session['admin_authenticated'] = True
+    session.save()
+    session_client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+    detail_urls = [entry.get_absolute_url() for entry in AlertIndex.objects.all()[:50]]
+    offsets = itertools.count(1)
+    extra = {}
+
+    def reader(stop, latencies, errors):
+        client = Client()
+        client.cookies = session_client.cookies
+        try:
+            for i in itertools.count():
+                if stop.is_set():
+                    break
+                url = reverse('admin_alerts') if i % 2 == 0 else detail_urls[i % len(detail_urls)]
+                start = time.perf_counter()
+                try:
+                    response = client.get(url)
+                    if response.status_code != 200:
+                        errors.append(f"{url}: HTTP {response.status_code}")
+                except Exception as e:
+                    errors.append(f"{url}: {e}")
+                latencies.append(time.perf_counter() - start)
+        finally:
+            connections.close_all()
+
+    def run():
+        # Каждый прогон пишет новые алерты, иначе все записи отсеются как дубликаты
+        batch = renumber(corpus, next(offsets) * 10_000_000)
+        stop = threading.Event()
+        latencies, errors = [], []
+        threads = [
+            threading.Thread(target=reader, args=(stop, latencies, errors))
+            for _ in range(CONCURRENT_READERS)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for start in range(0, len(batch), CONCURRENT_BATCH):
+                import_alerts(batch[start:start + CONCURRENT_BATCH])
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+        latencies.sort()
+        extra.update({
+            'readers': CONCURRENT_READERS,
+            'page_requests': len(latencies),
+            'page_p50_ms': latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+            'page_p95_ms': latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0,
+            'page_errors': len(errors),
+        })
+        if errors:
+            extra['first_error'] = errors[0]
+
+    run.extra = extra
+    return run
+
+
+# Запросы бенчмарка search: коды, английский текст NOAA и префиксы
+SEARCH_QUERIES = [
+    'geomagnetic storm', 'K-index of 7', 'proton event', 'WARK05', 'electron flux',
+    'radio emission', 'x-ray', 'power grid fluctuations', 'aurora', 'sudden impulse',
+]
+
+
+def import_in_chunks(corpus, size=2000):
+    """Импорт большого корпуса пачками (ограничение SQLite на число параметров запроса)"""
+    for start in range(0, len(corpus), size):
+        import_alerts(corpus[start:start + size])
+
+
+@benchmark('search')
+def bench_search(corpus):
+    """
+    Ранжированный поиск со сниппетами по SEARCH_QUERIES.
+
+    Для замера на 100k+ алертов: python manage.py bench search --scale 4000.
+    В extra — время на запрос и для сравнения LIKE-скан исходного текста.
+    """
+    import_in_chunks(corpus)
+    extra = {'documents': AlertIndex.objects.count(), 'backend': search_backend() or 'icontains'}
+
+    def like_scan():
+        start = time.perf_counter()
+        with connections['default'].cursor() as cursor:
+            for query in SEARCH_QUERIES:
+                cursor.execute(
+                    f"SELECT rowid FROM {SEARCH_TABLE} WHERE original LIKE %s LIMIT 20", [f'%{query}%']
+                )
+                cursor.fetchall()
+        return (time.perf_counter() - start) / len(SEARCH_QUERIES)
+
+    def run():
+        start = time.perf_counter()
+        for query in SEARCH_QUERIES:
+            search_alerts(query)
+        extra['per_query_ms'] = (time.perf_counter() - start) / len(SEARCH_QUERIES) * 1000
+        if extra['backend'] == 'fts5':
+            extra['like_per_query_ms'] = like_scan() * 1000
+
+    run.extra = extra
+    return run
+
+
+# Бенчмарк chart: 27 суток минутных отсчетов плазмы (как в plasma-7-day.json)
+CHART_DAYS = 27
+CHART_WIDTH = 800
+
+
+def seed_plasma_samples(days, now):
+    """Синтетические минутные отсчеты плазмы за days суток до now"""
+    start = now - timedelta(days=days)
+    samples = []
+    for minute in range(days * 24 * 60):
+        phase = minute / 1440
+        samples.append(SolarWindPlasmaSample(
+            time_tag=start + timedelta(minutes=minute),
+            density=5 + 3 * math.sin(phase * 3.1),
+            speed=None if minute % 997 == 0 else 420 + 80 * math.sin(phase) + (minute * 7919 % 41),
+            temperature=1e5 + 4e4 * math.cos(phase * 1.7),
+        ))
+    SolarWindPlasmaSample.objects.bulk_create(samples, batch_size=2000)
+    return samples
+
+
+@benchmark('chart')
+def bench_chart(corpus):
+    """
+    График скорости солнечного ветра за 27 суток шириной CHART_WIDTH.
+
+    Замеряется построение графика на прогретом кэше агрегатов; в extra —
+    первый (холодный) расчет, ответ из кэша готовых графиков и для
+    сравнения чтение сырых отсчетов окна.
+    """
+    now = timezone.now()
+    samples = seed_plasma_samples(CHART_DAYS, now)
+    invalidate_rollups(SolarWindPlasmaSample, [sample.time_tag for sample in samples])
+    start, end = chart_window('27d', now)
+    extra = {'samples': len(samples)}
+
+    begin = time.perf_counter()
+    chart = build_chart(SolarWindPlasmaSample, 'speed', start, end, CHART_WIDTH)
+    extra['cold_ms'] = (time.perf_counter() - begin) * 1000
+    extra['resolution'] = chart['resolution']
+
+    begin = time.perf_counter()
+    read_window(SolarWindPlasmaSample, start, end, fields=['speed'])
+    extra['raw_read_ms'] = (time.perf_counter() - begin) * 1000
+
+    cached_chart(SolarWindPlasmaSample, 'speed', '27d', CHART_WIDTH, now)
+    begin = time.perf_counter()
+    cached_chart(SolarWindPlasmaSample, 'speed', '27d', CHART_WIDTH, now)
+    extra['cached_ms'] = (time.perf_counter() - begin) * 1000
+
+    def run():
+        build_chart(SolarWindPlasmaSample, 'speed', start, end, CHART_WIDTH)
+
+    run.extra = extra
+    return run
+
+
+KP_YEARS = 30
+
+
+def seed_kp_samples(years, now):
+    """Синтетический ряд Kp/ap за years лет до now (трехчасовые значения с бурями)"""
+    count = int(years * 365.25 * 8)
+    start = now - timedelta(hours=3 * count)
+    rng = np.random.default_rng(42)
+    # Спокойный фон с редкими всплесками; Kp кратен 1/3, как у NOAA
+    kp = np.clip(np.round((rng.gamma(2.0, 1.0, count) + (rng.random(count) < 0.01) * 4) * 3) / 3, 0, 9)
+    ap = np.round(np.exp(kp * 0.55) * 2)
+    samples = [
+        KpIndexSample(time_tag=start + timedelta(hours=3 * i), kp=None if i % 1999 == 0 else float(kp[i]), ap=float(ap[i]))
+        for i in range(count)
+    ]
+    KpIndexSample.objects.bulk_create(samples, batch_size=2000)
+    return samples
+
+
+@benchmark('kp')
+def bench_kp(corpus):
+    """
+    Статистика Kp (суточные максимумы и Ap, скользящий максимум за 24 ч,
+    сутки с бурей, распределение уровней G) за KP_YEARS лет на прогретом
+    кэше ряда. В extra — первый (холодный) расчет, отдельно чтение окна из
+    базы и расчет на массивах в памяти.
+    """
+    now = timezone.now()
+    samples = seed_kp_samples(KP_YEARS, now)
+    start, end = samples[0].time_tag, now
+    extra = {'samples': len(samples)}
+    cache.clear()
+
+    begin = time.perf_counter()
+    window_statistics(start, end)
+    extra['cold_ms'] = (time.perf_counter() - begin) * 1000
+
+    begin = time.perf_counter()
+    window = read_window(KpIndexSample, start, end)
+    extra['read_ms'] = (time.perf_counter() - begin) * 1000
+
+    timings = []
+    for _ in range(5):
+        begin = time.perf_counter()
+        kp_statistics(window.times, window['kp'], window['ap'])
+        timings.append(time.perf_counter() - begin)
+    extra['analysis_ms'] = statistics.median(timings) * 1000
+
+    def run():
+        window_statistics(start, end)
+
+    run.extra = extra
+    return run
+
+
+def sample_noaa_sources():
+    """Данные источников NOAA для бенчмарка render: шкалы R/S/G, солнечный ветер, индексы и GOES"""
+    def day(scale, prob):
+        return {
+            'DateStamp': '2024-05-11', 'TimeStamp': '00:00:00',
+            'R': {'Scale': str(scale), 'Text': 'minor', 'MinorProb': str(prob), 'MajorProb': str(prob // 3)},
+            'S': {'Scale': '0', 'Text': 'none', 'Prob': str(prob // 2)},
+            'G': {'Scale': str(scale + 1), 'Text': 'moderate'},
+        }
+    data = {
+        'current_conditions': {
+            'current': day(1, 0),
+            'today_forecast': day(2, 55),
+            'tomorrow_forecast': day(1, 35),
+            'day_after_forecast': day(0, 20),
+        },
+        'solar_wind': [
+            ['time_tag', 'density', 'speed', 'temperature'],
+            ['2024-05-11 00:00:00.000', '4.1', '410.5', '95000'],
+            ['2024-05-11 00:05:00.000', '4.3', '412.0', '97000'],
+        ],
+        'kp_index': {'time_tag': '2024-05-11 00:00:00', 'kp': 5.33, 'recent': []},
+        'forecast': [
+            {'date': f'2024-05-1{day}', 'kp_max': 4.67 + day, 'noaa_scale': f'G{day}'} for day in range(1, 4)
+        ],
+        'xray_flux': {
+            'time_tag': '2024-05-11T00:05:00Z', 'satellite': 16, 'flux': 2.3e-6, 'flare_class': 'C2.3', 'peak_class': 'M1.1',
+        },
+        'proton_flux': {'time_tag': '2024-05-11T00:05:00Z', 'satellite': 18, 'flux': 12.5, 'noaa_scale': 'S1'},
+        'magnetometer': {
+            'time_tag': '2024-05-11T00:05:00Z', 'satellite': 16, 'hp': 98.2, 'he': 12.1, 'hn': 3.4, 'total': 99.0,
+        },
+    }
+    return data
+
+
+@benchmark('notify', transactional=False)
+def bench_notify(corpus):
+    """
+    Доставка оповещений о корпусе по NOTIFY_SUBSCRIPTIONS подпискам email и
+    вебхуков на локальные серверы-заглушки SMTP и HTTP.
+
+    Каждый прогон возвращает все доставки в очередь и доставляет их заново;
+    в extra — доставки в секунду и сколько приняли серверы. Движок сам
+    управляет соединением с базой, поэтому бенчмарк не оборачивается в
+    транзакцию: алерты загружаются с новыми номерами, а подписки и
+    доставки удаляются в конце.
+    """
+    servers = StandInServers().start()
+    for i in range(NOTIFY_SUBSCRIPTIONS):
+        NotificationSubscription.objects.create(name=f"email-{i}", channel='email', target=f"ops{i}@example.com")
+        NotificationSubscription.objects.create(name=f"webhook-{i}", channel='webhook', target=servers.webhook_url(f"hook/{i}"))
+    import_alerts(renumber(corpus, NOTIFY_SERIAL_OFFSET))  # доставки ставятся в очередь при загрузке
+    deliveries = NotificationDelivery.objects.count()
+    extra = {'deliveries': deliveries}
+
+    def run():
+        NotificationDelivery.objects.update(status=NotificationDelivery.STATUS_PENDING, attempts=0, next_attempt_at=timezone.now())
+        engine = NotificationEngine([
+            EmailChannel(backend='django.core.mail.backends.smtp.EmailBackend'),
+            WebhookChannel(),
+        ])
+        start = time.perf_counter()
+        with override_settings(EMAIL_HOST='127.0.0.1', EMAIL_PORT=servers.smtp_port):
+            result = async_to_sync(engine.run)(until_idle=True)
+        elapsed = time.perf_counter() - start
+        assert sum(result['sent'].values()) == deliveries, result
+        extra['deliveries_per_s'] = deliveries / elapsed
+        extra['smtp_messages'] = servers.messages
+        extra['webhook_requests'] = servers.requests
+
+    def close():
+        servers.stop()
+        NotificationSubscription.objects.all().delete()
+
+    run.extra = extra
+    run.close = close
+    return run
+
+
+@benchmark('render')
+def bench_render(corpus):
+    """
+    Детальная страница NOAA с полной таблицей алертов (20 строк) и все ее панели на сохраненном снимке NOAA.
+
+    Замеряется загрузка с прогретым кэшем фрагментов шаблона; в extra — то же
+    без кэша фрагментов (NOAA_FRAGMENT_TTL=0) и число запросов к базе.
+    """
+    import_alerts(corpus)
+    cache.clear()
+    for name, data in sample_noaa_sources().items():
+        save_source_data(name, data)
+    client = Client()
+    urls = [
+        reverse('noaa_detailed'), reverse('noaa_conditions_panel'), reverse('noaa_solar_wind_panel'),
+        reverse('noaa_indices_panel'),
+    ]
+    extra = {}
+
+    def render_page():
+        with CaptureQueriesContext(connections['default']) as queries:
+            for url in urls:
+                response = client.get(url)
+                assert response.status_code == 200, response.status_code
+        return len(queries)
+
+    with override_settings(NOAA_FRAGMENT_TTL=0):
+        render_page()
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            extra['uncached_queries'] = render_page()
+            timings.append(time.perf_counter() - start)
+        extra['uncached_ms'] = statistics.median(timings) * 1000
+
+    def run():
+        extra['cached_queries'] = render_page()
+
+    run.extra = extra
+    return run
+
+
+def summarize(timings, ops):
+    """Сводная статистика по замерам одного бенчмарка"""
+    median = statistics.median(timings)
+    return {
+        'ops': ops,
+        'runs': len(timings),
+        'min': min(timings),
+        'median': median,
+        'mean': statistics.mean(timings),
+        'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        'per_op_us': median / ops * 1e6 if ops else 0.0,
+    }
+
+
+def run_benchmarks(names, corpus, repeat=5):
+    """Запускает выбранные бенчмарки и возвращает результаты в виде словаря"""
+    results = {}
+    # parse_alert_message печатает отладочные строки — не замеряем вывод в консоль
+    with fake_translator(), open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        for name in names:
+            factory = BENCHMARKS[name]
+            with rollback() if factory.transactional else nullcontext():
+                run = factory(corpus)
+                try:
+                    run()  # прогрев
+                    timings = []
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        run()
+                        timings.append(time.perf_counter() - start)
+                finally:
+                    # Остановка ресурсов бенчмарка (например, серверов-заглушек)
+                    if getattr(run, 'close', None):
+                        run.close()
+            results[name] = summarize(timings, len(corpus))
+            if getattr(run, 'extra', None):
+                results[name]['extra'] = dict(run.extra)
+
+    return {
+        'meta': {
+            'timestamp': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'corpus_size': len(corpus),
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare_with_baseline(results, baseline):
+    """Сравнивает медианы с базовым прогоном: {имя: (было, стало, изменение в %)}"""
+    comparison = {}
+    for name, current in results['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous or not previous.get('median'):
+            continue
+        change = (current['median'] - previous['median']) / previous['median'] * 100
+        comparison[name] = (previous['median'], current['median'], change)
+    return comparison
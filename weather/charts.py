@@ -0,0 +1,298 @@
+"""
+Прореженные графики временных рядов (солнечный ветер за 24 ч, 7 и 27 дней).
+
+Отдавать клиенту сырые отсчеты за длинное окно дорого: за 27 дней это
+десятки тысяч точек на поле. График строится из двух частей:
+
+* полосы min/mean/max по столбцам ширины графика (экстремумы не теряются);
+* линия, прореженная алгоритмом LTTB (Largest-Triangle-Three-Buckets) до
+  ширины графика в пикселях — форма кривой сохраняется лучше, чем при
+  простом усреднении.
+
+Для длинных окон исходными данными служат грубые разрешения (агрегаты за
+5 минут и за час), которые считаются по суткам UTC. В кэш попадают только
+закрытые сутки (старше последнего отсчета ряда на ROLLUP_SETTLE): текущие
+сутки еще пополняются, причем загрузкой в другом процессе (run_fetchers),
+о которой локальный кэш веб-воркера не знает. Загрузка в этом процессе
+дополнительно сбрасывает агрегаты затронутых суток (invalidate_rollups).
+Готовые графики окон кэшируются на CHART_CACHE_TTL с выравниванием конца
+окна до минуты; ключ включает состояние ряда в базе (series_state), поэтому
+новые отсчеты из любого процесса меняют ключ. Вычисления — векторные
+операции NumPy.
+"""
+
+import math
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils import timezone
+
+from .timeseries import read_window
+
+
+# Грубые разрешения, секунд (от крупного к мелкому); мельче — сырые отсчеты
+ROLLUP_RESOLUTIONS = (3600, 300)
+ROLLUP_TTL = 7 * 24 * 3600
+# Сутки считаются закрытыми, когда последний отсчет ряда новее их конца на столько секунд
+# (запоздавшие отсчеты NOAA приходят в пересекающихся выгрузках)
+ROLLUP_SETTLE = 3 * 3600
+
+CHART_WINDOWS = {
+    '24h': timedelta(days=1),
+    '7d': timedelta(days=7),
+    '27d': timedelta(days=27),
+}
+CHART_ALIGN = 60  # конец окна выравнивается до минуты, чтобы ответы кэшировались
+CHART_CACHE_TTL = 300
+DEFAULT_CHART_WIDTH = 800
+MAX_CHART_WIDTH = 4000
+DAY = 24 * 3600
+
+
+class Buckets:
+    """
+    Агрегаты ряда: начало интервала, min, max, сумма и число значений.
+
+    Сырые отсчеты тоже представляются так (интервал из одного отсчета),
+    поэтому дальнейшая обработка одинакова для любого разрешения.
+    """
+
+    def __init__(self, times, minimum, maximum, total, count):
+        self.times = times
+        self.min = minimum
+        self.max = maximum
+        self.sum = total
+        self.count = count
+
+    def __len__(self):
+        return len(self.times)
+
+    @classmethod
+    def from_samples(cls, times, values):
+        """Сырые отсчеты одного поля; NaN отбрасываются"""
+        mask = ~np.isnan(values)
+        times, values = times[mask], values[mask]
+        return cls(times, values, values, values, np.ones(len(values), dtype=np.int64))
+
+    @classmethod
+    def concatenate(cls, parts):
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return cls.empty()
+        return cls(*(
+            np.concatenate([getattr(part, name) for part in parts])
+            for name in ('times', 'min', 'max', 'sum', 'count')
+        ))
+
+    @classmethod
+    def empty(cls):
+        return cls(*(np.empty(0) for _ in range(4)), np.empty(0, dtype=np.int64))
+
+    @property
+    def mean(self):
+        return self.sum / self.count
+
+    def between(self, start, end):
+        """Интервалы с началом в [start, end)"""
+        mask = (self.times >= start) & (self.times < end)
+        return Buckets(self.times[mask], self.min[mask], self.max[mask], self.sum[mask], self.count[mask])
+
+    def regroup(self, origin, step):
+        """
+        Объединяет интервалы в более крупные шириной step секунд от origin.
+
+        Времена отсортированы, поэтому номера групп не убывают и агрегаты
+        считаются через reduceat по границам групп без цикла на Python.
+        """
+        if not len(self):
+            return Buckets.empty()
+        groups = np.floor((self.times - origin) / step).astype(np.int64)
+        keys, starts = np.unique(groups, return_index=True)
+        return Buckets(
+            origin + keys * step,
+            np.minimum.reduceat(self.min, starts),
+            np.maximum.reduceat(self.max, starts),
+            np.add.reduceat(self.sum, starts),
+            np.add.reduceat(self.count, starts),
+        )
+
+
+def day_start(value):
+    """Начало суток UTC (секунды Unix)"""
+    return float(int(value) // DAY * DAY)
+
+
+def rollup_key(model, resolution, day):
+    return f"ts-rollup:{model._meta.label_lower}:{resolution}:{int(day)}"
+
+
+def compute_day_rollup(model, day, resolution):
+    """Агрегаты всех полей ряда за сутки UTC с шагом resolution"""
+    window = read_window(model, day, day + DAY)
+    return {
+        name: Buckets.from_samples(window.times, window[name]).regroup(day, resolution)
+        for name in model.VALUE_FIELDS
+    }
+
+
+def rollup_window(model, field, start, end, resolution, latest=None):
+    """
+    Агрегаты поля за [start, end) из кэша по суткам (недостающие сутки считаются).
+
+    latest — время последнего отсчета ряда (секунды Unix, по умолчанию из базы);
+    сутки, не закрытые относительно него, считаются заново и не кэшируются.
+    """
+    if latest is None:
+        latest = series_state(model)[1]
+    days = np.arange(day_start(start), end, DAY)
+    keys = {rollup_key(model, resolution, day): day for day in days}
+    cached = cache.get_many([key for key, day in keys.items() if day + DAY + ROLLUP_SETTLE <= latest])
+
+    missing = {}
+    for key, day in keys.items():
+        if key not in cached:
+            cached[key] = compute_day_rollup(model, day, resolution)
+            if day + DAY + ROLLUP_SETTLE <= latest:
+                missing[key] = cached[key]
+    if missing:
+        cache.set_many(missing, ROLLUP_TTL)
+    return Buckets.concatenate(cached[key][field] for key in keys).between(start, end)
+
+
+def generation_key(model):
+    return f"ts-generation:{model._meta.label_lower}"
+
+
+def series_state(model):
+    """
+    Состояние ряда для ключей кэша: (поколение, время последнего отсчета, последний id).
+
+    Поколение меняется при загрузке в этом процессе, время последнего отсчета
+    и последний id — при загрузке в любом процессе (догруженные задним числом
+    отсчеты получают новый id). Максимумы берутся отдельными запросами: SQLite
+    читает из индекса только одиночный MAX, а два в одном запросе — просмотром таблицы.
+    """
+    latest = model.objects.aggregate(value=Max('time_tag'))['value']
+    last_id = model.objects.aggregate(value=Max('id'))['value']
+    return cache.get(generation_key(model), 0), latest.timestamp() if latest else 0, last_id or 0
+
+
+def invalidate_rollups(model, time_tags):
+    """Сбрасывает кэш агрегатов для суток, в которые попали новые отсчеты, и готовые графики"""
+    days = {day_start(time_tag.timestamp()) for time_tag in time_tags}
+    cache.delete_many([
+        rollup_key(model, resolution, day)
+        for resolution in ROLLUP_RESOLUTIONS
+        for day in days
+    ])
+    # Новое поколение ряда: ключи готовых графиков меняются
+    cache.set(generation_key(model), time.time_ns(), None)
+
+
+def choose_resolution(duration, width):
+    """Самое грубое разрешение, которое еще дает не меньше width точек (None — сырые)"""
+    for resolution in ROLLUP_RESOLUTIONS:
+        if duration / resolution >= width:
+            return resolution
+    return None
+
+
+def lttb(x, y, threshold):
+    """
+    Прореживание Largest-Triangle-Three-Buckets до threshold точек.
+
+    Первая и последняя точки сохраняются; из каждой корзины берется точка,
+    образующая наибольший треугольник с предыдущей выбранной точкой и
+    средним следующей корзины. Возвращает индексы выбранных точек.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = (np.arange(threshold - 1) * (n - 2) / (threshold - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+    # Средние всех корзин сразу (через накопленные суммы); корзина i + 1 — следующая для i
+    bounds = np.append(edges, n)
+    cum_x = np.concatenate(([0.0], np.cumsum(x)))
+    cum_y = np.concatenate(([0.0], np.cumsum(y)))
+    sizes = bounds[2:] - bounds[1:-1]
+    avg_x = (cum_x[bounds[2:]] - cum_x[bounds[1:-1]]) / sizes
+    avg_y = (cum_y[bounds[2:]] - cum_y[bounds[1:-1]]) / sizes
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = bounds[i], bounds[i + 1]
+        xa, ya = x[a], y[a]
+        area = np.abs((xa - avg_x[i]) * (y[start:end] - ya) - (xa - x[start:end]) * (avg_y[i] - ya))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def rounded(values):
+    return [round(float(value), 3) for value in values]
+
+
+def build_chart(model, field, start, end, width=DEFAULT_CHART_WIDTH, latest=None):
+    """
+    Данные графика поля ряда за [start, end) (секунды Unix) шириной width пикселей.
+
+    latest — время последнего отсчета ряда для rollup_window, если уже известно.
+
+    Возвращает полосы min/mean/max по width столбцам и линию LTTB из width точек.
+    """
+    duration = end - start
+    resolution = choose_resolution(duration, width)
+    if resolution is None:
+        window = read_window(model, start, end, fields=[field])
+        source = Buckets.from_samples(window.times, window[field])
+    else:
+        source = rollup_window(model, field, start, end, resolution, latest)
+
+    columns = source.regroup(start, duration / width)
+    means = source.mean
+    line = lttb(source.times, means, width)
+
+    return {
+        'field': field,
+        'start': int(start),
+        'end': int(end),
+        'width': width,
+        'resolution': resolution or 'raw',
+        'points': len(source),
+        'buckets': {
+            'time': [int(value) for value in columns.times],
+            'min': rounded(columns.min),
+            'mean': rounded(columns.mean),
+            'max': rounded(columns.max),
+        },
+        'series': {
+            'time': [int(value) for value in source.times[line]],
+            'value': rounded(means[line]),
+        },
+    }
+
+
+def chart_window(name, now=None):
+    """(start, end) в секундах Unix для окна '24h', '7d' или '27d', заканчивающегося сейчас"""
+    end = math.ceil((now or timezone.now()).timestamp() / CHART_ALIGN) * CHART_ALIGN
+    return end - CHART_WINDOWS[name].total_seconds(), end
+
+
+def cached_chart(model, field, name, width=DEFAULT_CHART_WIDTH, now=None):
+    """График окна name из кэша (строится через build_chart при промахе)"""
+    start, end = chart_window(name, now)
+    generation, latest, last_id = series_state(model)
+    key = f"ts-chart:{model._meta.label_lower}:{generation}:{latest}:{last_id}:{field}:{width}:{int(end)}:{name}"
+    chart = cache.get(key)
+    if chart is None:
+        chart = build_chart(model, field, start, end, width, latest)
+        chart['window'] = name
+        cache.set(key, chart, CHART_CACHE_TTL)
+    return chart
+
@@ -0,0 +1,93 @@
+"""
+Условные ответы (ETag / Last-Modified) для страниц панели.
+
+Версия страницы вычисляется дешево и до основной работы представления:
+время последнего изменения данных (одно чтение маленькой таблицы
+IngestState, см. touch_content_version), версии источников NOAA из
+SourceSnapshot и параметры страницы. Если клиент прислал совпадающий If-None-Match,
+condition() отвечает 304 без запросов к таблицам алертов и к NOAA.
+
+Публичные страницы без форм получают Cache-Control: public с коротким
+s-maxage, чтобы их мог кэшировать пограничный прокси Render. Страницы с
+формами (CSRF-токен) и с ожидающими flash-сообщениями — только private.
+"""
+
+import hashlib
+from functools import wraps
+
+from django.db.models import Max
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .models import IngestState
+
+
+def content_version(request=None):
+    """Время последнего изменения данных (запоминается на запросе)"""
+    if request is not None and hasattr(request, '_content_version'):
+        return request._content_version
+    version = IngestState.objects.aggregate(latest=Max('updated_at'))['latest']
+    if request is not None:
+        request._content_version = version
+    return version
+
+
+def has_pending_messages(request):
+    """Есть ли у запроса непоказанные flash-сообщения (без их чтения)"""
+    storage = getattr(request, '_messages', None)
+    return storage is not None and len(storage) > 0
+
+
+def version_etag(parts):
+    """ETag из частей версии"""
+    return hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()[:20]
+
+
+def conditional_page(page_version, public_max_age=None):
+    """
+    Декоратор условных ответов для страницы.
+
+    page_version(request, *args, **kwargs) возвращает (last_modified, части
+    версии) или None, если версию нельзя узнать без основной работы
+    (тогда ETag выставляется уже по готовому ответу). public_max_age —
+    сколько секунд прокси и браузер могут хранить страницу без проверки.
+    """
+    def cached_version(request, *args, **kwargs):
+        if has_pending_messages(request):
+            return None
+        if not hasattr(request, '_page_version'):
+            request._page_version = page_version(request, *args, **kwargs)
+        return request._page_version
+
+    def etag_func(request, *args, **kwargs):
+        version = cached_version(request, *args, **kwargs)
+        return version_etag(version[1]) if version else None
+
+    def last_modified_func(request, *args, **kwargs):
+        version = cached_version(request, *args, **kwargs)
+        return version[0] if version else None
+
+    def decorator(view):
+        conditional_view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if request.method not in ('GET', 'HEAD') or response.status_code not in (200, 304):
+                return response
+
+            if response.status_code == 200 and not response.has_header('ETag'):
+                # Версия появилась только во время работы представления (например, снимок NOAA)
+                for attr in ('_page_version', '_content_version'):
+                    request.__dict__.pop(attr, None)
+                version = cached_version(request, *args, **kwargs)
+                if version:
+                    response.headers['ETag'] = f'"{version_etag(version[1])}"'
+
+            if public_max_age and not has_pending_messages(request):
+                patch_cache_control(response, public=True, max_age=public_max_age, s_maxage=public_max_age)
+            else:
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
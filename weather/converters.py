@@ -0,0 +1,21 @@
+"""
+Конвертеры URL.
+
+Алерты хранятся в нескольких таблицах, поэтому их id пересекаются; в URL
+алерт адресуется типизированным идентификатором <семейство>-<id> (например
+k-42), и представление сразу обращается к нужной таблице.
+"""
+
+from .models import ALERT_KINDS
+
+
+class AlertKindConverter:
+    regex = '|'.join(sorted(ALERT_KINDS, key=len, reverse=True))
+
+    def to_python(self, value):
+        return value
+
+    def to_url(self, value):
+        if value not in ALERT_KINDS:
+            raise ValueError(f"Неизвестное семейство алертов: {value}")
+        return value
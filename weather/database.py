@@ -0,0 +1,33 @@
+"""
+Настройка соединений с базой данных.
+
+Для SQLite при каждом новом соединении применяются PRAGMA из
+settings.SQLITE_PRAGMAS (WAL, synchronous, busy_timeout, mmap_size, ...):
+часть из них действует только в пределах соединения, поэтому задать их
+один раз в файле базы нельзя.
+"""
+
+from django.conf import settings
+
+
+def configure_sqlite_connection(sender, connection, **kwargs):
+    """Обработчик connection_created: применяет PRAGMA к соединению SQLite"""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            # Для базы в памяти (тесты) WAL недоступен, SQLite молча оставит режим memory
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def sqlite_pragma_values(connection, names=None):
+    """Текущие значения PRAGMA соединения (для проверки профиля)"""
+    names = names or list(getattr(settings, 'SQLITE_PRAGMAS', {}))
+    values = {}
+    with connection.cursor() as cursor:
+        for name in names:
+            cursor.execute(f"PRAGMA {name}")
+            row = cursor.fetchone()
+            values[name] = row[0] if row else None
+    return values
@@ -0,0 +1,461 @@
+"""
+Загрузка продуктов NOAA SWPC по расписанию.
+
+Каждый источник (шкалы R/S/G, алерты, солнечный ветер, прогноз Kp на три
+дня, индекс Kp, рентгеновский и протонный потоки GOES, магнитометр GOES)
+имеет свой интервал обновления, таймаут и слот параллельности: в слоте
+одновременно выполняется не больше FETCH_SLOTS[слот] загрузок. Планировщик
+(python manage.py run_fetchers) запускает источники по мере наступления
+срока и сохраняет разобранные данные в SourceSnapshot — по строке на
+источник с хешем данных в качестве версии.
+
+Страницы и API только читают сохраненный снимок (load_snapshot), поэтому
+просмотр страницы не обращается к NOAA. Ошибка или таймаут источника
+записываются в его строку, а данные последней удачной загрузки остаются.
+"""
+
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.utils import timezone
+
+from utils.proxy_utils import make_request_with_proxy
+from .live import publish_scales
+from .models import KpIndexSample, SolarWindPlasmaSample, SourceSnapshot
+from .timeseries import ingest_time_series
+
+
+SWPC_URL = 'https://services.swpc.noaa.gov'
+
+# Слоты параллельности: сколько загрузок слота идет одновременно
+FETCH_SLOTS = {
+    'products': 2,  # сводные продукты /products/
+    'goes': 2,  # ряды спутников GOES /json/goes/
+}
+FETCH_TIMEOUT = 10  # секунд на загрузку по умолчанию
+FETCH_ERROR_RETRY = 60  # секунд до повтора после ошибки (если интервал источника больше)
+FETCH_TICK = 1  # секунд между проверками сроков
+STALE_INTERVALS = 3  # данные устарели, если не обновлялись столько интервалов подряд
+
+# Снимок всех источников в кэше процесса: страница читает базу не чаще раза в SNAPSHOT_CACHE_TTL
+SNAPSHOT_CACHE_KEY = 'noaa-sources-snapshot'
+SNAPSHOT_CACHE_TTL = 5
+
+
+class FetchError(Exception):
+    """NOAA вернул ошибку или неожиданный ответ"""
+
+
+class Source:
+    """
+    Продукт NOAA: адрес, интервал обновления, таймаут и слот параллельности.
+
+    parse(raw) превращает ответ NOAA в данные снимка (ValueError — ответ не
+    подходит); store(raw, data) — необязательная запись после сохранения
+    снимка (история рядов, живые события).
+    """
+
+    def __init__(self, name, url, interval, parse, timeout=FETCH_TIMEOUT, slot='products', store=None):
+        self.name = name
+        self.url = url
+        self.interval = interval
+        self.parse = parse
+        self.timeout = timeout
+        self.slot = slot
+        self.store = store
+
+    def __repr__(self):
+        return f"<Source {self.name}>"
+
+    async def fetch(self):
+        status, raw = await make_request_with_proxy(self.url)
+        if status != 200 or (isinstance(raw, dict) and 'error' in raw):
+            message = raw.get('message') if isinstance(raw, dict) else None
+            raise FetchError(message or f"API ошибка {status}")
+        return raw
+
+
+# --- Разбор продуктов ---
+
+def translate_condition_text(text):
+    """Переводит английские значения на русский"""
+    translations = {
+        'none': 'нет',
+        'minor': 'слабые',
+        'moderate': 'умеренные',
+        'strong': 'сильные',
+        'severe': 'очень сильные',
+        'extreme': 'экстремальные'
+    }
+    return translations.get(text.lower() if text else '', text)
+
+
+# Ключи noaa-scales.json -> безопасные имена для шаблонов
+CONDITION_KEYS = {
+    '-1': 'past_24h',
+    '0': 'current',
+    '1': 'today_forecast',
+    '2': 'tomorrow_forecast',
+    '3': 'day_after_forecast',
+}
+
+
+def table_rows(raw):
+    """Строки продукта SWPC как словари: таблица с заголовком или список объектов"""
+    if not isinstance(raw, list):
+        raise ValueError("Ожидался список")
+    if raw and isinstance(raw[0], list):
+        header = raw[0]
+        return [dict(zip(header, row)) for row in raw[1:] if isinstance(row, list)]
+    return [row for row in raw if isinstance(row, dict)]
+
+
+def to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def latest_row(rows, field, **match):
+    """Последняя строка с числом в field (и полями, равными match)"""
+    for row in reversed(rows):
+        if all(row.get(name) == value for name, value in match.items()) and to_float(row.get(field)) is not None:
+            return row
+    raise ValueError(f"Нет значений {field}")
+
+
+def parse_conditions(raw):
+    """Шкалы R/S/G: наблюдения за сутки, текущие и прогноз на три дня"""
+    if not isinstance(raw, dict):
+        raise ValueError("Ожидался объект шкал")
+    conditions = {}
+    for key, value in raw.items():
+        if isinstance(value, dict):
+            value = {name: dict(item) if isinstance(item, dict) else item for name, item in value.items()}
+            for scale in ('R', 'S', 'G'):
+                if isinstance(value.get(scale), dict) and 'Text' in value[scale]:
+                    value[scale]['Text'] = translate_condition_text(value[scale]['Text'])
+        conditions[CONDITION_KEYS.get(key, key)] = value
+    return conditions
+
+
+def parse_alerts(raw):
+    if not isinstance(raw, list):
+        raise ValueError("Ожидался список алертов")
+    return raw
+
+
+def parse_solar_wind(raw):
+    """Три последних отсчета плазмы (таблица с заголовком)"""
+    if not isinstance(raw, list) or len(raw) < 2:
+        raise ValueError("Пустая таблица плазмы")
+    result = [['time_tag', 'density', 'speed', 'temperature']]
+    for row in raw[1:][-3:]:
+        if isinstance(row, list) and len(row) >= 4:
+            result.append([str(value) for value in row[:4]])
+    return result
+
+
+def parse_forecast(raw):
+    """Прогноз Kp на три дня: максимум Kp и шкала G по суткам UTC"""
+    days = OrderedDict()
+    for row in table_rows(raw):
+        kp = to_float(row.get('kp', row.get('Kp')))
+        if row.get('observed') != 'predicted' or kp is None:
+            continue
+        date = str(row.get('time_tag', ''))[:10]
+        day = days.setdefault(date, {'date': date, 'kp_max': kp, 'noaa_scale': None})
+        day['kp_max'] = max(day['kp_max'], kp)
+        scale = row.get('noaa_scale')
+        if scale and (day['noaa_scale'] is None or scale > day['noaa_scale']):
+            day['noaa_scale'] = scale
+    if not days:
+        raise ValueError("В прогнозе нет предсказанных значений Kp")
+    return list(days.values())[:3]
+
+
+def parse_kp_index(raw):
+    """Последнее значение планетарного индекса Kp и значения за сутки (8 трехчасовых интервалов)"""
+    rows = [
+        {'time_tag': str(row.get('time_tag')), 'kp': to_float(row.get('Kp', row.get('kp')))}
+        for row in table_rows(raw)
+    ]
+    rows = [row for row in rows if row['kp'] is not None]
+    if not rows:
+        raise ValueError("Нет значений Kp")
+    return {**rows[-1], 'recent': rows[-8:]}
+
+
+# Классы вспышек по потоку 0.1-0.8 нм, Вт/м²
+FLARE_CLASSES = (('X', 1e-4), ('M', 1e-5), ('C', 1e-6), ('B', 1e-7), ('A', 1e-8))
+
+
+def flare_class(flux):
+    """Класс рентгеновской вспышки по потоку (например, C2.3)"""
+    for letter, base in FLARE_CLASSES:
+        if flux >= base:
+            return f"{letter}{flux / base:.1f}"
+    return f"A{flux / 1e-8:.1f}"
+
+
+def parse_xray_flux(raw):
+    """Текущий поток GOES 0.1-0.8 нм и максимум за 6 часов с классами вспышек"""
+    rows = [row for row in table_rows(raw) if row.get('energy') == '0.1-0.8nm' and to_float(row.get('flux')) is not None]
+    latest = latest_row(rows, 'flux')
+    flux = to_float(latest['flux'])
+    peak = max(to_float(row['flux']) for row in rows)
+    return {
+        'time_tag': latest.get('time_tag'),
+        'satellite': latest.get('satellite'),
+        'flux': flux,
+        'flare_class': flare_class(flux),
+        'peak_class': flare_class(peak),
+    }
+
+
+# Пороги шкалы S по потоку протонов >=10 МэВ, pfu
+PROTON_SCALE_THRESHOLDS = ((5, 1e5), (4, 1e4), (3, 1e3), (2, 100), (1, 10))
+
+
+def proton_scale(flux):
+    for level, threshold in PROTON_SCALE_THRESHOLDS:
+        if flux >= threshold:
+            return f"S{level}"
+    return 'S0'
+
+
+def parse_proton_flux(raw):
+    """Текущий интегральный поток протонов >=10 МэВ и уровень шкалы S"""
+    latest = latest_row(table_rows(raw), 'flux', energy='>=10 MeV')
+    flux = to_float(latest['flux'])
+    return {
+        'time_tag': latest.get('time_tag'),
+        'satellite': latest.get('satellite'),
+        'flux': flux,
+        'noaa_scale': proton_scale(flux),
+    }
+
+
+def parse_magnetometer(raw):
+    """Последнее измерение магнитометра GOES (компоненты Hp, He, Hn и модуль, нТл)"""
+    latest = latest_row(table_rows(raw), 'Hp')
+    return {
+        'time_tag': latest.get('time_tag'),
+        'satellite': latest.get('satellite'),
+        **{name.lower(): to_float(latest.get(name)) for name in ('Hp', 'He', 'Hn', 'total')},
+    }
+
+
+def store_conditions(raw, data):
+    publish_scales(data)
+
+
+def store_solar_wind(raw, data):
+    # Копим историю плазмы: отсчеты дедуплицируются по time_tag
+    ingest_time_series(SolarWindPlasmaSample, raw)
+
+
+def store_kp_index(raw, data):
+    # История Kp и ap для статистики (weather/kp_stats.py)
+    ingest_time_series(KpIndexSample, raw)
+
+
+SOURCES = OrderedDict((source.name, source) for source in (
+    Source('current_conditions', f"{SWPC_URL}/products/noaa-scales.json", 60, parse_conditions, store=store_conditions),
+    Source('alerts', f"{SWPC_URL}/products/alerts.json", 120, parse_alerts),
+    Source('solar_wind', f"{SWPC_URL}/products/solar-wind/plasma-5-minute.json", 60, parse_solar_wind, store=store_solar_wind),
+    Source('forecast', f"{SWPC_URL}/products/noaa-planetary-k-index-forecast.json", 1800, parse_forecast),
+    Source('kp_index', f"{SWPC_URL}/products/noaa-planetary-k-index.json", 600, parse_kp_index, store=store_kp_index),
+    Source('xray_flux', f"{SWPC_URL}/json/goes/primary/xrays-6-hour.json", 60, parse_xray_flux, timeout=15, slot='goes'),
+    Source('proton_flux', f"{SWPC_URL}/json/goes/primary/integral-protons-6-hour.json", 300, parse_proton_flux, timeout=15, slot='goes'),
+    Source('magnetometer', f"{SWPC_URL}/json/goes/primary/magnetometers-6-hour.json", 300, parse_magnetometer, timeout=15, slot='goes'),
+))
+
+
+# --- Сохранение и чтение снимка ---
+
+def data_digest(data):
+    return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def save_source_data(name, data, now=None):
+    """Сохраняет удачную загрузку источника; версия меняется, только если изменились данные"""
+    now = now or timezone.now()
+    digest = data_digest(data)
+    snapshot, _ = SourceSnapshot.objects.get_or_create(source=name)
+    if snapshot.digest != digest:
+        snapshot.data, snapshot.digest, snapshot.changed_at = data, digest, now
+    snapshot.fetched_at = snapshot.checked_at = now
+    snapshot.status, snapshot.error = SourceSnapshot.STATUS_OK, ''
+    snapshot.save()
+    cache.delete(SNAPSHOT_CACHE_KEY)
+    return snapshot
+
+
+def save_source_error(name, error, now=None):
+    """Записывает ошибку источника, не трогая данные последней удачной загрузки"""
+    SourceSnapshot.objects.update_or_create(source=name, defaults={
+        'checked_at': now or timezone.now(), 'status': SourceSnapshot.STATUS_ERROR, 'error': error[:1000],
+    })
+    cache.delete(SNAPSHOT_CACHE_KEY)
+
+
+def store_source(source, raw, data):
+    close_old_connections()
+    save_source_data(source.name, data)
+    if source.store:
+        try:
+            source.store(raw, data)
+        except Exception as e:
+            print(f"Ошибка сохранения {source.name}: {e}")
+
+
+def record_source_error(source, error):
+    close_old_connections()
+    print(f"Ошибка загрузки {source.name}: {error}")
+    save_source_error(source.name, error)
+
+
+def build_snapshot(rows, now=None):
+    """Снимок из строк SourceSnapshot: данные и состояние по источникам"""
+    now = now or timezone.now()
+    snapshot = {'data': {}, 'sources': {}}
+    for row in rows:
+        source = SOURCES.get(row['source'])
+        stale_after = timedelta(seconds=source.interval * STALE_INTERVALS) if source else None
+        if row['data'] is not None:
+            snapshot['data'][row['source']] = row['data']
+        snapshot['sources'][row['source']] = {
+            'digest': row['digest'],
+            'fetched_at': row['fetched_at'],
+            'changed_at': row['changed_at'],
+            'status': row['status'],
+            'error': row['error'],
+            'stale': bool(stale_after and row['fetched_at'] and row['fetched_at'] < now - stale_after),
+        }
+    snapshot['changed_at'], snapshot['version'] = sources_version(snapshot, snapshot['sources'])
+    return snapshot
+
+
+def load_snapshot():
+    """
+    Снимок всех источников для страниц и API; None — загрузок еще не было.
+
+    Одно чтение SourceSnapshot, результат хранится в кэше процесса
+    SNAPSHOT_CACHE_TTL секунд. data — данные по источникам, sources —
+    состояние источников (время загрузки, ошибка, устаревание), version —
+    хеш версий всех источников, changed_at — время последнего изменения.
+    """
+    snapshot = cache.get(SNAPSHOT_CACHE_KEY)
+    if snapshot is None:
+        snapshot = build_snapshot(SourceSnapshot.objects.values(
+            'source', 'data', 'digest', 'fetched_at', 'changed_at', 'status', 'error',
+        ))
+        cache.set(SNAPSHOT_CACHE_KEY, snapshot, SNAPSHOT_CACHE_TTL)
+    return snapshot if snapshot['data'] else None
+
+
+def sources_version(snapshot, names):
+    """(время последнего изменения, хеш версий) для набора источников снимка"""
+    states = [(name, snapshot['sources'][name]) for name in sorted(names) if name in snapshot['sources']]
+    changed_at = max((state['changed_at'] for _, state in states if state['changed_at']), default=None)
+    parts = [f"{name}:{state['digest']}:{state['status']}:{state['stale']}" for name, state in states]
+    return changed_at, hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+
+# --- Планировщик ---
+
+class FetchScheduler:
+    """
+    Запускает загрузку источников по мере наступления срока.
+
+    Срок следующей загрузки — начало предыдущей плюс интервал источника
+    (после ошибки — не позже чем через FETCH_ERROR_RETRY секунд). Источник
+    не запускается повторно, пока не закончилась его предыдущая загрузка,
+    а таймаут источника не включает ожидание места в слоте.
+    """
+
+    def __init__(self, sources=None, slots=None):
+        self.sources = list(sources or SOURCES.values())
+        self.slot_sizes = slots or FETCH_SLOTS
+        self.slots = {}
+        self.next_run = {}
+        self.running = {}
+
+    def retry_delay(self, source, ok):
+        return timedelta(seconds=source.interval if ok else min(source.interval, FETCH_ERROR_RETRY))
+
+    def load_state(self):
+        """Сроки по времени последних попыток из базы: после перезапуска свежие источники не загружаются заново"""
+        sources = {source.name: source for source in self.sources}
+        rows = SourceSnapshot.objects.filter(source__in=sources).values_list('source', 'checked_at', 'status')
+        for name, checked_at, status in rows:
+            if checked_at:
+                ok = status == SourceSnapshot.STATUS_OK
+                self.next_run[name] = checked_at + self.retry_delay(sources[name], ok)
+
+    def slot(self, source):
+        if source.slot not in self.slots:
+            self.slots[source.slot] = asyncio.Semaphore(self.slot_sizes.get(source.slot, 1))
+        return self.slots[source.slot]
+
+    async def run_source(self, source):
+        """Загружает и сохраняет один источник; True — удачно"""
+        async with self.slot(source):
+            started = timezone.now()
+            try:
+                raw = await asyncio.wait_for(source.fetch(), source.timeout)
+                data = source.parse(raw)
+            except asyncio.TimeoutError:
+                error = f"NOAA не ответил за {source.timeout} с"
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+            else:
+                error = None
+
+        stored = False
+        try:
+            if error is None:
+                await sync_to_async(store_source)(source, raw, data)
+                stored = True
+            else:
+                await sync_to_async(record_source_error)(source, error)
+        except Exception as e:
+            # Ошибка базы (например, "database is locked") не должна превращать источник в вечно просроченный
+            print(f"Ошибка сохранения {source.name}: {e}")
+        finally:
+            self.next_run[source.name] = started + self.retry_delay(source, stored)
+        return stored
+
+    def due(self, now=None):
+        """Источники, срок которых наступил и загрузка которых сейчас не идет"""
+        now = now or timezone.now()
+        return [
+            source for source in self.sources
+            if source.name not in self.running and self.next_run.get(source.name, now) <= now
+        ]
+
+    def start_due(self, now=None):
+        for source in self.due(now):
+            task = asyncio.ensure_future(self.run_source(source))
+            self.running[source.name] = task
+            task.add_done_callback(lambda _, name=source.name: self.running.pop(name, None))
+
+    async def run_once(self, names=None):
+        """Загружает источники (по умолчанию все) один раз без учета сроков; {имя: успех}"""
+        sources = [source for source in self.sources if names is None or source.name in names]
+        results = await asyncio.gather(*(self.run_source(source) for source in sources))
+        return dict(zip((source.name for source in sources), results))
+
+    async def run_forever(self):
+        await sync_to_async(self.load_state)()
+        while True:
+            self.start_due()
+            await asyncio.sleep(FETCH_TICK)
@@ -0,0 +1,75 @@
+"""
+Поля моделей.
+
+CompressedTextField хранит текст сжатым zlib в бинарной колонке: полные
+тексты алертов NOAA построены по шаблону и сжимаются примерно в полтора
+раза. Для кода поле выглядит как обычный TextField (значение — str).
+"""
+
+import zlib
+
+from django import forms
+from django.db import models
+
+
+class CompressedTextField(models.BinaryField):
+    """Текстовое поле, прозрачно сжимаемое zlib при записи в базу"""
+
+    description = "Текст, сжатый zlib"
+
+    def __init__(self, *args, compression_level=6, **kwargs):
+        self.compression_level = compression_level
+        kwargs.setdefault('editable', True)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.compression_level != 6:
+            kwargs['compression_level'] = self.compression_level
+        # BinaryField по умолчанию не редактируемое, у нас наоборот
+        if self.editable:
+            kwargs.pop('editable', None)
+        else:
+            kwargs['editable'] = False
+        return name, path, args, kwargs
+
+    def get_default(self):
+        default = super().get_default()
+        return '' if default == b'' else default
+
+    def get_internal_type(self):
+        return 'BinaryField'
+
+    def compress(self, value):
+        return zlib.compress(value.encode('utf-8'), self.compression_level)
+
+    @staticmethod
+    def decompress(value):
+        """Распаковывает значение из базы; несжатые (старые) значения возвращает как есть"""
+        if value is None or isinstance(value, str):
+            return value
+        data = bytes(value)
+        try:
+            return zlib.decompress(data).decode('utf-8')
+        except zlib.error:
+            # Строка, оставшаяся от TextField до миграции
+            return data.decode('utf-8', errors='replace')
+
+    def from_db_value(self, value, expression, connection):
+        return self.decompress(value)
+
+    def to_python(self, value):
+        if isinstance(value, (bytes, memoryview)):
+            return self.decompress(value)
+        return value
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if isinstance(value, str):
+            value = self.compress(value)
+        return super().get_db_prep_value(value, connection, prepared)
+
+    def value_to_string(self, obj):
+        return self.value_from_object(obj)
+
+    def formfield(self, **kwargs):
+        return models.Field.formfield(self, **{'form_class': forms.CharField, 'widget': forms.Textarea, **kwargs})
@@ -0,0 +1,246 @@
+"""
+Импорт алертов NOAA в базу данных.
+
+Логика вынесена из админ-панели, чтобы её можно было вызывать
+из management-команд и бенчмарков без HTTP-запроса.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+from django.db import transaction
+from django.utils import timezone
+
+from utils.translation import translate_space_weather_text
+from .models import ALERT_MODELS, IngestState, SpaceWeatherAlert
+from .alert_index import index_alerts
+from .views.noaa_views import build_alert_instance, parse_alert_message
+
+
+ALERTS_URL = 'https://services.swpc.noaa.gov/products/alerts.json'
+ALERTS_SOURCE = 'alerts'
+
+
+class IngestResult:
+    """Итог обработки одной выгрузки alerts.json"""
+
+    def __init__(self, total=0):
+        self.total = total
+        self.loaded = 0
+        self.skipped = 0
+        self.errors = []
+        self.transient_errors = 0  # из errors: сбои записи, которые стоит повторить (остальное — некорректные алерты)
+        self.unchanged = False  # выгрузка совпала с предыдущей
+        self.below_watermark = 0  # пропущено как более старые, чем high-water mark
+
+
+def alert_exists(message_code, serial_number):
+    """Проверяет, есть ли алерт с таким кодом и серийным номером в любой из таблиц"""
+    return any(
+        model.objects.filter(message_code=message_code, serial_number=serial_number).exists()
+        for model in ALERT_MODELS
+    )
+
+
+def parse_api_datetime(value):
+    """Парсит issue_datetime из API NOAA (UTC)"""
+    issue_dt = datetime.strptime(value, '%Y-%m-%d %H:%M:%S.%f')
+    return timezone.make_aware(issue_dt, dt_timezone.utc)
+
+
+def save_unparsed_alert(alert_data):
+    """Сохраняет алерт, который не удалось распарсить, с минимальными данными"""
+    message = alert_data.get('message', '')
+    product_id = alert_data.get('product_id', 'UNKNOWN')
+    issue_datetime = alert_data.get('issue_datetime', '')
+
+    issue_time = timezone.now()
+    if issue_datetime:
+        try:
+            issue_time = parse_api_datetime(issue_datetime)
+        except ValueError:
+            pass
+
+    # Создаем уникальный код на основе product_id и времени
+    message_code = product_id
+    serial_number = str(int(issue_time.timestamp()))
+
+    if alert_exists(message_code, serial_number):
+        return None
+
+    # Переводим сообщение для warning_type
+    translated_message = translate_space_weather_text(message[:200] + '...' if len(message) > 200 else message)
+
+    return SpaceWeatherAlert.objects.create(
+        message_code=message_code,
+        serial_number=serial_number,
+        issue_time=issue_time,
+        warning_type=translated_message,
+        full_message=message,
+        warning_condition='API Import',
+        noaa_scale='Неизвестно',
+        potential_impacts='Требует ручного анализа',
+    )
+
+
+def existing_alert_keys(keys):
+    """
+    Возвращает уже сохраненные пары (message_code, serial_number) из набора keys.
+
+    Один запрос на таблицу вместо пяти exists() на каждый алерт.
+    """
+    if not keys:
+        return set()
+    codes = {code for code, _ in keys}
+    serials = {serial for _, serial in keys}
+    found = set()
+    for model in ALERT_MODELS:
+        found.update(
+            model.objects.filter(message_code__in=codes, serial_number__in=serials)
+            .values_list('message_code', 'serial_number')
+        )
+    return found & set(keys)
+
+
+def write_new_alerts(alerts_by_model):
+    """
+    Записывает новые алерты пачками в одной транзакции и добавляет их в ленту.
+
+    bulk_create(ignore_conflicts=True) не возвращает первичные ключи,
+    поэтому вставленные строки перечитываются одним запросом на таблицу.
+    Перечитанные строки могли вставить параллельная загрузка; index_alerts
+    отсеивает их, и возвращаются только записанные этой загрузкой алерты.
+    """
+    saved = []
+    with transaction.atomic():
+        for model, alerts in alerts_by_model.items():
+            model.objects.bulk_create(alerts, ignore_conflicts=True)
+            keys = {(alert.message_code, alert.serial_number, alert.issue_time) for alert in alerts}
+            inserted = model.objects.filter(
+                message_code__in={alert.message_code for alert in alerts},
+                serial_number__in={alert.serial_number for alert in alerts},
+            )
+            saved.extend(
+                alert for alert in inserted
+                if (alert.message_code, alert.serial_number, alert.issue_time) in keys
+            )
+        return index_alerts(saved)
+
+
+def import_alerts(alerts_data):
+    """Парсит и сохраняет новые алерты из ответа alerts.json"""
+    result = IngestResult(total=len(alerts_data))
+
+    parsed_alerts = []
+    for alert_data in alerts_data:
+        try:
+            message = alert_data.get('message', '')
+            if not message:
+                result.errors.append("Пустое сообщение в алерте")
+                continue
+
+            parsed_data = parse_alert_message(alert_data)
+            if not parsed_data:
+                # Если парсинг не удался, сохраняем как есть с минимальными данными
+                try:
+                    if save_unparsed_alert(alert_data):
+                        result.loaded += 1
+                    else:
+                        result.skipped += 1
+                except Exception as e2:
+                    result.errors.append(f"Ошибка создания базового алерта: {str(e2)}")
+                    result.transient_errors += 1
+                continue
+
+            # Добавляем данные из API (issue_datetime)
+            if 'issue_datetime' in alert_data:
+                try:
+                    parsed_data['issue_time_from_api'] = parse_api_datetime(alert_data['issue_datetime'])
+                except (TypeError, ValueError):
+                    pass
+
+            parsed_alerts.append(parsed_data)
+        except Exception as e:
+            result.errors.append(f"Ошибка обработки алерта: {str(e)}")
+
+    # Проверяем дубликаты сразу для всей выгрузки
+    existing = existing_alert_keys({
+        (parsed.get('message_code', ''), parsed.get('serial_number', '')) for parsed in parsed_alerts
+    })
+
+    # Разбиваем новые алерты по таблицам (перевод выполняется в build_alert_instance)
+    alerts_by_model = {}
+    seen = set()
+    for parsed_data in parsed_alerts:
+        key = (parsed_data.get('message_code', ''), parsed_data.get('serial_number', ''))
+        if key in existing or key in seen:
+            result.skipped += 1
+            continue
+        seen.add(key)
+        try:
+            alert = build_alert_instance(parsed_data)
+        except Exception as e:
+            result.errors.append(f"Ошибка обработки алерта: {str(e)}")
+            continue
+        if alert.issue_time is None:
+            result.errors.append(f"Ошибка обработки алерта {key[0]}-{key[1]}: нет Issue Time")
+            continue
+        alerts_by_model.setdefault(type(alert), []).append(alert)
+
+    if alerts_by_model:
+        result.loaded += len(write_new_alerts(alerts_by_model))
+
+    return result
+
+
+def ingest_alerts_payload(raw_payload, source=ALERTS_SOURCE, full=False):
+    """
+    Инкрементальная загрузка сырого ответа alerts.json.
+
+    Идентичная предыдущей выгрузка пропускается сразу (по SHA-256),
+    иначе обрабатываются только алерты не старше сохраненного high-water mark.
+    full=True принудительно обрабатывает всю выгрузку.
+    """
+    digest = hashlib.sha256(raw_payload).hexdigest()
+    state, _ = IngestState.objects.get_or_create(source=source)
+
+    if not full and state.payload_digest == digest:
+        result = IngestResult()
+        result.unchanged = True
+        return result
+
+    alerts_data = json.loads(raw_payload)
+    watermark = None if full else state.high_water_mark
+
+    newest = state.high_water_mark
+    pending = []
+    for alert_data in alerts_data:
+        try:
+            issued = parse_api_datetime(alert_data.get('issue_datetime', ''))
+        except (AttributeError, TypeError, ValueError):
+            # Без времени выпуска алерт нельзя сравнить с отметкой — обрабатываем
+            pending.append(alert_data)
+            continue
+        if newest is None or issued > newest:
+            newest = issued
+        # Граница включительно: алерты с тем же временем отсеет проверка дубликатов
+        if watermark is None or issued >= watermark:
+            pending.append(alert_data)
+
+    result = import_alerts(pending)
+    result.total = len(alerts_data)
+    result.below_watermark = len(alerts_data) - len(pending)
+
+    # При сбоях записи состояние не сдвигаем, чтобы следующая загрузка повторила попытку.
+    # Некорректный алерт не загрузится и при повторе: он не должен навсегда
+    # отключать инкрементальный режим, поэтому состояние сдвигается мимо него.
+    if not result.transient_errors:
+        if result.errors:
+            print(f"Загрузка {source}: пропущено некорректных алертов: {len(result.errors)} ({result.errors[0]})")
+        state.payload_digest = digest
+        state.high_water_mark = newest
+    state.updated_at = timezone.now()
+    state.save()
+    return result
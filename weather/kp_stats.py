@@ -0,0 +1,158 @@
+"""
+Статистика планетарного индекса Kp (и ap) по истории KpIndexSample.
+
+Все расчеты — векторные операции NumPy над окном ряда (отсчеты каждые
+3 часа, отсортированы по времени), поэтому окно в десятки лет
+обрабатывается за десятки миллисекунд:
+
+* суточный максимум Kp и суточный индекс Ap (среднее восьми ap);
+* скользящий максимум Kp за 24 часа на каждом отсчете;
+* число суток с бурей по уровню G суточного максимума;
+* распределение трехчасовых интервалов по уровням G0-G5.
+
+Уровень шкалы G по Kp: 5 — G1, 6 — G2, 7 — G3, 8 и 9- — G4, 9 — G5
+(Kp 5- = 4.67 — еще не буря).
+
+Чтение десятков тысяч строк из базы дороже самих расчетов, поэтому ряд
+целиком хранится в кэше в виде массивов (kp_series), а окно вырезается
+из них бинарным поиском.
+"""
+
+import numpy as np
+from django.core.cache import cache
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .charts import series_state
+from .models import KpIndexSample
+from .timeseries import TimeSeriesWindow, read_window, to_datetime
+
+
+DAY = 24 * 3600
+KP_STEP = 3 * 3600  # интервал индекса Kp, секунд
+G_LEVELS = 6  # G0-G5
+# Исправления NOAA старых значений не меняют ключ ряда, поэтому у кэша есть срок жизни
+KP_SERIES_TTL = 600
+
+
+class DailyKp:
+    """Суточные значения: начало суток UTC (секунды Unix), максимум Kp и Ap"""
+
+    def __init__(self, times, kp_max, ap):
+        self.times = times
+        self.kp_max = kp_max
+        self.ap = ap
+
+    def __len__(self):
+        return len(self.times)
+
+
+def g_levels(kp):
+    """Уровни шкалы G (0-5) по значениям Kp; NaN -> -1"""
+    levels = np.clip(np.floor(np.nan_to_num(kp, nan=0.0) + 1e-6) - 4, 0, G_LEVELS - 1).astype(np.int64)
+    return np.where(np.isnan(kp), -1, levels)
+
+
+def daily_stats(times, kp, ap):
+    """
+    Суточный максимум Kp и Ap за сутки UTC.
+
+    Номера суток отсортированных отсчетов не убывают, поэтому группы
+    считаются через reduceat по границам суток. fmax пропускает NaN;
+    Ap — среднее известных ap за сутки.
+    """
+    if not len(times):
+        return DailyKp(np.empty(0), np.empty(0), np.empty(0))
+    days, starts = np.unique((times // DAY).astype(np.int64), return_index=True)
+    kp_max = np.fmax.reduceat(kp, starts)
+    known = ~np.isnan(ap)
+    ap_sum = np.add.reduceat(np.where(known, ap, 0.0), starts)
+    ap_count = np.add.reduceat(known.astype(np.int64), starts)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ap_mean = np.where(ap_count > 0, ap_sum / ap_count, np.nan)
+    return DailyKp(days.astype(np.float64) * DAY, kp_max, ap_mean)
+
+
+def rolling_max(times, kp, window=DAY, step=KP_STEP):
+    """
+    Максимум Kp за window секунд, заканчивающийся на каждом отсчете.
+
+    Отсчеты раскладываются на регулярную сетку с шагом step (пропущенные
+    интервалы — -inf), поэтому окно по времени остается верным и при дырах
+    в ряду; максимумы окон берутся через sliding_window_view без цикла.
+    """
+    if not len(times):
+        return np.empty(0)
+    slots = np.rint((times - times[0]) / step).astype(np.int64)
+    grid = np.full(slots[-1] + 1, -np.inf)
+    grid[slots] = np.where(np.isnan(kp), -np.inf, kp)
+    width = max(1, int(round(window / step)))
+    padded = np.concatenate((np.full(width - 1, -np.inf), grid))
+    maxima = sliding_window_view(padded, width).max(axis=1)[slots]
+    return np.where(np.isneginf(maxima), np.nan, maxima)
+
+
+def storm_day_counts(kp_max):
+    """Число суток с бурей (суточный максимум Kp >= 5) всего и по уровням G"""
+    levels = g_levels(kp_max)
+    counts = np.bincount(levels[levels >= 0], minlength=G_LEVELS)
+    return {'total': int(counts[1:].sum()), **{f"G{level}": int(counts[level]) for level in range(1, G_LEVELS)}}
+
+
+def g_distribution(kp):
+    """Число и доля трехчасовых интервалов на каждом уровне G0-G5"""
+    levels = g_levels(kp)
+    counts = np.bincount(levels[levels >= 0], minlength=G_LEVELS)
+    total = int(counts.sum())
+    return {
+        f"G{level}": {'intervals': int(count), 'share': round(int(count) / total, 4) if total else 0.0}
+        for level, count in enumerate(counts)
+    }
+
+
+def rounded(values, digits=2):
+    """float64 -> список для JSON (NaN -> None)"""
+    return [None if value != value else value for value in np.round(values, digits).tolist()]
+
+
+def kp_statistics(times, kp, ap):
+    """Вся статистика окна ряда (массивы отсортированы по времени); времена — секунды Unix"""
+    daily = daily_stats(times, kp, ap)
+    return {
+        'samples': len(times),
+        'daily': {
+            'time': [int(value) for value in daily.times.tolist()],
+            'kp_max': rounded(daily.kp_max),
+            'ap': rounded(daily.ap, 1),
+        },
+        'rolling_max_24h': {
+            'time': [int(value) for value in times.tolist()],
+            'value': rounded(rolling_max(times, kp)),
+        },
+        'storm_days': storm_day_counts(daily.kp_max),
+        'g_distribution': g_distribution(kp),
+    }
+
+
+def kp_series():
+    """
+    Весь ряд KpIndexSample в массивах NumPy из кэша.
+
+    Ключ включает поколение ряда (меняется при загрузке в этом процессе),
+    время последнего отсчета и последний id (загрузка в другом процессе).
+    """
+    generation, latest, last_id = series_state(KpIndexSample)
+    key = f"kp-series:{generation}:{latest}:{last_id}"
+    series = cache.get(key)
+    if series is None:
+        window = read_window(KpIndexSample)
+        series = {'times': window.times, **window.values}
+        cache.set(key, series, KP_SERIES_TTL)
+    return TimeSeriesWindow(series['times'], {name: series[name] for name in KpIndexSample.VALUE_FIELDS})
+
+
+def window_statistics(start, end):
+    """Статистика Kp за [start, end) (datetime или секунды Unix) из кэшированного ряда"""
+    series = kp_series()
+    bounds = [to_datetime(value).timestamp() for value in (start, end)]
+    first, last = np.searchsorted(series.times, bounds)
+    return kp_statistics(series.times[first:last], series['kp'][first:last], series['ap'][first:last])
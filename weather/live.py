@@ -0,0 +1,256 @@
+"""
+Живые события для открытых страниц (Server-Sent Events через ASGI).
+
+Загрузка алертов и обновление снимка NOAA публикуют события (новый алерт,
+смена шкал R/S/G). В каждом процессе есть концентратор LiveHub, который
+раздает события подключенным клиентам: у каждого клиента своя очередь
+ограниченного размера, при переполнении старые события отбрасываются, а
+клиент получает resync и перечитывает данные через API.
+
+Способ доставки между процессами задается LIVE_EVENTS_BACKEND:
+
+* 'database' (по умолчанию) — события пишутся в LiveEvent, фоновая задача
+  каждого воркера читает новые строки раз в LIVE_POLL_INTERVAL секунд.
+  Работает при нескольких воркерах gunicorn/uvicorn на одной базе и
+  позволяет клиенту после переподключения дочитать пропущенное (Last-Event-ID);
+* 'memory' — рассылка только внутри процесса (один воркер, разработка).
+"""
+
+import asyncio
+import json
+import threading
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .models import LiveEvent, SourceSnapshot, alert_kind, alert_url
+
+
+LIVE_QUEUE_SIZE = 100  # событий на клиента
+LIVE_HEARTBEAT = 15  # секунд без событий до комментария-пинга
+LIVE_POLL_INTERVAL = 1.0  # секунд между чтениями журнала событий
+LIVE_POLL_ERROR_DELAY = 5.0  # секунд до повтора после ошибки чтения журнала
+LIVE_REPLAY_LIMIT = 100  # событий при переподключении с Last-Event-ID
+LIVE_EVENT_RETENTION = timedelta(hours=1)
+LIVE_RETRY_MS = 5000
+# Снимок, в котором хранятся последние опубликованные шкалы (журнал LiveEvent чистится)
+SCALES_SOURCE = 'current_conditions'
+
+
+def live_backend():
+    return getattr(settings, 'LIVE_EVENTS_BACKEND', 'database')
+
+
+class Subscriber:
+    """Подключенный клиент: ограниченная очередь в цикле событий его соединения"""
+
+    def __init__(self, loop, size=LIVE_QUEUE_SIZE):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=size)
+        self.overflowed = False
+        self.last_id = 0
+
+    def offer(self, event):
+        """Кладет событие в очередь (вызывается в цикле событий клиента)"""
+        if self.queue.full():
+            # Медленный клиент: теряем самое старое событие, клиент получит resync
+            self.queue.get_nowait()
+            self.overflowed = True
+        self.queue.put_nowait(event)
+
+
+class LiveHub:
+    """Раздача событий подключенным клиентам процесса"""
+
+    def __init__(self):
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.poller = None
+        self.last_scales = None  # для бэкенда memory
+
+    def subscribe(self, size=LIVE_QUEUE_SIZE):
+        subscriber = Subscriber(asyncio.get_running_loop(), size)
+        with self.lock:
+            self.subscribers.add(subscriber)
+        poller_stopped = self.poller is None or self.poller.done() or self.poller.get_loop() is not subscriber.loop
+        if live_backend() == 'database' and poller_stopped:
+            self.poller = subscriber.loop.create_task(self.poll())
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def broadcast(self, event):
+        """Раздает событие всем клиентам; можно вызывать из любого потока"""
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            subscriber.loop.call_soon_threadsafe(subscriber.offer, event)
+
+    async def poll(self):
+        """
+        Читает журнал событий, пока в процессе есть подключенные клиенты.
+
+        Ошибка чтения (например, "database is locked") не останавливает задачу:
+        после паузы LIVE_POLL_ERROR_DELAY чтение продолжается с того же last_id,
+        поэтому клиенты не теряют события.
+        """
+        last_id = None
+        while self.subscribers:
+            try:
+                if last_id is None:
+                    last_id = await sync_to_async(latest_event_id)()
+                events = await sync_to_async(events_after)(last_id)
+            except Exception as e:
+                print(f"Ошибка чтения живых событий: {e}")
+                await sync_to_async(close_broken_connection)()
+                await asyncio.sleep(LIVE_POLL_ERROR_DELAY)
+                continue
+            for event in events:
+                self.broadcast(event)
+                last_id = event['id']
+            await asyncio.sleep(LIVE_POLL_INTERVAL)
+
+
+hub = LiveHub()
+
+
+def close_broken_connection():
+    """Закрывает соединение после ошибки, чтобы следующее чтение открыло новое (кроме открытой транзакции)"""
+    if not connection.in_atomic_block:
+        close_old_connections()
+
+
+def latest_event_id():
+    return LiveEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def events_after(last_id, limit=LIVE_REPLAY_LIMIT):
+    """События журнала с id больше last_id"""
+    return [
+        {'id': row['id'], 'type': row['kind'], 'data': row['payload']}
+        for row in LiveEvent.objects.filter(id__gt=last_id).order_by('id').values('id', 'kind', 'payload')[:limit]
+    ]
+
+
+def deliver(events):
+    """Отправляет события: в журнал (database) или сразу клиентам процесса (memory)"""
+    if not events:
+        return
+    if live_backend() == 'memory':
+        for kind, payload in events:
+            hub.broadcast({'id': None, 'type': kind, 'data': payload})
+        return
+    LiveEvent.objects.bulk_create(LiveEvent(kind=kind, payload=payload) for kind, payload in events)
+    LiveEvent.objects.filter(created_at__lt=timezone.now() - LIVE_EVENT_RETENTION).delete()
+
+
+def publish(events):
+    """
+    Публикует события [(тип, данные)] после фиксации текущей транзакции.
+
+    Ошибка доставки не должна ломать загрузку алертов, поэтому она только печатается.
+    """
+    events = [(kind, json.loads(json.dumps(payload, cls=DjangoJSONEncoder))) for kind, payload in events]
+
+    def send():
+        try:
+            deliver(events)
+        except Exception as e:
+            print(f"Ошибка публикации живых событий: {e}")
+
+    transaction.on_commit(send)
+
+
+def alert_event(alert):
+    """Данные события о новом алерте (поля строки таблицы на детальной странице)"""
+    kind = alert_kind(alert)
+    return {
+        'id': f"{kind}-{alert.pk}",
+        'url': alert_url(kind, alert.pk),
+        'message_code': alert.message_code,
+        'serial_number': alert.serial_number,
+        'issue_time': alert.issue_time,
+        'noaa_scale': getattr(alert, 'noaa_scale', None),
+        'severity': alert.severity,
+        'title': alert.warning_type,
+        'summary': getattr(alert, 'potential_impacts', None) or getattr(alert, 'description', None) or '',
+    }
+
+
+def publish_new_alerts(alerts):
+    publish([('alert', alert_event(alert)) for alert in alerts])
+
+
+def current_scales(conditions):
+    """Текущие уровни шкал R/S/G из условий снимка NOAA"""
+    current = (conditions or {}).get('current') or {}
+    return {scale: (current.get(scale) or {}).get('Scale') or '0' for scale in ('R', 'S', 'G')}
+
+
+def publish_scales(conditions):
+    """Публикует смену шкал R/S/G (если уровни отличаются от последних опубликованных)"""
+    scales = current_scales(conditions)
+    if live_backend() == 'memory':
+        previous, hub.last_scales = hub.last_scales, scales
+        if scales != previous:
+            publish([('conditions', {'scales': scales, 'previous': previous})])
+        return
+
+    # Шкалы может публиковать любой процесс, а строки LiveEvent живут час:
+    # последние опубликованные уровни хранятся в снимке источника под блокировкой
+    with transaction.atomic():
+        snapshot, _ = SourceSnapshot.objects.select_for_update().get_or_create(source=SCALES_SOURCE)
+        previous = (snapshot.published or {}).get('scales')
+        if scales != previous:
+            snapshot.published = {'scales': scales}
+            snapshot.save(update_fields=['published'])
+            publish([('conditions', {'scales': scales, 'previous': previous})])
+
+
+def format_event(event):
+    """Событие в формате text/event-stream"""
+    lines = []
+    if event.get('id'):
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {event['type']}")
+    lines.append(f"data: {json.dumps(event['data'], ensure_ascii=False)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+async def event_stream(last_event_id=None, heartbeat=LIVE_HEARTBEAT):
+    """
+    Поток text/event-stream для одного клиента.
+
+    После переподключения с Last-Event-ID (бэкенд database) сначала
+    дочитываются пропущенные события из журнала. Без событий каждые
+    heartbeat секунд отправляется комментарий, чтобы прокси не закрывали соединение.
+    """
+    subscriber = hub.subscribe()
+    try:
+        yield f"retry: {LIVE_RETRY_MS}\n\n"
+        if last_event_id and live_backend() == 'database':
+            for event in await sync_to_async(events_after)(last_event_id):
+                subscriber.last_id = event['id']
+                yield format_event(event)
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if subscriber.overflowed:
+                subscriber.overflowed = False
+                yield format_event({'type': 'resync', 'data': {}})
+            if event['id'] and event['id'] <= subscriber.last_id:
+                continue  # уже отправлено при дочитывании журнала
+            subscriber.last_id = event['id'] or subscriber.last_id
+            yield format_event(event)
+    finally:
+        hub.unsubscribe(subscriber)
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from weather.retention import archive_alerts, retention_days
+
+
+class Command(BaseCommand):
+    help = 'Перенос старых алертов из рабочих таблиц в архив (политика хранения)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help=f'Архивировать алерты старше N дней (по умолчанию {retention_days()})')
+        parser.add_argument('--batch-size', type=int, default=500, help='Размер пачки (одна транзакция на пачку)')
+        parser.add_argument('--dry-run', action='store_true', help='Только посчитать, ничего не переносить')
+
+    def handle(self, *args, **options):
+        moved = archive_alerts(days=options['days'], batch_size=max(1, options['batch_size']), dry_run=options['dry_run'])
+        total = sum(moved.values())
+        details = ', '.join(f"{kind}: {count}" for kind, count in moved.items() if count)
+        verb = 'Будет перенесено' if options['dry_run'] else 'Перенесено в архив'
+        self.stdout.write(self.style.SUCCESS(f"✅ {verb} {total} алертов" + (f" ({details})" if details else "")))
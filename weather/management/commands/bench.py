@@ -0,0 +1,62 @@
+import json
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from weather.benchmarks.suite import BENCHMARKS, compare_with_baseline, load_corpus, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Бенчмарки парсинга и импорта алертов на записанном корпусе'
+
+    def add_arguments(self, parser):
+        parser.add_argument('benchmarks', nargs='*', help=f"Бенчмарки для запуска (по умолчанию все: {', '.join(BENCHMARKS)})")
+        parser.add_argument('--repeat', type=int, default=5, help='Количество замеров на бенчмарк')
+        parser.add_argument('--scale', type=int, default=1, help='Во сколько раз размножить корпус')
+        parser.add_argument('--output', help='Сохранить результаты в JSON-файл')
+        parser.add_argument('--baseline', help='JSON-файл предыдущего прогона для сравнения')
+
+    def handle(self, *args, **options):
+        names = options['benchmarks'] or list(BENCHMARKS)
+        unknown = [name for name in names if name not in BENCHMARKS]
+        if unknown:
+            raise CommandError(f"Неизвестные бенчмарки: {', '.join(unknown)}")
+
+        corpus = load_corpus(scale=max(1, options['scale']))
+
+        # Бенчмарки работают во временной тестовой базе, рабочие данные не трогаются.
+        # Для SQLite база файловая (а не в памяти), чтобы работали WAL и доступ из потоков.
+        old_name = connection.settings_dict['NAME']
+        if connection.vendor == 'sqlite':
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = os.path.join(tempfile.gettempdir(), 'cosmo_bench.sqlite3')
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            results = run_benchmarks(names, corpus, repeat=max(1, options['repeat']))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.stdout.write(f"📊 Корпус: {len(corpus)} алертов, замеров: {results['meta']['repeat']}")
+        for name, stats in results['results'].items():
+            self.stdout.write(
+                f"  {name:<10} median {stats['median'] * 1000:9.2f} ms   "
+                f"min {stats['min'] * 1000:9.2f} ms   {stats['per_op_us']:9.1f} µs/алерт"
+            )
+            if stats.get('extra'):
+                self.stdout.write("             " + ", ".join(f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}" for key, value in stats['extra'].items()))
+
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as f:
+                baseline = json.load(f)
+            self.stdout.write("\n📈 Сравнение с базовым прогоном (медиана):")
+            for name, (before, after, change) in compare_with_baseline(results, baseline).items():
+                style = self.style.ERROR if change > 10 else self.style.SUCCESS
+                self.stdout.write(style(
+                    f"  {name:<10} {before * 1000:9.2f} ms -> {after * 1000:9.2f} ms   {change:+.1f}%"
+                ))
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"✅ Результаты сохранены в {options['output']}"))
@@ -0,0 +1,30 @@
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from weather.ingest import ALERTS_URL, ingest_alerts_payload
+
+
+class Command(BaseCommand):
+    help = 'Загрузка новых алертов из NOAA API (инкрементально)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Обработать всю выгрузку, игнорируя сохраненное состояние')
+
+    def handle(self, *args, **options):
+        try:
+            response = requests.get(ALERTS_URL, timeout=10)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            raise CommandError(f"Ошибка подключения к NOAA API: {e}")
+
+        result = ingest_alerts_payload(response.content, full=options['full'])
+        if result.unchanged:
+            self.stdout.write("ℹ️ Данные NOAA не изменились с последней загрузки.")
+            return
+
+        self.stdout.write(
+            f"📊 Обработано {result.total}, загружено {result.loaded}, "
+            f"пропущено {result.skipped} (дубликаты) и {result.below_watermark} (старые), ошибок {len(result.errors)}"
+        )
+        for error in result.errors[:5]:
+            self.stdout.write(self.style.ERROR(f"  {error}"))
@@ -0,0 +1,32 @@
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from weather.timeseries import TIME_SERIES, ingest_time_series
+
+
+class Command(BaseCommand):
+    help = 'Загрузка временных рядов NOAA (плазма солнечного ветра, индекс Kp) с дедупликацией по time_tag'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--series', choices=sorted(TIME_SERIES), default='plasma', help='Временной ряд')
+        parser.add_argument('--window', default='7-day', help='Выгрузка NOAA: 5-minute, 2-hour, 1-day, 7-day')
+
+    def handle(self, *args, **options):
+        model, urls = TIME_SERIES[options['series']]
+        url = urls.get(options['window'])
+        if url is None:
+            raise CommandError(f"Неизвестное окно {options['window']}, доступны: {', '.join(urls)}")
+
+        try:
+            response = requests.get(url, timeout=30)
+            response.raise_for_status()
+            data = response.json()
+        except (requests.RequestException, ValueError) as e:
+            raise CommandError(f"Ошибка загрузки {url}: {e}")
+
+        before = model.objects.count()
+        saved = ingest_time_series(model, data)
+        added = model.objects.count() - before
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {model._meta.verbose_name_plural}: обработано {saved} отсчетов, новых {added}, всего {before + added}"
+        ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from weather.models import AlertIndex, PurgeJob
+from weather.purge import PURGE_CHUNK_SIZE, active_purge_job, run_purge_job
+
+
+class Command(BaseCommand):
+    help = 'Удаление всех алертов пачками по первичному ключу (короткие транзакции)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=PURGE_CHUNK_SIZE, help='Размер пачки')
+
+    def handle(self, *args, **options):
+        if active_purge_job():
+            raise CommandError("Очистка уже выполняется")
+        job = PurgeJob.objects.create(total=AlertIndex.objects.count())
+        job = run_purge_job(job.pk, chunk_size=max(1, options['chunk_size']))
+        if job.status == PurgeJob.STATUS_FAILED:
+            raise CommandError(f"Ошибка очистки: {job.error}")
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Удалено {job.deleted} алертов и {job.comments_deleted} комментариев"
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from weather.alert_index import rebuild_alert_index
+
+
+class Command(BaseCommand):
+    help = 'Пересоздание ленты алертов (AlertIndex), статистики и цепочек событий по всем таблицам'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            created = rebuild_alert_index()
+        self.stdout.write(self.style.SUCCESS(f"✅ В ленту добавлено {created} алертов"))
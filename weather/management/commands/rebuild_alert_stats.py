@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from weather.alert_stats import rebuild_alert_stats
+
+
+class Command(BaseCommand):
+    help = 'Пересчет статистики алертов (AlertDailyStat) по ленте алертов'
+
+    def handle(self, *args, **options):
+        rows = rebuild_alert_stats()
+        self.stdout.write(self.style.SUCCESS(f"✅ Статистика пересчитана: {rows} строк (семейство × день)"))
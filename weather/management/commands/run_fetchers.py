@@ -0,0 +1,36 @@
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand, CommandError
+
+from weather.fetchers import SOURCES, FetchScheduler
+
+
+class Command(BaseCommand):
+    help = 'Загрузка продуктов NOAA SWPC по расписанию (интервал, таймаут и слот у каждого источника)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Загрузить источники один раз и выйти')
+        parser.add_argument(
+            '--source', action='append', dest='sources', choices=list(SOURCES),
+            help='Загружать только этот источник (можно указать несколько раз)',
+        )
+
+    def handle(self, *args, **options):
+        names = options['sources']
+        scheduler = FetchScheduler([SOURCES[name] for name in names] if names else None)
+
+        if options['once']:
+            self.run_once(scheduler)
+            return
+
+        self.stdout.write(f"Планировщик NOAA: {', '.join(source.name for source in scheduler.sources)}")
+        try:
+            async_to_sync(scheduler.run_forever)()
+        except KeyboardInterrupt:
+            pass
+
+    def run_once(self, scheduler):
+        results = async_to_sync(scheduler.run_once)()
+        for name, ok in results.items():
+            self.stdout.write(f"{'✅' if ok else '❌'} {name}")
+        if not all(results.values()):
+            raise CommandError(f"Не загружено источников: {list(results.values()).count(False)}")
@@ -0,0 +1,26 @@
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+
+from weather.notifications import NotificationEngine
+
+
+class Command(BaseCommand):
+    help = 'Доставка оповещений о новых алертах по подпискам (email и вебхуки)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Доставить накопившиеся оповещения и выйти')
+
+    def handle(self, *args, **options):
+        engine = NotificationEngine()
+
+        if options['once']:
+            result = async_to_sync(engine.run)(until_idle=True)
+            for channel, sent in result['sent'].items():
+                self.stdout.write(f"{channel}: доставлено {sent}, ошибок {result['failed'][channel]}")
+            return
+
+        self.stdout.write(f"Оповещения: {', '.join(channel.name for channel in engine.channels)}")
+        try:
+            async_to_sync(engine.run)()
+        except KeyboardInterrupt:
+            pass
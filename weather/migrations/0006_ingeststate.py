@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:33
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0005_convert_to_generic_comments'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(help_text='Источник данных', max_length=50, unique=True)),
+                ('payload_digest', models.CharField(blank=True, default='', help_text='SHA-256 последней обработанной выгрузки', max_length=64)),
+                ('high_water_mark', models.DateTimeField(blank=True, help_text='Самое позднее issue_datetime среди обработанных алертов', null=True)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Время последней загрузки')),
+            ],
+            options={
+                'verbose_name': 'Состояние загрузки',
+                'verbose_name_plural': 'Состояния загрузки',
+            },
+        ),
+        migrations.RenameIndex(
+            model_name='alertcomment',
+            new_name='weather_ale_content_033126_idx',
+            old_name='weather_alertcomment_content_type_object_id_idx',
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('weather', '0006_ingeststate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField(help_text='ID предупреждения')),
+                ('issue_time', models.DateTimeField(db_index=True, help_text='Issue Time UTC')),
+                ('message_code', models.CharField(help_text='Space Weather Message Code', max_length=20)),
+                ('serial_number', models.CharField(help_text='Serial Number', max_length=10)),
+                ('noaa_scale', models.CharField(blank=True, help_text='NOAA Scale', max_length=20, null=True)),
+                ('severity', models.PositiveSmallIntegerField(default=0, help_text='Уровень серьезности по NOAA Scale (0-5)')),
+                ('valid_from', models.DateTimeField(blank=True, help_text='Начало периода действия', null=True)),
+                ('active_until', models.DateTimeField(blank=True, help_text='Окончание периода действия', null=True)),
+                ('title', models.CharField(help_text='Тип предупреждения (кратко)', max_length=200)),
+                ('summary', models.CharField(blank=True, default='', help_text='Воздействия или описание (кратко)', max_length=255)),
+                ('content_type', models.ForeignKey(help_text='Тип предупреждения', on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name': 'Запись ленты алертов',
+                'verbose_name_plural': 'Лента алертов',
+                'ordering': ['-issue_time'],
+                'unique_together': {('content_type', 'object_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Заполнение ленты алертов по уже сохраненным данным
+
+from django.db import migrations
+
+
+ALERT_MODEL_NAMES = [
+    'SpaceWeatherAlert',
+    'TypeTRadioAlert',
+    'TypeKGeomagneticAlert',
+    'TypeEElectronAlert',
+    'TypeAForecastAlert',
+]
+
+
+def scale_severity(noaa_scale):
+    if not noaa_scale:
+        return 0
+    for level in range(1, 6):
+        if f'G{level}' in noaa_scale or f'R{level}' in noaa_scale or f'S{level}' in noaa_scale:
+            return level
+    return 0
+
+
+def backfill_alert_index(apps, schema_editor):
+    """Создаем записи ленты для всех существующих алертов"""
+    AlertIndex = apps.get_model('weather', 'AlertIndex')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+
+    for model_name in ALERT_MODEL_NAMES:
+        model = apps.get_model('weather', model_name)
+        content_type, _ = ContentType.objects.get_or_create(app_label='weather', model=model_name.lower())
+        entries = []
+        for alert in model.objects.all().iterator():
+            noaa_scale = getattr(alert, 'noaa_scale', None)
+            summary = getattr(alert, 'potential_impacts', None) or getattr(alert, 'description', None) or ''
+            entries.append(AlertIndex(
+                content_type=content_type,
+                object_id=alert.pk,
+                issue_time=alert.issue_time,
+                message_code=alert.message_code,
+                serial_number=alert.serial_number,
+                noaa_scale=noaa_scale,
+                severity=scale_severity(noaa_scale),
+                valid_from=getattr(alert, 'valid_from', None),
+                active_until=getattr(alert, 'valid_to', None),
+                title=(alert.warning_type or '')[:200],
+                summary=summary[:255],
+            ))
+        AlertIndex.objects.bulk_create(entries, batch_size=500)
+
+
+def clear_alert_index(apps, schema_editor):
+    apps.get_model('weather', 'AlertIndex').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('weather', '0007_alertindex'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_alert_index, clear_alert_index),
+    ]
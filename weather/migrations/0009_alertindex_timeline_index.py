@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('weather', '0008_backfill_alertindex'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='alertindex',
+            name='issue_time',
+            field=models.DateTimeField(help_text='Issue Time UTC'),
+        ),
+        migrations.AddIndex(
+            model_name='alertindex',
+            index=models.Index(fields=['issue_time', 'content_type', 'object_id'], name='weather_alertindex_timeline'),
+        ),
+    ]
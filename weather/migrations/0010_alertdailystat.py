@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0009_alertindex_timeline_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='alertindex',
+            name='active_until',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='Окончание периода действия', null=True),
+        ),
+        migrations.CreateModel(
+            name='AlertDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('family', models.CharField(choices=[('legacy', 'legacy'), ('t', 't'), ('k', 'k'), ('e', 'e'), ('a', 'a')], help_text='Семейство алертов', max_length=10)),
+                ('day', models.DateField(help_text='День (UTC)')),
+                ('issued', models.IntegerField(default=0, help_text='Выпущено алертов за день')),
+                ('expiring', models.IntegerField(default=0, help_text='Алертов, период действия которых заканчивается в этот день')),
+            ],
+            options={
+                'verbose_name': 'Статистика алертов за день',
+                'verbose_name_plural': 'Статистика алертов по дням',
+                'ordering': ['-day', 'family'],
+                'unique_together': {('family', 'day')},
+            },
+        ),
+    ]
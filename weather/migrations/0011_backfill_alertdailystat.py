@@ -0,0 +1,51 @@
+# Заполнение статистики алертов по уже построенной ленте
+
+from collections import Counter
+from datetime import timezone as dt_timezone
+
+from django.db import migrations
+
+
+FAMILIES = {
+    'spaceweatheralert': 'legacy',
+    'typetradioalert': 't',
+    'typekgeomagneticalert': 'k',
+    'typeeelectronalert': 'e',
+    'typeaforecastalert': 'a',
+}
+
+
+def backfill_alert_stats(apps, schema_editor):
+    """Считаем выпущенные и истекающие алерты по семействам и дням"""
+    AlertIndex = apps.get_model('weather', 'AlertIndex')
+    AlertDailyStat = apps.get_model('weather', 'AlertDailyStat')
+
+    counters = {}
+    entries = AlertIndex.objects.values_list('content_type__model', 'issue_time', 'active_until')
+    for model_name, issue_time, active_until in entries.iterator():
+        family = FAMILIES.get(model_name)
+        if family is None:
+            continue
+        counters.setdefault((family, issue_time.astimezone(dt_timezone.utc).date()), Counter())['issued'] += 1
+        if active_until:
+            counters.setdefault((family, active_until.astimezone(dt_timezone.utc).date()), Counter())['expiring'] += 1
+
+    AlertDailyStat.objects.bulk_create([
+        AlertDailyStat(family=family, day=day, issued=counter['issued'], expiring=counter['expiring'])
+        for (family, day), counter in counters.items()
+    ], batch_size=500)
+
+
+def clear_alert_stats(apps, schema_editor):
+    apps.get_model('weather', 'AlertDailyStat').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0010_alertdailystat'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_alert_stats, clear_alert_stats),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:44
+
+import django.utils.timezone
+import weather.fields
+from django.db import migrations, models
+from django.db.migrations.exceptions import IrreversibleError
+
+
+ALERT_MODEL_NAMES = [
+    'SpaceWeatherAlert',
+    'TypeTRadioAlert',
+    'TypeKGeomagneticAlert',
+    'TypeEElectronAlert',
+    'TypeAForecastAlert',
+]
+
+
+def compress_full_messages(apps, schema_editor):
+    """Перезаписываем тексты, оставшиеся несжатыми после смены типа колонки"""
+    for model_name in ALERT_MODEL_NAMES:
+        model = apps.get_model('weather', model_name)
+        batch = []
+        for alert in model.objects.only('pk', 'full_message').iterator(chunk_size=500):
+            batch.append(alert)  # значение уже прочитано как str и будет сжато при записи
+            if len(batch) >= 500:
+                model.objects.bulk_update(batch, ['full_message'])
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, ['full_message'])
+
+
+def decompress_full_messages(apps, schema_editor):
+    """
+    Откат: возвращаем несжатый текст перед сменой типа колонки обратно.
+
+    Проверен только на SQLite, где колонка без строгого типа хранит текст как есть.
+    На PostgreSQL колонка на этом шаге еще bytea, а обратный AlterField привел бы
+    ее к text через bytea::text (шестнадцатеричная запись вместо сообщения),
+    поэтому там откат запрещен.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        raise IrreversibleError(
+            'Откат сжатия full_message поддерживается только на SQLite'
+        )
+    for model_name in ALERT_MODEL_NAMES:
+        model = apps.get_model('weather', model_name)
+        for alert in model.objects.only('pk', 'full_message').iterator(chunk_size=500):
+            model.objects.filter(pk=alert.pk).update(
+                full_message=models.Value(alert.full_message, output_field=models.TextField())
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0011_backfill_alertdailystat'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='spaceweatheralert',
+            name='full_message',
+            field=weather.fields.CompressedTextField(help_text='Полный текст предупреждения (сжат zlib)'),
+        ),
+        migrations.AlterField(
+            model_name='typeaforecastalert',
+            name='full_message',
+            field=weather.fields.CompressedTextField(help_text='Полный текст предупреждения (сжат zlib)'),
+        ),
+        migrations.AlterField(
+            model_name='typeeelectronalert',
+            name='full_message',
+            field=weather.fields.CompressedTextField(help_text='Полный текст предупреждения (сжат zlib)'),
+        ),
+        migrations.AlterField(
+            model_name='typekgeomagneticalert',
+            name='full_message',
+            field=weather.fields.CompressedTextField(help_text='Полный текст предупреждения (сжат zlib)'),
+        ),
+        migrations.AlterField(
+            model_name='typetradioalert',
+            name='full_message',
+            field=weather.fields.CompressedTextField(help_text='Полный текст предупреждения (сжат zlib)'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('legacy', 'legacy'), ('t', 't'), ('k', 'k'), ('e', 'e'), ('a', 'a')], help_text='Семейство алертов', max_length=10)),
+                ('original_id', models.PositiveIntegerField(help_text='ID алерта в рабочей таблице')),
+                ('message_code', models.CharField(help_text='Space Weather Message Code', max_length=20)),
+                ('serial_number', models.CharField(help_text='Serial Number', max_length=10)),
+                ('issue_time', models.DateTimeField(db_index=True, help_text='Issue Time UTC')),
+                ('payload', weather.fields.CompressedTextField(help_text='Все поля алерта и комментарии (JSON, сжат zlib)')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Время переноса в архив')),
+            ],
+            options={
+                'verbose_name': 'Архивный алерт',
+                'verbose_name_plural': 'Архив алертов',
+                'ordering': ['-issue_time'],
+                'unique_together': {('kind', 'original_id')},
+            },
+        ),
+        migrations.RunPython(compress_full_messages, decompress_full_messages),
+    ]
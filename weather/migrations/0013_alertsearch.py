@@ -0,0 +1,107 @@
+# Полнотекстовый поиск: FTS5 на SQLite, tsvector + GIN на PostgreSQL
+
+from django.db import migrations
+
+
+ALERT_MODEL_NAMES = [
+    'SpaceWeatherAlert',
+    'TypeTRadioAlert',
+    'TypeKGeomagneticAlert',
+    'TypeEElectronAlert',
+    'TypeAForecastAlert',
+]
+
+SQLITE_CREATE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS weather_alertsearch USING fts5(
+    message_code, title, original, translated,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+POSTGRESQL_CREATE = [
+    """
+    CREATE TABLE IF NOT EXISTS weather_alertsearch (
+        index_id bigint PRIMARY KEY REFERENCES weather_alertindex (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+        message_code text NOT NULL DEFAULT '',
+        title text NOT NULL DEFAULT '',
+        original text NOT NULL DEFAULT '',
+        translated text NOT NULL DEFAULT '',
+        document tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', message_code), 'A') ||
+            setweight(to_tsvector('english', title), 'B') ||
+            setweight(to_tsvector('russian', translated), 'C') ||
+            setweight(to_tsvector('english', original), 'D')
+        ) STORED
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS weather_alertsearch_document ON weather_alertsearch USING GIN (document)",
+]
+
+
+def fts5_available(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(cursor.fetchone()[0])
+
+
+def create_search_table(apps, schema_editor):
+    """Создаем таблицу поиска и заполняем ее по уже сохраненным алертам"""
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        if not fts5_available(connection):
+            return  # SQLite без FTS5: поиск работает через icontains
+        schema_editor.execute(SQLITE_CREATE)
+        key = 'rowid'
+    elif connection.vendor == 'postgresql':
+        for statement in POSTGRESQL_CREATE:
+            schema_editor.execute(statement)
+        key = 'index_id'
+    else:
+        return
+
+    AlertIndex = apps.get_model('weather', 'AlertIndex')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    for model_name in ALERT_MODEL_NAMES:
+        model = apps.get_model('weather', model_name)
+        content_type = ContentType.objects.filter(app_label='weather', model=model_name.lower()).first()
+        if content_type is None:
+            continue
+        index_ids = dict(AlertIndex.objects.filter(content_type=content_type).values_list('object_id', 'id'))
+        rows = []
+        for alert in model.objects.all().iterator():
+            if alert.pk not in index_ids:
+                continue
+            translated = [
+                getattr(alert, name, None) or ''
+                for name in ('description', 'potential_impacts', 'forecast_data')
+            ]
+            rows.append((
+                index_ids[alert.pk],
+                alert.message_code or '',
+                alert.warning_type or '',
+                alert.full_message or '',
+                '\n'.join(part for part in translated if part),
+            ))
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO weather_alertsearch ({key}, message_code, title, original, translated) "
+                "VALUES (%s, %s, %s, %s, %s)",
+                rows,
+            )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute("DROP TABLE IF EXISTS weather_alertsearch")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('weather', '0012_compressed_full_message_archivedalert'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:51
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0013_alertsearch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PurgeJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает'), ('running', 'Выполняется'), ('done', 'Завершена'), ('failed', 'Ошибка')], default='pending', help_text='Состояние очистки', max_length=10)),
+                ('total', models.PositiveIntegerField(default=0, help_text='Алертов на момент запуска')),
+                ('deleted', models.PositiveIntegerField(default=0, help_text='Удалено алертов')),
+                ('comments_deleted', models.PositiveIntegerField(default=0, help_text='Удалено комментариев')),
+                ('current_kind', models.CharField(blank=True, default='', help_text='Обрабатываемое семейство алертов', max_length=10)),
+                ('error', models.TextField(blank=True, default='', help_text='Текст ошибки')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Время запуска')),
+                ('finished_at', models.DateTimeField(blank=True, help_text='Время завершения', null=True)),
+            ],
+            options={
+                'verbose_name': 'Очистка алертов',
+                'verbose_name_plural': 'Очистки алертов',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0014_purgejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SolarWindPlasmaSample',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('time_tag', models.DateTimeField(help_text='Время отсчета UTC', unique=True)),
+                ('density', models.FloatField(blank=True, help_text='Плотность, p/cm³', null=True)),
+                ('speed', models.FloatField(blank=True, help_text='Скорость, км/с', null=True)),
+                ('temperature', models.FloatField(blank=True, help_text='Температура, K', null=True)),
+            ],
+            options={
+                'verbose_name': 'Отсчет плазмы солнечного ветра',
+                'verbose_name_plural': 'Плазма солнечного ветра',
+                'ordering': ['time_tag'],
+                'abstract': False,
+            },
+        ),
+    ]
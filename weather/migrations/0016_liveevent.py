@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:04
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0015_solarwindplasmasample'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LiveEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(help_text='Тип события: alert, conditions', max_length=20)),
+                ('payload', models.JSONField(help_text='Данные события')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, help_text='Время события')),
+            ],
+            options={
+                'verbose_name': 'Живое событие',
+                'verbose_name_plural': 'Живые события',
+                'ordering': ['id'],
+            },
+        ),
+    ]
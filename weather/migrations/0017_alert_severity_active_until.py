@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0016_liveevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='spaceweatheralert',
+            name='active_until',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='Окончание периода действия', null=True),
+        ),
+        migrations.AddField(
+            model_name='spaceweatheralert',
+            name='severity',
+            field=models.PositiveSmallIntegerField(db_index=True, default=0, help_text='Уровень серьезности по NOAA Scale (0-5)'),
+        ),
+        migrations.AddField(
+            model_name='typeaforecastalert',
+            name='active_until',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='Окончание периода действия', null=True),
+        ),
+        migrations.AddField(
+            model_name='typeaforecastalert',
+            name='severity',
+            field=models.PositiveSmallIntegerField(db_index=True, default=0, help_text='Уровень серьезности по NOAA Scale (0-5)'),
+        ),
+        migrations.AddField(
+            model_name='typeeelectronalert',
+            name='active_until',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='Окончание периода действия', null=True),
+        ),
+        migrations.AddField(
+            model_name='typeeelectronalert',
+            name='severity',
+            field=models.PositiveSmallIntegerField(db_index=True, default=0, help_text='Уровень серьезности по NOAA Scale (0-5)'),
+        ),
+        migrations.AddField(
+            model_name='typekgeomagneticalert',
+            name='active_until',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='Окончание периода действия', null=True),
+        ),
+        migrations.AddField(
+            model_name='typekgeomagneticalert',
+            name='severity',
+            field=models.PositiveSmallIntegerField(db_index=True, default=0, help_text='Уровень серьезности по NOAA Scale (0-5)'),
+        ),
+        migrations.AddField(
+            model_name='typetradioalert',
+            name='active_until',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='Окончание периода действия', null=True),
+        ),
+        migrations.AddField(
+            model_name='typetradioalert',
+            name='severity',
+            field=models.PositiveSmallIntegerField(db_index=True, default=0, help_text='Уровень серьезности по NOAA Scale (0-5)'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Заполнение severity и active_until у уже сохраненных алертов
+
+from datetime import timezone as dt_timezone
+
+from django.db import migrations
+from django.utils import timezone
+
+
+# Только у этих таблиц есть noaa_scale и valid_to; у остальных значения по умолчанию верны
+ALERT_MODEL_NAMES = [
+    'SpaceWeatherAlert',
+    'TypeKGeomagneticAlert',
+]
+BATCH_SIZE = 500
+
+
+def scale_severity(noaa_scale):
+    if not noaa_scale:
+        return 0
+    for level in range(1, 6):
+        if f'G{level}' in noaa_scale or f'R{level}' in noaa_scale or f'S{level}' in noaa_scale:
+            return level
+    return 0
+
+
+def backfill_stored_fields(apps, schema_editor):
+    """Считаем серьезность и окончание периода действия по noaa_scale и valid_to"""
+    for model_name in ALERT_MODEL_NAMES:
+        model = apps.get_model('weather', model_name)
+        batch = []
+        for alert in model.objects.only('id', 'noaa_scale', 'valid_to').iterator(chunk_size=BATCH_SIZE):
+            alert.severity = scale_severity(alert.noaa_scale)
+            alert.active_until = alert.valid_to
+            if alert.active_until is not None and timezone.is_naive(alert.active_until):
+                alert.active_until = timezone.make_aware(alert.active_until, dt_timezone.utc)
+            batch.append(alert)
+            if len(batch) >= BATCH_SIZE:
+                model.objects.bulk_update(batch, ['severity', 'active_until'])
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, ['severity', 'active_until'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0017_alert_severity_active_until'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_stored_fields, migrations.RunPython.noop),
+    ]
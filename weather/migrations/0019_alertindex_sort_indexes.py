@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('weather', '0018_backfill_alert_severity_active_until'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alertindex',
+            index=models.Index(fields=['severity', 'issue_time', 'content_type', 'object_id'], name='weather_alertindex_severity'),
+        ),
+        migrations.AddIndex(
+            model_name='alertindex',
+            index=models.Index(fields=['message_code', 'issue_time', 'content_type', 'object_id'], name='weather_alertindex_code'),
+        ),
+        migrations.AddIndex(
+            model_name='alertindex',
+            index=models.Index(fields=['content_type', 'issue_time', 'object_id'], name='weather_alertindex_type'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0019_alertindex_sort_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SourceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(help_text='Имя источника', max_length=30, unique=True)),
+                ('data', models.JSONField(blank=True, help_text='Разобранные данные последней удачной загрузки', null=True)),
+                ('digest', models.CharField(blank=True, help_text='SHA-1 данных (версия источника)', max_length=40)),
+                ('fetched_at', models.DateTimeField(blank=True, help_text='Время последней удачной загрузки', null=True)),
+                ('changed_at', models.DateTimeField(blank=True, help_text='Когда данные последний раз изменились', null=True)),
+                ('checked_at', models.DateTimeField(blank=True, help_text='Время последней попытки загрузки', null=True)),
+                ('status', models.CharField(default='ok', help_text='Результат последней попытки: ok или error', max_length=10)),
+                ('error', models.TextField(blank=True, help_text='Ошибка последней попытки')),
+            ],
+            options={
+                'verbose_name': 'Снимок источника NOAA',
+                'verbose_name_plural': 'Снимки источников NOAA',
+                'ordering': ['source'],
+            },
+        ),
+    ]
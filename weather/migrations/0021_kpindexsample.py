@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0020_sourcesnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KpIndexSample',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('time_tag', models.DateTimeField(help_text='Время отсчета UTC', unique=True)),
+                ('kp', models.FloatField(blank=True, help_text='Индекс Kp (0-9, шаг 1/3)', null=True)),
+                ('ap', models.FloatField(blank=True, help_text='Эквивалентная амплитуда ap, нТл', null=True)),
+            ],
+            options={
+                'verbose_name': 'Отсчет индекса Kp',
+                'verbose_name_plural': 'Индекс Kp',
+                'ordering': ['time_tag'],
+                'abstract': False,
+            },
+        ),
+    ]
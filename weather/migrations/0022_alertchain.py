@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('weather', '0021_kpindexsample'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertChain',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField(help_text='ID предупреждения')),
+                ('message_code', models.CharField(help_text='Space Weather Message Code', max_length=20)),
+                ('serial_number', models.CharField(help_text='Serial Number', max_length=10)),
+                ('issue_time', models.DateTimeField(help_text='Issue Time UTC')),
+                ('severity', models.PositiveSmallIntegerField(default=0, help_text='Уровень серьезности по NOAA Scale (0-5)')),
+                ('active_until', models.DateTimeField(blank=True, help_text='Окончание периода действия', null=True)),
+                ('relation', models.CharField(choices=[('original', 'Исходное'), ('extension', 'Продление'), ('continuation', 'Продолжение'), ('cancel', 'Отмена')], default='original', help_text='Связь с предыдущим сообщением', max_length=15)),
+                ('reference_serial', models.CharField(blank=True, db_index=True, default='', help_text='Серийный номер, на который ссылается сообщение', max_length=10)),
+                ('is_current', models.BooleanField(default=True, help_text='Последнее сообщение события')),
+                ('content_type', models.ForeignKey(help_text='Тип предупреждения', on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+                ('predecessor', models.ForeignKey(blank=True, help_text='Предыдущее сообщение события', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='successors', to='weather.alertchain')),
+                ('root', models.ForeignKey(blank=True, help_text='Исходное сообщение события', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='weather.alertchain')),
+            ],
+            options={
+                'verbose_name': 'Звено цепочки алертов',
+                'verbose_name_plural': 'Цепочки алертов',
+                'ordering': ['-issue_time'],
+                'indexes': [models.Index(fields=['message_code', 'serial_number'], name='weather_alertchain_serial'), models.Index(fields=['is_current', 'active_until'], name='weather_alertchain_current'), models.Index(fields=['root', 'issue_time'], name='weather_alertchain_history')],
+                'unique_together': {('content_type', 'object_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Заполнение цепочек событий по уже сохраненным алертам
+
+from django.db import migrations
+
+from weather.alert_chain import link_entries, parse_alert_reference
+
+
+ALERT_MODEL_NAMES = [
+    'SpaceWeatherAlert',
+    'TypeTRadioAlert',
+    'TypeKGeomagneticAlert',
+    'TypeEElectronAlert',
+    'TypeAForecastAlert',
+]
+
+
+def backfill_alert_chain(apps, schema_editor):
+    """Создаем звенья для всех существующих алертов и связываем события"""
+    AlertChain = apps.get_model('weather', 'AlertChain')
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+
+    for model_name in ALERT_MODEL_NAMES:
+        model = apps.get_model('weather', model_name)
+        content_type, _ = ContentType.objects.get_or_create(app_label='weather', model=model_name.lower())
+        entries = []
+        for alert in model.objects.all().iterator():
+            relation, reference_serial = parse_alert_reference(alert.full_message)
+            entries.append(AlertChain(
+                content_type=content_type,
+                object_id=alert.pk,
+                message_code=alert.message_code,
+                serial_number=alert.serial_number,
+                issue_time=alert.issue_time,
+                severity=alert.severity,
+                active_until=alert.active_until,
+                relation=relation,
+                reference_serial=reference_serial,
+            ))
+        AlertChain.objects.bulk_create(entries, batch_size=500)
+
+    changed = link_entries(list(AlertChain.objects.all()))
+    AlertChain.objects.bulk_update(changed, ['predecessor', 'root', 'is_current'], batch_size=500)
+
+
+def clear_alert_chain(apps, schema_editor):
+    apps.get_model('weather', 'AlertChain').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('weather', '0022_alertchain'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_alert_chain, clear_alert_chain),
+    ]
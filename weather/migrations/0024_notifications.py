@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:30
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0023_backfill_alertchain'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationSubscription',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Название подписки', max_length=100)),
+                ('channel', models.CharField(choices=[('email', 'Email'), ('webhook', 'Webhook')], help_text='Канал доставки', max_length=10)),
+                ('target', models.CharField(help_text='Адрес email или URL вебхука', max_length=255)),
+                ('min_severity', models.PositiveSmallIntegerField(default=0, help_text='Минимальный уровень серьезности (0-5)')),
+                ('code_families', models.CharField(blank=True, default='', help_text='Начала кодов сообщений через запятую (WARK,ALTK); пусто — все', max_length=200)),
+                ('is_active', models.BooleanField(default=True, help_text='Подписка включена')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Время создания')),
+            ],
+            options={
+                'verbose_name': 'Подписка на оповещения',
+                'verbose_name_plural': 'Подписки на оповещения',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='NotificationDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel', models.CharField(help_text='Канал доставки (копия из подписки)', max_length=10)),
+                ('alert_id', models.CharField(help_text='Типизированный ID алерта (k-12)', max_length=30)),
+                ('payload', models.JSONField(help_text='Данные алерта для оповещения')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает'), ('sending', 'Отправляется'), ('sent', 'Доставлено'), ('failed', 'Ошибка')], default='pending', help_text='Состояние доставки', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0, help_text='Сделано попыток')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Время следующей попытки')),
+                ('last_error', models.TextField(blank=True, default='', help_text='Ошибка последней попытки')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Время создания')),
+                ('sent_at', models.DateTimeField(blank=True, help_text='Время доставки', null=True)),
+                ('subscription', models.ForeignKey(help_text='Подписка', on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='weather.notificationsubscription')),
+            ],
+            options={
+                'verbose_name': 'Доставка оповещения',
+                'verbose_name_plural': 'Доставки оповещений',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['channel', 'status', 'next_attempt_at'], name='weather_delivery_queue')],
+                'unique_together': {('subscription', 'alert_id')},
+            },
+        ),
+    ]
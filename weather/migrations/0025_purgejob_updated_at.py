@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:44
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0024_notifications'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purgejob',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Последний прогресс (признак живой очистки)'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0025_purgejob_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sourcesnapshot',
+            name='published',
+            field=models.JSONField(blank=True, help_text='Последнее опубликованное по данным источника живое событие', null=True),
+        ),
+    ]
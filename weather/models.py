@@ -1,8 +1,57 @@
+from datetime import timezone as dt_timezone
+
 from django.db import models
+from django.db.models.functions import Coalesce
+from django.urls import reverse
 from django.utils import timezone
-from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
 from django.contrib.contenttypes.models import ContentType
 
+from .fields import CompressedTextField
+
+
+def noaa_scale_severity(noaa_scale):
+    """Уровень серьезности (0-5) по строке NOAA Scale"""
+    if not noaa_scale:
+        return 0
+    if 'G1' in noaa_scale or 'R1' in noaa_scale or 'S1' in noaa_scale:
+        return 1
+    elif 'G2' in noaa_scale or 'R2' in noaa_scale or 'S2' in noaa_scale:
+        return 2
+    elif 'G3' in noaa_scale or 'R3' in noaa_scale or 'S3' in noaa_scale:
+        return 3
+    elif 'G4' in noaa_scale or 'R4' in noaa_scale or 'S4' in noaa_scale:
+        return 4
+    elif 'G5' in noaa_scale or 'R5' in noaa_scale or 'S5' in noaa_scale:
+        return 5
+    return 0
+
+
+def update_stored_fields(alert):
+    """
+    Пересчитывает хранимые поля алерта: severity и active_until.
+    
+    Вызывается при сохранении и при сборке алертов для bulk_create, поэтому
+    фильтры и сортировка по серьезности и периоду действия идут в SQL.
+    """
+    alert.severity = noaa_scale_severity(getattr(alert, 'noaa_scale', None))
+    active_until = getattr(alert, 'valid_to', None)
+    if active_until is not None and timezone.is_naive(active_until):
+        active_until = timezone.make_aware(active_until, dt_timezone.utc)
+    alert.active_until = active_until
+    return alert
+
+
+class AlertQuerySet(models.QuerySet):
+    
+    def active(self, now=None):
+        """Алерты, период действия которых еще не закончился (индекс по active_until)"""
+        return self.filter(active_until__gte=now or timezone.now())
+    
+    def min_severity(self, level):
+        """Алерты с уровнем серьезности не ниже level"""
+        return self.filter(severity__gte=level)
+
 
 class BaseSpaceWeatherAlert(models.Model):
     """Базовая модель для всех типов алертов"""
@@ -10,13 +59,34 @@ class BaseSpaceWeatherAlert(models.Model):
     serial_number = models.CharField(max_length=10, help_text="Serial Number")
     issue_time = models.DateTimeField(help_text="Issue Time UTC")
     warning_type = models.CharField(max_length=200, help_text="Тип предупреждения")
-    full_message = models.TextField(help_text="Полный текст предупреждения")
+    full_message = CompressedTextField(help_text="Полный текст предупреждения (сжат zlib)")
     created_at = models.DateTimeField(default=timezone.now, help_text="Время создания записи")
     is_processed = models.BooleanField(default=True, help_text="Обработано ли предупреждение")
+    severity = models.PositiveSmallIntegerField(default=0, db_index=True, help_text="Уровень серьезности по NOAA Scale (0-5)")
+    active_until = models.DateTimeField(null=True, blank=True, db_index=True, help_text="Окончание периода действия")
+    comments = GenericRelation('AlertComment')
+    
+    objects = AlertQuerySet.as_manager()
     
     class Meta:
         abstract = True
         ordering = ['-issue_time']
+    
+    def save(self, *args, **kwargs):
+        update_stored_fields(self)
+        super().save(*args, **kwargs)
+    
+    def get_absolute_url(self):
+        return alert_url(alert_kind(self), self.pk)
+    
+    @property
+    def is_active(self):
+        """Активно ли предупреждение (до окончания периода действия)"""
+        return self.active_until is not None and timezone.now() <= self.active_until
+    
+    @property
+    def severity_level(self):
+        return self.severity
 
 
 class TypeTRadioAlert(BaseSpaceWeatherAlert):
@@ -87,7 +157,7 @@ class SpaceWeatherAlert(models.Model):
     noaa_scale = models.CharField(max_length=20, null=True, blank=True, help_text="NOAA Scale (например, G2 - Moderate)")
     
     # Полный текст и воздействия
-    full_message = models.TextField(help_text="Полный текст предупреждения")
+    full_message = CompressedTextField(help_text="Полный текст предупреждения (сжат zlib)")
     potential_impacts = models.TextField(null=True, blank=True, help_text="Потенциальные воздействия")
     description = models.TextField(null=True, blank=True, help_text="Описание события (переведенное)")
     
@@ -101,9 +171,16 @@ class SpaceWeatherAlert(models.Model):
     maximum_flux = models.CharField(max_length=100, null=True, blank=True, help_text="Максимальный поток (для ALTEF3)")
     forecast_data = models.TextField(null=True, blank=True, help_text="Данные прогноза (для WATA20)")
     
+    # Хранимые производные поля (update_stored_fields): фильтры и сортировка в SQL
+    severity = models.PositiveSmallIntegerField(default=0, db_index=True, help_text="Уровень серьезности по NOAA Scale (0-5)")
+    active_until = models.DateTimeField(null=True, blank=True, db_index=True, help_text="Окончание периода действия")
+    
     # Метаданные
     created_at = models.DateTimeField(default=timezone.now, help_text="Время создания записи")
     is_processed = models.BooleanField(default=True, help_text="Обработано ли предупреждение")
+    comments = GenericRelation('AlertComment')
+    
+    objects = AlertQuerySet.as_manager()
     
     class Meta:
         ordering = ['-issue_time']
@@ -114,33 +191,270 @@ class SpaceWeatherAlert(models.Model):
     def __str__(self):
         return f"{self.message_code}-{self.serial_number}: {self.warning_type} ({self.issue_time})"
     
+    def save(self, *args, **kwargs):
+        update_stored_fields(self)
+        super().save(*args, **kwargs)
+    
+    def get_absolute_url(self):
+        return alert_url(alert_kind(self), self.pk)
+    
     @property
     def is_active(self):
-        """Проверка, активно ли предупреждение"""
-        now = timezone.now()
-        if self.valid_to:
-            valid_to_aware = self.valid_to
-            if timezone.is_naive(valid_to_aware):
-                valid_to_aware = timezone.make_aware(valid_to_aware, timezone.utc)
-            return now <= valid_to_aware
-        return True
+        """Активно ли предупреждение (до окончания периода действия)"""
+        return self.active_until is not None and timezone.now() <= self.active_until
     
     @property
     def severity_level(self):
-        """Уровень серьезности по NOAA Scale"""
-        if not self.noaa_scale:
-            return 0
-        if 'G1' in self.noaa_scale or 'R1' in self.noaa_scale or 'S1' in self.noaa_scale:
-            return 1
-        elif 'G2' in self.noaa_scale or 'R2' in self.noaa_scale or 'S2' in self.noaa_scale:
-            return 2
-        elif 'G3' in self.noaa_scale or 'R3' in self.noaa_scale or 'S3' in self.noaa_scale:
-            return 3
-        elif 'G4' in self.noaa_scale or 'R4' in self.noaa_scale or 'S4' in self.noaa_scale:
-            return 4
-        elif 'G5' in self.noaa_scale or 'R5' in self.noaa_scale or 'S5' in self.noaa_scale:
-            return 5
-        return 0
+        return self.severity
+
+
+# Семейства алертов: короткий код -> модель
+ALERT_KINDS = {
+    'legacy': SpaceWeatherAlert,
+    't': TypeTRadioAlert,
+    'k': TypeKGeomagneticAlert,
+    'e': TypeEElectronAlert,
+    'a': TypeAForecastAlert,
+}
+ALERT_MODELS = tuple(ALERT_KINDS.values())
+
+
+def alert_kind(model):
+    """Код семейства для модели (или экземпляра) алерта"""
+    model = model if isinstance(model, type) else type(model)
+    for kind, alert_model in ALERT_KINDS.items():
+        if alert_model is model:
+            return kind
+    return None
+
+
+def alert_url(kind, pk):
+    """URL детальной страницы по типизированному идентификатору вида k-42"""
+    return reverse('alert_detail', kwargs={'kind': kind, 'alert_id': pk})
+
+
+class AlertIndexQuerySet(AlertQuerySet):
+    
+    def with_comment_counts(self):
+        """Добавляет comment_count подзапросом (без запроса на каждую строку)"""
+        comments = (
+            AlertComment.objects
+            .filter(content_type=models.OuterRef('content_type'), object_id=models.OuterRef('object_id'))
+            .order_by()
+            .values('content_type')
+            .annotate(count=models.Count('pk'))
+            .values('count')
+        )
+        return self.annotate(
+            comment_count=Coalesce(models.Subquery(comments, output_field=models.IntegerField()), 0)
+        )
+
+
+class AlertIndex(models.Model):
+    """Денормализованная лента алертов из всех таблиц (для списков и пагинации)"""
+    
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, help_text="Тип предупреждения")
+    object_id = models.PositiveIntegerField(help_text="ID предупреждения")
+    alert = GenericForeignKey('content_type', 'object_id')
+    
+    issue_time = models.DateTimeField(help_text="Issue Time UTC")
+    message_code = models.CharField(max_length=20, help_text="Space Weather Message Code")
+    serial_number = models.CharField(max_length=10, help_text="Serial Number")
+    noaa_scale = models.CharField(max_length=20, null=True, blank=True, help_text="NOAA Scale")
+    severity = models.PositiveSmallIntegerField(default=0, help_text="Уровень серьезности по NOAA Scale (0-5)")
+    valid_from = models.DateTimeField(null=True, blank=True, help_text="Начало периода действия")
+    active_until = models.DateTimeField(null=True, blank=True, db_index=True, help_text="Окончание периода действия")
+    title = models.CharField(max_length=200, help_text="Тип предупреждения (кратко)")
+    summary = models.CharField(max_length=255, blank=True, default='', help_text="Воздействия или описание (кратко)")
+    
+    objects = AlertIndexQuerySet.as_manager()
+    
+    class Meta:
+        ordering = ['-issue_time']
+        verbose_name = "Запись ленты алертов"
+        verbose_name_plural = "Лента алертов"
+        unique_together = ['content_type', 'object_id']
+        indexes = [
+            # Ключ keyset-пагинации: (issue_time, тип, id)
+            models.Index(fields=['issue_time', 'content_type', 'object_id'], name='weather_alertindex_timeline'),
+            # Остальные сортировки списков (alert_filters.ALERT_SORTS)
+            models.Index(fields=['severity', 'issue_time', 'content_type', 'object_id'], name='weather_alertindex_severity'),
+            models.Index(fields=['message_code', 'issue_time', 'content_type', 'object_id'], name='weather_alertindex_code'),
+            models.Index(fields=['content_type', 'issue_time', 'object_id'], name='weather_alertindex_type'),
+        ]
+    
+    def __str__(self):
+        return f"{self.message_code}-{self.serial_number} ({self.issue_time})"
+    
+    def get_absolute_url(self):
+        return alert_url(self.kind, self.object_id)
+    
+    @property
+    def kind(self):
+        """Код семейства алерта (без запроса к таблице алерта)"""
+        return alert_kind(ContentType.objects.get_for_id(self.content_type_id).model_class())
+    
+    @property
+    def is_active(self):
+        """Активно ли предупреждение (до окончания периода действия)"""
+        return self.active_until is not None and timezone.now() <= self.active_until
+    
+    @property
+    def severity_level(self):
+        return self.severity
+
+
+class AlertChainQuerySet(AlertQuerySet):
+
+    def current(self):
+        """Последние сообщения событий (по одному на событие)"""
+        return self.filter(is_current=True)
+
+    def effective(self, now=None):
+        """Действующие предупреждения: последнее сообщение события не отмена и период не закончился"""
+        return self.current().exclude(relation=AlertChain.RELATION_CANCEL).active(now)
+
+    def history(self, root_id):
+        """Все сообщения события от исходного, по времени выпуска"""
+        return self.filter(root_id=root_id).order_by('issue_time', 'pk')
+
+
+class AlertChain(models.Model):
+    """
+    Цепочка сообщений одного события NOAA (по строке на алерт).
+
+    Продление, продолжение и отмена ссылаются на серийный номер предыдущего
+    сообщения; здесь эта ссылка разрешена в predecessor, а root указывает на
+    исходное сообщение события (у исходного — на себя). is_current отмечает
+    последнее сообщение события. Поддерживается при загрузке (weather/alert_chain.py).
+    """
+
+    RELATION_ORIGINAL = 'original'
+    RELATION_EXTENSION = 'extension'
+    RELATION_CONTINUATION = 'continuation'
+    RELATION_CANCEL = 'cancel'
+    RELATION_CHOICES = [
+        (RELATION_ORIGINAL, 'Исходное'),
+        (RELATION_EXTENSION, 'Продление'),
+        (RELATION_CONTINUATION, 'Продолжение'),
+        (RELATION_CANCEL, 'Отмена'),
+    ]
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, help_text="Тип предупреждения")
+    object_id = models.PositiveIntegerField(help_text="ID предупреждения")
+    alert = GenericForeignKey('content_type', 'object_id')
+
+    message_code = models.CharField(max_length=20, help_text="Space Weather Message Code")
+    serial_number = models.CharField(max_length=10, help_text="Serial Number")
+    issue_time = models.DateTimeField(help_text="Issue Time UTC")
+    severity = models.PositiveSmallIntegerField(default=0, help_text="Уровень серьезности по NOAA Scale (0-5)")
+    active_until = models.DateTimeField(null=True, blank=True, help_text="Окончание периода действия")
+
+    relation = models.CharField(max_length=15, choices=RELATION_CHOICES, default=RELATION_ORIGINAL, help_text="Связь с предыдущим сообщением")
+    reference_serial = models.CharField(max_length=10, blank=True, default='', db_index=True, help_text="Серийный номер, на который ссылается сообщение")
+    predecessor = models.ForeignKey('self', null=True, blank=True, on_delete=models.SET_NULL, related_name='successors', help_text="Предыдущее сообщение события")
+    root = models.ForeignKey('self', null=True, blank=True, on_delete=models.SET_NULL, related_name='+', help_text="Исходное сообщение события")
+    is_current = models.BooleanField(default=True, help_text="Последнее сообщение события")
+
+    objects = AlertChainQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-issue_time']
+        verbose_name = "Звено цепочки алертов"
+        verbose_name_plural = "Цепочки алертов"
+        unique_together = ['content_type', 'object_id']
+        indexes = [
+            # Разрешение ссылок: сообщение по коду и серийному номеру
+            models.Index(fields=['message_code', 'serial_number'], name='weather_alertchain_serial'),
+            # Действующие предупреждения: is_current и период действия
+            models.Index(fields=['is_current', 'active_until'], name='weather_alertchain_current'),
+            # История события
+            models.Index(fields=['root', 'issue_time'], name='weather_alertchain_history'),
+        ]
+
+    def __str__(self):
+        return f"{self.message_code}-{self.serial_number} ({self.relation})"
+
+    def get_absolute_url(self):
+        return alert_url(self.kind, self.object_id)
+
+    @property
+    def kind(self):
+        """Код семейства алерта (без запроса к таблице алерта)"""
+        return alert_kind(ContentType.objects.get_for_id(self.content_type_id).model_class())
+
+
+class AlertDailyStat(models.Model):
+    """Предагрегированная статистика алертов по семейству и дню (UTC)"""
+    
+    FAMILY_CHOICES = [(kind, kind) for kind in ALERT_KINDS]
+    
+    family = models.CharField(max_length=10, choices=FAMILY_CHOICES, help_text="Семейство алертов")
+    day = models.DateField(help_text="День (UTC)")
+    issued = models.IntegerField(default=0, help_text="Выпущено алертов за день")
+    expiring = models.IntegerField(default=0, help_text="Алертов, период действия которых заканчивается в этот день")
+    
+    class Meta:
+        ordering = ['-day', 'family']
+        verbose_name = "Статистика алертов за день"
+        verbose_name_plural = "Статистика алертов по дням"
+        unique_together = ['family', 'day']
+    
+    def __str__(self):
+        return f"{self.family} {self.day}: {self.issued}"
+
+
+def prefetch_comment_alerts(comments):
+    """
+    Загружает алерты для списка комментариев: один запрос на тип алерта.
+    
+    Результат кладется в кэш GenericForeignKey, поэтому comment.alert,
+    __str__ и alert_identifier больше не делают запрос на каждую строку.
+    """
+    comments = [comment for comment in comments if isinstance(comment, AlertComment)]
+    by_content_type = {}
+    for comment in comments:
+        by_content_type.setdefault(comment.content_type_id, set()).add(comment.object_id)
+    
+    alerts = {}
+    for content_type_id, object_ids in by_content_type.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        if model is None:
+            continue
+        queryset = model._base_manager.filter(pk__in=object_ids)
+        if any(field.name == 'full_message' for field in model._meta.concrete_fields):
+            queryset = queryset.defer('full_message')
+        for alert in queryset:
+            alerts[(content_type_id, alert.pk)] = alert
+    
+    alert_field = AlertComment._meta.get_field('alert')
+    for comment in comments:
+        alert_field.set_cached_value(comment, alerts.get((comment.content_type_id, comment.object_id)))
+    return comments
+
+
+class AlertCommentQuerySet(models.QuerySet):
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._with_alerts = False
+    
+    def with_alerts(self):
+        """Алерты комментариев загружаются пачкой при выполнении запроса"""
+        clone = self._chain()
+        clone._with_alerts = True
+        return clone
+    
+    def _clone(self):
+        clone = super()._clone()
+        clone._with_alerts = self._with_alerts
+        return clone
+    
+    def _fetch_all(self):
+        fetched = self._result_cache is not None
+        super()._fetch_all()
+        if self._with_alerts and not fetched:
+            prefetch_comment_alerts(self._result_cache)
 
 
 class AlertComment(models.Model):
@@ -155,6 +469,8 @@ class AlertComment(models.Model):
     content = models.TextField(max_length=1000, help_text="Текст комментария")
     created_at = models.DateTimeField(default=timezone.now, help_text="Время создания комментария")
     
+    objects = AlertCommentQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
         verbose_name = "Комментарий к предупреждению"
@@ -173,4 +489,310 @@ class AlertComment(models.Model):
         """Возвращает идентификатор алерта в формате код-серийный_номер"""
         if hasattr(self.alert, 'message_code') and hasattr(self.alert, 'serial_number'):
             return f"{self.alert.message_code}-{self.alert.serial_number}"
-        return f"Alert #{self.object_id}"
\ No newline at end of file
+        return f"Alert #{self.object_id}"
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        touch_content_version()
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        touch_content_version()
+        return result
+
+
+class IngestState(models.Model):
+    """Состояние инкрементальной загрузки для одного источника данных"""
+    
+    source = models.CharField(max_length=50, unique=True, help_text="Источник данных")
+    payload_digest = models.CharField(max_length=64, blank=True, default='', help_text="SHA-256 последней обработанной выгрузки")
+    high_water_mark = models.DateTimeField(null=True, blank=True, help_text="Самое позднее issue_datetime среди обработанных алертов")
+    updated_at = models.DateTimeField(default=timezone.now, help_text="Время последней загрузки")
+    
+    class Meta:
+        verbose_name = "Состояние загрузки"
+        verbose_name_plural = "Состояния загрузки"
+    
+    def __str__(self):
+        return f"{self.source}: {self.high_water_mark}"
+
+
+# Источник-отметка для изменений вне загрузки NOAA (удаление, комментарии, очистка)
+CHANGES_SOURCE = 'changes'
+
+
+def touch_content_version():
+    """
+    Отмечает изменение данных, показываемых на страницах.
+    
+    Версия страниц (weather/conditional.py) — самое позднее updated_at среди
+    IngestState, поэтому после отметки клиенты получают новый ETag.
+    """
+    now = timezone.now()
+    if not IngestState.objects.filter(source=CHANGES_SOURCE).update(updated_at=now):
+        IngestState.objects.get_or_create(source=CHANGES_SOURCE, defaults={'updated_at': now})
+
+
+class ArchivedAlert(models.Model):
+    """Алерт, перенесенный из рабочих таблиц по политике хранения"""
+    
+    kind = models.CharField(max_length=10, choices=[(kind, kind) for kind in ALERT_KINDS], help_text="Семейство алертов")
+    original_id = models.PositiveIntegerField(help_text="ID алерта в рабочей таблице")
+    message_code = models.CharField(max_length=20, help_text="Space Weather Message Code")
+    serial_number = models.CharField(max_length=10, help_text="Serial Number")
+    issue_time = models.DateTimeField(db_index=True, help_text="Issue Time UTC")
+    payload = CompressedTextField(help_text="Все поля алерта и комментарии (JSON, сжат zlib)")
+    archived_at = models.DateTimeField(default=timezone.now, help_text="Время переноса в архив")
+    
+    class Meta:
+        ordering = ['-issue_time']
+        verbose_name = "Архивный алерт"
+        verbose_name_plural = "Архив алертов"
+        unique_together = ['kind', 'original_id']
+    
+    def __str__(self):
+        return f"{self.message_code}-{self.serial_number} (архив, {self.issue_time})"
+    
+    def get_absolute_url(self):
+        return alert_url(self.kind, self.original_id)
+
+
+class PurgeJob(models.Model):
+    """Фоновая очистка всех таблиц алертов (прогресс опрашивается админ-панелью)"""
+    
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Ожидает'),
+        (STATUS_RUNNING, 'Выполняется'),
+        (STATUS_DONE, 'Завершена'),
+        (STATUS_FAILED, 'Ошибка'),
+    ]
+    
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, help_text="Состояние очистки")
+    total = models.PositiveIntegerField(default=0, help_text="Алертов на момент запуска")
+    deleted = models.PositiveIntegerField(default=0, help_text="Удалено алертов")
+    comments_deleted = models.PositiveIntegerField(default=0, help_text="Удалено комментариев")
+    current_kind = models.CharField(max_length=10, blank=True, default='', help_text="Обрабатываемое семейство алертов")
+    error = models.TextField(blank=True, default='', help_text="Текст ошибки")
+    created_at = models.DateTimeField(default=timezone.now, help_text="Время запуска")
+    finished_at = models.DateTimeField(null=True, blank=True, help_text="Время завершения")
+    updated_at = models.DateTimeField(default=timezone.now, help_text="Последний прогресс (признак живой очистки)")
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Очистка алертов"
+        verbose_name_plural = "Очистки алертов"
+    
+    def __str__(self):
+        return f"Очистка #{self.pk}: {self.get_status_display()} ({self.deleted}/{self.total})"
+    
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+    
+    @property
+    def percent(self):
+        if self.status == self.STATUS_DONE:
+            return 100
+        return min(99, round(self.deleted * 100 / self.total)) if self.total else 0
+
+
+class TimeSeriesSample(models.Model):
+    """
+    Базовая модель отсчета временного ряда NOAA (узкая таблица).
+    
+    Один отсчет на time_tag: уникальный индекс дает дедупликацию при загрузке
+    и быстрые выборки по диапазону времени. VALUE_FIELDS — числовые колонки,
+    которые читаются в массивы NumPy (см. weather/timeseries.py).
+    """
+    
+    VALUE_FIELDS = ()
+    
+    time_tag = models.DateTimeField(unique=True, help_text="Время отсчета UTC")
+    
+    class Meta:
+        abstract = True
+        ordering = ['time_tag']
+
+
+class SolarWindPlasmaSample(TimeSeriesSample):
+    """Плазма солнечного ветра (DSCOVR/ACE, products/solar-wind/plasma-*.json)"""
+    
+    VALUE_FIELDS = ('density', 'speed', 'temperature')
+    
+    density = models.FloatField(null=True, blank=True, help_text="Плотность, p/cm³")
+    speed = models.FloatField(null=True, blank=True, help_text="Скорость, км/с")
+    temperature = models.FloatField(null=True, blank=True, help_text="Температура, K")
+    
+    class Meta(TimeSeriesSample.Meta):
+        verbose_name = "Отсчет плазмы солнечного ветра"
+        verbose_name_plural = "Плазма солнечного ветра"
+    
+    def __str__(self):
+        return f"{self.time_tag}: {self.speed} км/с"
+
+
+class KpIndexSample(TimeSeriesSample):
+    """
+    Планетарные индексы Kp и ap за трехчасовые интервалы (products/noaa-planetary-k-index.json).
+    
+    Восемь строк в сутки (около 2900 в год) с двумя колонками REAL, поэтому
+    история за десятилетия читается в NumPy целиком (см. weather/kp_stats.py).
+    """
+    
+    VALUE_FIELDS = ('kp', 'ap')
+    # Колонки выгрузки NOAA для полей ряда
+    SOURCE_COLUMNS = {'kp': 'Kp', 'ap': 'a_running'}
+    
+    kp = models.FloatField(null=True, blank=True, help_text="Индекс Kp (0-9, шаг 1/3)")
+    ap = models.FloatField(null=True, blank=True, help_text="Эквивалентная амплитуда ap, нТл")
+    
+    class Meta(TimeSeriesSample.Meta):
+        verbose_name = "Отсчет индекса Kp"
+        verbose_name_plural = "Индекс Kp"
+    
+    def __str__(self):
+        return f"{self.time_tag}: Kp {self.kp}"
+
+
+class LiveEvent(models.Model):
+    """
+    Журнал живых событий (новые алерты, смена шкал NOAA) для SSE.
+    
+    Общий для всех процессов-воркеров: каждый воркер читает новые строки и
+    рассылает их своим подключенным клиентам (weather/live.py).
+    """
+    
+    kind = models.CharField(max_length=20, help_text="Тип события: alert, conditions")
+    payload = models.JSONField(help_text="Данные события")
+    created_at = models.DateTimeField(default=timezone.now, db_index=True, help_text="Время события")
+    
+    class Meta:
+        ordering = ['id']
+        verbose_name = "Живое событие"
+        verbose_name_plural = "Живые события"
+    
+    def __str__(self):
+        return f"{self.kind} #{self.pk}"
+
+
+class SourceSnapshot(models.Model):
+    """
+    Последние данные продукта NOAA SWPC (по строке на источник).
+    
+    Пишется планировщиком загрузки (weather/fetchers.py, manage.py run_fetchers),
+    страницы и API только читают. Ошибка источника сохраняется в error, а
+    данные последней удачной загрузки остаются.
+    """
+    
+    STATUS_OK = 'ok'
+    STATUS_ERROR = 'error'
+    
+    source = models.CharField(max_length=30, unique=True, help_text="Имя источника")
+    data = models.JSONField(null=True, blank=True, help_text="Разобранные данные последней удачной загрузки")
+    digest = models.CharField(max_length=40, blank=True, help_text="SHA-1 данных (версия источника)")
+    fetched_at = models.DateTimeField(null=True, blank=True, help_text="Время последней удачной загрузки")
+    changed_at = models.DateTimeField(null=True, blank=True, help_text="Когда данные последний раз изменились")
+    checked_at = models.DateTimeField(null=True, blank=True, help_text="Время последней попытки загрузки")
+    status = models.CharField(max_length=10, default=STATUS_OK, help_text="Результат последней попытки: ok или error")
+    error = models.TextField(blank=True, help_text="Ошибка последней попытки")
+    published = models.JSONField(null=True, blank=True, help_text="Последнее опубликованное по данным источника живое событие")
+    
+    class Meta:
+        ordering = ['source']
+        verbose_name = "Снимок источника NOAA"
+        verbose_name_plural = "Снимки источников NOAA"
+    
+    def __str__(self):
+        return f"{self.source} ({self.status})"
+
+
+class NotificationSubscription(models.Model):
+    """
+    Подписка на оповещения о новых алертах.
+    
+    Алерт подходит, если его серьезность не ниже min_severity и код
+    сообщения начинается с одного из code_families (пусто — любые коды).
+    Доставка — weather/notifications.py (manage.py run_notifier).
+    """
+    
+    CHANNEL_EMAIL = 'email'
+    CHANNEL_WEBHOOK = 'webhook'
+    CHANNEL_CHOICES = [
+        (CHANNEL_EMAIL, 'Email'),
+        (CHANNEL_WEBHOOK, 'Webhook'),
+    ]
+    
+    name = models.CharField(max_length=100, help_text="Название подписки")
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES, help_text="Канал доставки")
+    target = models.CharField(max_length=255, help_text="Адрес email или URL вебхука")
+    min_severity = models.PositiveSmallIntegerField(default=0, help_text="Минимальный уровень серьезности (0-5)")
+    code_families = models.CharField(max_length=200, blank=True, default='', help_text="Начала кодов сообщений через запятую (WARK,ALTK); пусто — все")
+    is_active = models.BooleanField(default=True, help_text="Подписка включена")
+    created_at = models.DateTimeField(default=timezone.now, help_text="Время создания")
+    
+    class Meta:
+        ordering = ['name']
+        verbose_name = "Подписка на оповещения"
+        verbose_name_plural = "Подписки на оповещения"
+    
+    def __str__(self):
+        return f"{self.name} ({self.channel}: {self.target})"
+    
+    @property
+    def families(self):
+        return [family.strip().upper() for family in self.code_families.split(',') if family.strip()]
+    
+    def matches(self, alert):
+        """Подходит ли алерт под подписку"""
+        if alert.severity < self.min_severity:
+            return False
+        families = self.families
+        return not families or alert.message_code.upper().startswith(tuple(families))
+
+
+class NotificationDelivery(models.Model):
+    """
+    Доставка оповещения об алерте по подписке (очередь и ее состояние).
+    
+    Создается при загрузке алерта в той же транзакции, поэтому оповещение не
+    теряется при перезапуске; после ошибки повторяется с растущей паузой.
+    """
+    
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Ожидает'),
+        (STATUS_SENDING, 'Отправляется'),
+        (STATUS_SENT, 'Доставлено'),
+        (STATUS_FAILED, 'Ошибка'),
+    ]
+    
+    subscription = models.ForeignKey(NotificationSubscription, on_delete=models.CASCADE, related_name='deliveries', help_text="Подписка")
+    channel = models.CharField(max_length=10, help_text="Канал доставки (копия из подписки)")
+    alert_id = models.CharField(max_length=30, help_text="Типизированный ID алерта (k-12)")
+    payload = models.JSONField(help_text="Данные алерта для оповещения")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, help_text="Состояние доставки")
+    attempts = models.PositiveSmallIntegerField(default=0, help_text="Сделано попыток")
+    next_attempt_at = models.DateTimeField(default=timezone.now, help_text="Время следующей попытки")
+    last_error = models.TextField(blank=True, default='', help_text="Ошибка последней попытки")
+    created_at = models.DateTimeField(default=timezone.now, help_text="Время создания")
+    sent_at = models.DateTimeField(null=True, blank=True, help_text="Время доставки")
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Доставка оповещения"
+        verbose_name_plural = "Доставки оповещений"
+        unique_together = ['subscription', 'alert_id']
+        indexes = [
+            # Очередь канала: ожидающие доставки, срок которых наступил
+            models.Index(fields=['channel', 'status', 'next_attempt_at'], name='weather_delivery_queue'),
+        ]
+    
+    def __str__(self):
+        return f"{self.alert_id} -> {self.subscription_id} ({self.status})"
@@ -0,0 +1,341 @@
+"""
+Оповещения о новых алертах по подпискам: email и вебхуки.
+
+Загрузка алертов создает строки NotificationDelivery для подходящих
+подписок (порог серьезности, семейства кодов) в той же транзакции, что и
+сами алерты, поэтому очередь доставок хранится в базе и переживает
+перезапуск. Движок (python manage.py run_notifier) работает в asyncio:
+
+* у каждого канала своя ограниченная очередь (NOTIFY_QUEUE_SIZE); задача
+  чтения забирает из базы не больше доставок, чем в очереди есть места, и
+  ждет, пока отправители ее освободят — медленный канал не копит доставки
+  в памяти и не задерживает другие каналы;
+* отправители канала (NOTIFY_SENDERS) берут из очереди пачку до
+  batch_size доставок: письма пачки уходят через одно соединение SMTP
+  (почтовый бэкенд Django), вебхуки — одним POST на адрес со всеми алертами;
+* результат каждой доставки записывается в базу; после ошибки доставка
+  повторяется через NOTIFY_RETRY_BASE * 2^(попытка-1) секунд (не больше
+  NOTIFY_RETRY_MAX), после NOTIFY_MAX_ATTEMPTS попыток получает статус failed.
+
+Движок рассчитан на один процесс: при запуске доставки, оставшиеся в
+статусе sending после остановки, возвращаются в очередь.
+"""
+
+import asyncio
+import json
+from datetime import timedelta
+
+import aiohttp
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .live import alert_event
+from .models import NotificationDelivery, NotificationSubscription
+
+
+NOTIFY_QUEUE_SIZE = 200  # доставок в очереди канала
+NOTIFY_SENDERS = 2  # одновременных отправок пачек на канал
+NOTIFY_POLL_INTERVAL = 1.0  # секунд между проверками новых доставок
+NOTIFY_RETRY_BASE = 30  # секунд до первого повтора
+NOTIFY_RETRY_MAX = 3600  # предел паузы между повторами
+NOTIFY_MAX_ATTEMPTS = 8
+EMAIL_BATCH_SIZE = 50  # писем на одно соединение SMTP
+WEBHOOK_BATCH_SIZE = 100  # алертов в одном запросе вебхука
+WEBHOOK_TIMEOUT = 10  # секунд на запрос вебхука
+
+
+def site_url():
+    return getattr(settings, 'NOTIFY_SITE_URL', 'http://localhost:8000').rstrip('/')
+
+
+# --- Постановка в очередь (при загрузке) ---
+
+def alert_payload(alert):
+    """Данные оповещения: поля живого события об алерте (в JSON-совместимом виде)"""
+    return json.loads(json.dumps(alert_event(alert), cls=DjangoJSONEncoder))
+
+
+def enqueue_notifications(alerts):
+    """Создает доставки новых алертов по активным подпискам (вызывается в транзакции загрузки)"""
+    if not alerts:
+        return []
+    subscriptions = list(NotificationSubscription.objects.filter(is_active=True))
+    deliveries = []
+    for alert in alerts:
+        matching = [subscription for subscription in subscriptions if subscription.matches(alert)]
+        if not matching:
+            continue
+        payload = alert_payload(alert)
+        deliveries.extend(
+            NotificationDelivery(subscription=subscription, channel=subscription.channel, alert_id=payload['id'], payload=payload)
+            for subscription in matching
+        )
+    if deliveries:
+        NotificationDelivery.objects.bulk_create(deliveries, ignore_conflicts=True)
+    return deliveries
+
+
+# --- Состояние доставок в базе ---
+
+def retry_delay(attempts):
+    """Пауза перед следующей попыткой после attempts неудачных"""
+    return timedelta(seconds=min(NOTIFY_RETRY_BASE * 2 ** (attempts - 1), NOTIFY_RETRY_MAX))
+
+
+def release_claims():
+    """Возвращает в очередь доставки, взятые в работу до остановки движка"""
+    close_old_connections()
+    return NotificationDelivery.objects.filter(status=NotificationDelivery.STATUS_SENDING).update(
+        status=NotificationDelivery.STATUS_PENDING,
+    )
+
+
+def claim_deliveries(channel, limit, now=None):
+    """Забирает в работу до limit доставок канала, срок которых наступил (старые первыми)"""
+    close_old_connections()
+    now = now or timezone.now()
+    with transaction.atomic():
+        ids = list(
+            NotificationDelivery.objects.filter(
+                channel=channel, status=NotificationDelivery.STATUS_PENDING, next_attempt_at__lte=now,
+            ).order_by('next_attempt_at', 'id').values_list('id', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        NotificationDelivery.objects.filter(pk__in=ids).update(status=NotificationDelivery.STATUS_SENDING)
+    return list(NotificationDelivery.objects.filter(pk__in=ids).select_related('subscription').order_by('next_attempt_at', 'id'))
+
+
+def record_results(deliveries, errors, now=None):
+    """Записывает итог пачки: errors[i] — текст ошибки доставки i или None"""
+    close_old_connections()
+    now = now or timezone.now()
+    sent = [delivery.pk for delivery, error in zip(deliveries, errors) if error is None]
+    failed = []
+    for delivery, error in zip(deliveries, errors):
+        if error is None:
+            continue
+        delivery.attempts += 1
+        delivery.last_error = error[:500]
+        if delivery.attempts >= NOTIFY_MAX_ATTEMPTS:
+            delivery.status = NotificationDelivery.STATUS_FAILED
+        else:
+            delivery.status = NotificationDelivery.STATUS_PENDING
+            delivery.next_attempt_at = now + retry_delay(delivery.attempts)
+        failed.append(delivery)
+    with transaction.atomic():
+        if sent:
+            NotificationDelivery.objects.filter(pk__in=sent).update(
+                status=NotificationDelivery.STATUS_SENT, sent_at=now, last_error='',
+            )
+        if failed:
+            NotificationDelivery.objects.bulk_update(failed, ['status', 'attempts', 'next_attempt_at', 'last_error'])
+    return len(sent), len(failed)
+
+
+# --- Каналы ---
+
+class Channel:
+    """
+    Канал доставки. send(deliveries) отправляет пачку и возвращает список
+    ошибок по доставкам (None — доставлено); open/close — на время работы движка.
+    """
+
+    name = None
+    batch_size = 1
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def send(self, deliveries):
+        raise NotImplementedError
+
+
+class EmailChannel(Channel):
+    """Письма через почтовый бэкенд Django: одно соединение SMTP на пачку"""
+
+    name = NotificationSubscription.CHANNEL_EMAIL
+
+    def __init__(self, batch_size=EMAIL_BATCH_SIZE, backend=None):
+        self.batch_size = batch_size
+        self.backend = backend
+
+    def build_message(self, delivery):
+        alert = delivery.payload
+        scale = alert.get('noaa_scale') or 'NOAA'
+        subject = f"[{scale}] {alert['message_code']}-{alert['serial_number']}: {alert.get('title') or ''}"
+        body = '\n\n'.join(part for part in (
+            alert.get('title'),
+            f"Время выпуска: {alert.get('issue_time')} UTC",
+            alert.get('summary'),
+            f"{site_url()}{alert['url']}",
+        ) if part)
+        return EmailMessage(subject[:200], body, settings.DEFAULT_FROM_EMAIL, [delivery.subscription.target])
+
+    def send_batch(self, deliveries):
+        connection = get_connection(backend=self.backend, fail_silently=False)
+        try:
+            connection.open()
+        except Exception as e:
+            return [str(e) or e.__class__.__name__] * len(deliveries)
+        errors = []
+        try:
+            for delivery in deliveries:
+                # По письму за вызов: ошибка одного адреса не влияет на остальные письма пачки
+                try:
+                    connection.send_messages([self.build_message(delivery)])
+                    errors.append(None)
+                except Exception as e:
+                    errors.append(str(e) or e.__class__.__name__)
+        finally:
+            try:
+                connection.close()
+            except Exception:
+                pass
+        return errors
+
+    async def send(self, deliveries):
+        # smtplib блокирующий: отправка идет в пуле потоков, не занимая цикл событий
+        return await sync_to_async(self.send_batch, thread_sensitive=False)(deliveries)
+
+
+class WebhookChannel(Channel):
+    """POST JSON {"alerts": [...]} на адрес подписки: один запрос на адрес в пачке"""
+
+    name = NotificationSubscription.CHANNEL_WEBHOOK
+
+    def __init__(self, batch_size=WEBHOOK_BATCH_SIZE, timeout=WEBHOOK_TIMEOUT):
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.session = None
+
+    async def open(self):
+        # Одна сессия на время работы движка: соединения с адресами переиспользуются
+        self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def post(self, url, deliveries):
+        """Ошибка запроса или None"""
+        try:
+            async with self.session.post(url, json={'alerts': [delivery.payload for delivery in deliveries]}) as response:
+                if response.status >= 300:
+                    return f"HTTP {response.status}"
+        except asyncio.TimeoutError:
+            return f"Вебхук не ответил за {self.timeout} с"
+        except aiohttp.ClientError as e:
+            return str(e) or e.__class__.__name__
+        return None
+
+    async def send(self, deliveries):
+        by_url = {}
+        for delivery in deliveries:
+            by_url.setdefault(delivery.subscription.target, []).append(delivery)
+        results = await asyncio.gather(*(self.post(url, group) for url, group in by_url.items()))
+        error_by_url = dict(zip(by_url, results))
+        return [error_by_url[delivery.subscription.target] for delivery in deliveries]
+
+
+def default_channels():
+    return [EmailChannel(), WebhookChannel()]
+
+
+# --- Движок ---
+
+class ChannelQueue:
+    """Ограниченная очередь канала и событие «в очереди появилось место»"""
+
+    def __init__(self, channel, size):
+        self.channel = channel
+        self.queue = asyncio.Queue(maxsize=size)
+        self.space = asyncio.Event()
+
+    @property
+    def free(self):
+        return self.queue.maxsize - self.queue.qsize()
+
+
+class NotificationEngine:
+    """
+    Доставка оповещений: задача чтения и NOTIFY_SENDERS отправителей на канал.
+
+    run() работает до отмены; run(until_idle=True) доставляет все доставки,
+    срок которых наступил, и завершается (manage.py run_notifier --once, тесты).
+    """
+
+    def __init__(self, channels=None, queue_size=NOTIFY_QUEUE_SIZE, senders=NOTIFY_SENDERS, poll_interval=NOTIFY_POLL_INTERVAL):
+        self.channels = list(channels or default_channels())
+        self.queue_size = queue_size
+        self.senders = senders
+        self.poll_interval = poll_interval
+        self.sent = {channel.name: 0 for channel in self.channels}
+        self.failed = {channel.name: 0 for channel in self.channels}
+
+    async def feed(self, queue, until_idle=False):
+        """Переносит доставки из базы в очередь канала, пока в ней есть место"""
+        while True:
+            if not queue.free:
+                # Обратное давление: ждем, пока отправители заберут пачку
+                queue.space.clear()
+                await queue.space.wait()
+                continue
+            deliveries = await sync_to_async(claim_deliveries)(queue.channel.name, queue.free)
+            for delivery in deliveries:
+                queue.queue.put_nowait(delivery)
+            if not deliveries:
+                if until_idle:
+                    return
+                await asyncio.sleep(self.poll_interval)
+
+    async def send_batches(self, queue):
+        """Отправляет пачки из очереди канала и записывает результат"""
+        channel = queue.channel
+        while True:
+            batch = [await queue.queue.get()]
+            while len(batch) < channel.batch_size and not queue.queue.empty():
+                batch.append(queue.queue.get_nowait())
+            queue.space.set()
+            try:
+                errors = await channel.send(batch)
+            except Exception as e:
+                errors = [str(e) or e.__class__.__name__] * len(batch)
+            try:
+                sent, failed = await sync_to_async(record_results)(batch, errors)
+                self.sent[channel.name] += sent
+                self.failed[channel.name] += failed
+            except Exception as e:
+                # Доставки останутся в статусе sending и вернутся в очередь при перезапуске
+                print(f"Ошибка записи результата оповещений {channel.name}: {e}")
+            finally:
+                for _ in batch:
+                    queue.queue.task_done()
+
+    async def run(self, until_idle=False):
+        await sync_to_async(release_claims)()
+        queues = [ChannelQueue(channel, self.queue_size) for channel in self.channels]
+        for channel in self.channels:
+            await channel.open()
+        senders = [
+            asyncio.ensure_future(self.send_batches(queue))
+            for queue in queues for _ in range(self.senders)
+        ]
+        try:
+            await asyncio.gather(*(self.feed(queue, until_idle) for queue in queues))
+            await asyncio.gather(*(queue.queue.join() for queue in queues))
+        finally:
+            for task in senders:
+                task.cancel()
+            await asyncio.gather(*senders, return_exceptions=True)
+            for channel in self.channels:
+                await channel.close()
+        return {'sent': dict(self.sent), 'failed': dict(self.failed)}
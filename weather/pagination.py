@@ -0,0 +1,173 @@
+"""
+Keyset (cursor) пагинация для ленты алертов.
+
+В отличие от django.core.paginator.Paginator не делает COUNT(*) и OFFSET:
+каждая страница — это один индексированный запрос WHERE (ключ) < (курсор)
+ORDER BY ... LIMIT, поэтому время не зависит от номера страницы.
+Курсоры непрозрачны для клиента (base64 от JSON).
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import Q
+
+
+APPROXIMATE_COUNT_TTL = 60  # секунд
+
+
+def encode_cursor(values, direction):
+    """Кодирует значения ключа последней/первой строки в непрозрачный токен"""
+    raw = json.dumps({'v': values, 'd': direction}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Декодирует токен курсора; возвращает (values, direction) или None"""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values, direction = data['v'], data['d']
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        return None
+    if direction not in ('n', 'p') or not isinstance(values, list):
+        return None
+    return values, direction
+
+
+def approximate_count(queryset):
+    """
+    Дешевая оценка количества строк.
+
+    На PostgreSQL для таблицы без фильтров берется статистика планировщика,
+    иначе точный COUNT(*) кэшируется на короткое время.
+    """
+    model = queryset.model
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql' and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [model._meta.db_table])
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return row[0]
+
+    sql, params = queryset.order_by().query.sql_with_params()
+    key = 'approx-count:' + hashlib.md5(f"{sql}{params}".encode()).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, APPROXIMATE_COUNT_TTL)
+    return count
+
+
+class KeysetPage:
+    """Страница keyset-пагинации (интерфейс близок к django.core.paginator.Page)"""
+
+    def __init__(self, object_list, next_cursor=None, prev_cursor=None, approximate_total=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.approximate_total = approximate_total
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Пагинатор по уникальному составному ключу сортировки.
+
+    ordering — поля в порядке сортировки с префиксом '-' для убывания;
+    последние поля должны делать ключ уникальным.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-issue_time', '-content_type_id', '-object_id'), with_total=False):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = list(ordering)
+        self.with_total = with_total
+        opts = queryset.model._meta
+        self.fields = [opts.get_field(name.lstrip('-')) for name in self.ordering]
+        self.descending = [name.startswith('-') for name in self.ordering]
+
+    def _row_key(self, obj):
+        # Строки могут быть и моделями, и словарями из .values()
+        if isinstance(obj, dict):
+            return [obj[field.attname] for field in self.fields]
+        return [getattr(obj, field.attname) for field in self.fields]
+
+    def _serialize(self, values):
+        return [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+
+    def _deserialize(self, values):
+        return [field.to_python(value) for field, value in zip(self.fields, values)]
+
+    def _after(self, values, reverse=False):
+        """Условие 'строка идет после ключа' в порядке сортировки (или перед ним при reverse)"""
+        condition = Q()
+        equal = Q()
+        for field, descending, value in zip(self.fields, self.descending, values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= equal & Q(**{f"{field.attname}__{lookup}": value})
+            equal &= Q(**{field.attname: value})
+        # Избыточное условие по первому полю дает планировщику диапазон по индексу
+        first_lookup = 'lte' if self.descending[0] != reverse else 'gte'
+        return condition & Q(**{f"{self.fields[0].attname}__{first_lookup}": values[0]})
+
+    def get_page(self, cursor=None):
+        """Возвращает страницу по токену курсора (невалидный курсор — первая страница)"""
+        decoded = decode_cursor(cursor)
+        values, direction = None, 'n'
+        if decoded:
+            try:
+                values = self._deserialize(decoded[0])
+                direction = decoded[1]
+            except Exception:
+                values = None
+            if values is not None and len(values) != len(self.fields):
+                values = None
+
+        queryset = self.queryset
+        if direction == 'p' and values is not None:
+            reversed_ordering = [name[1:] if name.startswith('-') else f"-{name}" for name in self.ordering]
+            rows = list(queryset.filter(self._after(values, reverse=True)).order_by(*reversed_ordering)[:self.per_page + 1])
+            has_more = len(rows) > self.per_page
+            rows = list(reversed(rows[:self.per_page]))
+            has_previous, has_next = has_more, True
+        else:
+            if values is not None:
+                queryset = queryset.filter(self._after(values))
+            rows = list(queryset.order_by(*self.ordering)[:self.per_page + 1])
+            has_next = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            has_previous = values is not None
+
+        next_cursor = prev_cursor = None
+        if rows and has_next:
+            next_cursor = encode_cursor(self._serialize(self._row_key(rows[-1])), 'n')
+        if rows and has_previous:
+            prev_cursor = encode_cursor(self._serialize(self._row_key(rows[0])), 'p')
+
+        total = approximate_count(self.queryset) if self.with_total else None
+        return KeysetPage(rows, next_cursor=next_cursor, prev_cursor=prev_cursor, approximate_total=total)
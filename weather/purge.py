@@ -0,0 +1,150 @@
+"""
+Очистка всех таблиц алертов без блокировки запроса.
+
+QuerySet.delete() для алертов загружает строки в сборщик Django (ради
+сигналов и каскада на комментарии) и держит одну длинную транзакцию,
+что на большой базе SQLite блокирует запись надолго. Здесь удаление идет
+пачками по первичному ключу в коротких транзакциях: в каждой пачке
+массово удаляются комментарии, записи ленты, звенья цепочек, поисковые
+документы и сами алерты, а статистика уменьшается на удаленное. Прогресс
+пишется в PurgeJob; очистка без прогресса дольше PURGE_STALE_AFTER (поток
+умер вместе с процессом) считается прерванной и не мешает запустить новую.
+"""
+
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .alert_stats import apply_stat_deltas, stat_deltas
+from .models import ALERT_KINDS, AlertChain, AlertComment, AlertIndex, PurgeJob, touch_content_version
+from .search import remove_search_documents
+
+
+PURGE_CHUNK_SIZE = 1000
+# Очистка без обновления updated_at дольше этого срока считается брошенной
+PURGE_STALE_AFTER = timedelta(minutes=10)
+
+
+def active_purge_job():
+    """Незавершенная очистка, если она есть (брошенные помечаются ошибкой)"""
+    unfinished = PurgeJob.objects.filter(status__in=[PurgeJob.STATUS_PENDING, PurgeJob.STATUS_RUNNING])
+    now = timezone.now()
+    unfinished.filter(updated_at__lt=now - PURGE_STALE_AFTER).update(
+        status=PurgeJob.STATUS_FAILED,
+        error='Очистка прервана: нет прогресса (процесс остановлен?)',
+        current_kind='',
+        finished_at=now,
+    )
+    return unfinished.first()
+
+
+def start_purge_job(background=None):
+    """
+    Запускает очистку (или возвращает уже идущую).
+
+    По умолчанию работа выполняется в фоновом потоке (ALERT_PURGE_BACKGROUND),
+    и запрос возвращается сразу.
+    """
+    job = active_purge_job()
+    if job:
+        return job
+    job = PurgeJob.objects.create(total=AlertIndex.objects.count())
+
+    if background is None:
+        background = getattr(settings, 'ALERT_PURGE_BACKGROUND', True)
+    if background:
+        threading.Thread(target=run_purge_job_in_thread, args=(job.pk,), daemon=True).start()
+    else:
+        run_purge_job(job.pk)
+        job.refresh_from_db()
+    return job
+
+
+def run_purge_job_in_thread(job_id):
+    try:
+        run_purge_job(job_id)
+    finally:
+        # У фонового потока свое соединение — закрываем его сами
+        connection.close()
+
+
+def delete_rows(model, pks):
+    """
+    DELETE по первичному ключу одним SQL-запросом, без сборщика и сигналов Django.
+
+    QuerySet.delete() для алертов выбирает строки (из-за сигнала post_delete и
+    GenericRelation на комментарии) и удаляет их по одной с сигналами.
+    """
+    placeholders = ', '.join(['%s'] * len(pks))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {model._meta.db_table} WHERE {model._meta.pk.column} IN ({placeholders})", pks)
+        return cursor.rowcount
+
+
+def purge_chunk(model, content_type, pks):
+    """Удаляет пачку алертов одной таблицы вместе со всем, что на них ссылается"""
+    comments = AlertComment.objects.filter(content_type=content_type, object_id__in=pks).delete()[0]
+
+    entries = list(
+        AlertIndex.objects.filter(content_type=content_type, object_id__in=pks)
+        .only('pk', 'content_type', 'issue_time', 'active_until')
+    )
+    if entries:
+        index_ids = [entry.pk for entry in entries]
+        apply_stat_deltas(stat_deltas(entries, sign=-1))
+        remove_search_documents(index_ids)
+        AlertIndex.objects.filter(pk__in=index_ids).delete()
+    AlertChain.objects.filter(content_type=content_type, object_id__in=pks).delete()
+
+    # Все связанное уже удалено выше
+    deleted = delete_rows(model, pks)
+    touch_content_version()
+    return deleted, comments
+
+
+def delete_orphaned_comments():
+    """Удаляет комментарии, ссылающиеся на несуществующие алерты (по запросу на тип)"""
+    deleted = 0
+    for model in ALERT_KINDS.values():
+        deleted += AlertComment.objects.filter(
+            content_type=ContentType.objects.get_for_model(model),
+        ).exclude(object_id__in=model.objects.values('pk')).delete()[0]
+    return deleted
+
+
+def run_purge_job(job_id, chunk_size=PURGE_CHUNK_SIZE):
+    """Выполняет очистку пачками, обновляя прогресс после каждой пачки"""
+    job = PurgeJob.objects.get(pk=job_id)
+    job.status = PurgeJob.STATUS_RUNNING
+    job.updated_at = timezone.now()
+    job.save(update_fields=['status', 'updated_at'])
+
+    try:
+        for kind, model in ALERT_KINDS.items():
+            content_type = ContentType.objects.get_for_model(model)
+            job.current_kind = kind
+            while True:
+                with transaction.atomic():
+                    pks = list(model.objects.order_by('pk').values_list('pk', flat=True)[:chunk_size])
+                    if not pks:
+                        break
+                    deleted, comments = purge_chunk(model, content_type, pks)
+                    job.deleted += deleted
+                    job.comments_deleted += comments
+                    job.updated_at = timezone.now()
+                    job.save(update_fields=['deleted', 'comments_deleted', 'current_kind', 'updated_at'])
+
+        job.comments_deleted += delete_orphaned_comments()
+        touch_content_version()
+        job.status = PurgeJob.STATUS_DONE
+    except Exception as e:
+        job.status = PurgeJob.STATUS_FAILED
+        job.error = str(e)
+    job.current_kind = ''
+    job.finished_at = job.updated_at = timezone.now()
+    job.save()
+    return job
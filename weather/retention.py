@@ -0,0 +1,96 @@
+"""
+Политика хранения алертов.
+
+Алерты старше заданного срока переносятся из рабочих таблиц в ArchivedAlert:
+все поля и комментарии сериализуются в JSON и хранятся сжатыми, поэтому
+рабочие таблицы и лента остаются небольшими, а архивный алерт по-прежнему
+открывается по своему типизированному идентификатору (например k-42).
+"""
+
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import ALERT_KINDS, ArchivedAlert
+
+
+DEFAULT_RETENTION_DAYS = 365
+
+
+def retention_days():
+    return getattr(settings, 'ALERT_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)
+
+
+def serialize_alert(alert):
+    """Словарь со всеми полями алерта и его комментариями (для JSON)"""
+    data = {field.attname: field.value_from_object(alert) for field in alert._meta.concrete_fields}
+    data['comments'] = [
+        {'author_name': comment.author_name, 'content': comment.content, 'created_at': comment.created_at}
+        for comment in alert.comments.all()
+    ]
+    return data
+
+
+def archive_alerts(days=None, batch_size=500, dry_run=False):
+    """
+    Переносит в архив алерты с issue_time старше days дней.
+
+    Каждая пачка архивируется и удаляется из рабочей таблицы в одной
+    транзакции. Возвращает {семейство: количество}.
+    """
+    cutoff = timezone.now() - timezone.timedelta(days=retention_days() if days is None else days)
+    moved = {}
+    for kind, model in ALERT_KINDS.items():
+        queryset = model.objects.filter(issue_time__lt=cutoff)
+        if dry_run:
+            moved[kind] = queryset.count()
+            continue
+
+        moved[kind] = 0
+        while True:
+            with transaction.atomic():
+                batch = list(queryset.order_by('pk').prefetch_related('comments')[:batch_size])
+                if not batch:
+                    break
+                ArchivedAlert.objects.bulk_create([
+                    ArchivedAlert(
+                        kind=kind,
+                        original_id=alert.pk,
+                        message_code=alert.message_code,
+                        serial_number=alert.serial_number,
+                        issue_time=alert.issue_time,
+                        payload=json.dumps(serialize_alert(alert), cls=DjangoJSONEncoder, ensure_ascii=False),
+                    )
+                    for alert in batch
+                ], ignore_conflicts=True)
+                # Удаление через ORM: сигналы убирают алерт из ленты и статистики, комментарии удаляются каскадом
+                model.objects.filter(pk__in=[alert.pk for alert in batch]).delete()
+            moved[kind] += len(batch)
+    return moved
+
+
+def restore_archived_alert(archived):
+    """
+    Восстанавливает (не сохраняя) экземпляр алерта из архива.
+
+    Возвращает (alert, comments); комментарии — словари с полями AlertComment.
+    """
+    model = ALERT_KINDS[archived.kind]
+    data = json.loads(archived.payload)
+    comments = data.pop('comments', [])
+    fields = {field.attname: field for field in model._meta.concrete_fields}
+    alert = model(**{
+        name: fields[name].to_python(value) for name, value in data.items() if name in fields
+    })
+    for comment in comments:
+        comment['created_at'] = parse_datetime(comment['created_at']) if comment.get('created_at') else None
+    return alert, comments
+
+
+def find_archived_alert(kind, alert_id):
+    """Архивная запись алерта по типизированному идентификатору или None"""
+    return ArchivedAlert.objects.filter(kind=kind, original_id=alert_id).first()
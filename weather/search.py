@@ -0,0 +1,203 @@
+"""
+Полнотекстовый поиск по алертам всех семейств.
+
+Документ поиска привязан к записи ленты (AlertIndex.id) и содержит код
+сообщения, тип предупреждения, исходный текст NOAA и переведенные поля.
+Полный текст в таблицах алертов хранится сжатым, поэтому триггеры базы его
+прочитать не могут: индекс обновляется из тех же хуков, что и лента
+(weather/alert_index.py).
+
+SQLite — виртуальная таблица FTS5 (ранжирование bm25, snippet()),
+PostgreSQL — таблица с генерируемой колонкой tsvector и GIN-индексом
+(ts_rank_cd, ts_headline). На остальных СУБД поиск идет по ленте через
+icontains без сниппетов.
+"""
+
+import re
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.utils.html import escape
+
+from .models import ALERT_MODELS, AlertIndex
+
+
+SEARCH_TABLE = 'weather_alertsearch'
+
+# Веса колонок bm25: код, тип предупреждения, исходный текст, перевод
+BM25_WEIGHTS = (10.0, 5.0, 1.0, 2.0)
+
+# Служебные маркеры подсветки: заменяются на <mark> после экранирования HTML
+MARK_START, MARK_END = '\x02', '\x03'
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def search_backend(conn=None):
+    """'fts5', 'tsvector' или None (поиск через icontains)"""
+    conn = conn or connection
+    # Результат проверки запоминается на соединении (ключ — имя базы, оно меняется в тестах)
+    cached = getattr(conn, '_alert_search_backend', None)
+    if cached and cached[0] == conn.settings_dict['NAME']:
+        return cached[1]
+
+    backend = None
+    if conn.vendor == 'sqlite':
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            if cursor.fetchone()[0]:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [SEARCH_TABLE])
+                backend = 'fts5' if cursor.fetchone() else None
+    elif conn.vendor == 'postgresql':
+        backend = 'tsvector'
+    conn._alert_search_backend = (conn.settings_dict['NAME'], backend)
+    return backend
+
+
+def search_document(alert):
+    """Текстовые поля документа поиска для алерта любого типа"""
+    translated = [
+        getattr(alert, name, None) or ''
+        for name in ('description', 'potential_impacts', 'forecast_data')
+    ]
+    return (
+        alert.message_code or '',
+        alert.warning_type or '',
+        alert.full_message or '',
+        '\n'.join(part for part in translated if part),
+    )
+
+
+def index_search_documents(pairs):
+    """Добавляет или заменяет документы поиска; pairs — [(AlertIndex.id, алерт)]"""
+    pairs = [(index_id, alert) for index_id, alert in pairs if index_id is not None]
+    backend = search_backend()
+    if not pairs or backend is None:
+        return
+    rows = [(index_id, *search_document(alert)) for index_id, alert in pairs]
+    with connection.cursor() as cursor:
+        if backend == 'fts5':
+            remove_search_documents([index_id for index_id, _ in pairs])
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (rowid, message_code, title, original, translated) VALUES (%s, %s, %s, %s, %s)",
+                rows,
+            )
+        else:
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (index_id, message_code, title, original, translated) VALUES (%s, %s, %s, %s, %s) "
+                "ON CONFLICT (index_id) DO UPDATE SET message_code = EXCLUDED.message_code, title = EXCLUDED.title, "
+                "original = EXCLUDED.original, translated = EXCLUDED.translated",
+                rows,
+            )
+
+
+def remove_search_documents(index_ids):
+    """Удаляет документы поиска для записей ленты"""
+    index_ids = list(index_ids)
+    backend = search_backend()
+    if not index_ids or backend is None:
+        return
+    key = 'rowid' if backend == 'fts5' else 'index_id'
+    with connection.cursor() as cursor:
+        for start in range(0, len(index_ids), 500):
+            chunk = index_ids[start:start + 500]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE {key} IN ({placeholders})", chunk)
+
+
+def rebuild_search_index(batch_size=500):
+    """Полностью пересоздает поисковый индекс по ленте и таблицам алертов"""
+    if search_backend() is None:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+    indexed = 0
+    for model in ALERT_MODELS:
+        content_type = ContentType.objects.get_for_model(model)
+        index_ids = dict(
+            AlertIndex.objects.filter(content_type=content_type).values_list('object_id', 'id')
+        )
+        batch = []
+        for alert in model.objects.all().iterator(chunk_size=batch_size):
+            batch.append((index_ids.get(alert.pk), alert))
+            if len(batch) >= batch_size:
+                index_search_documents(batch)
+                indexed += len(batch)
+                batch = []
+        index_search_documents(batch)
+        indexed += len(batch)
+    return indexed
+
+
+def fts5_query(query):
+    """
+    Безопасный запрос FTS5 из пользовательского ввода.
+
+    Слова берутся в кавычки (операторы и спецсимволы FTS5 не интерпретируются)
+    и объединяются через AND; последнее слово ищется по префиксу.
+    """
+    tokens = TOKEN_RE.findall(query)
+    if not tokens:
+        return ''
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def highlight(snippet):
+    """Экранирует сниппет и заменяет служебные маркеры на <mark>"""
+    return escape(snippet or '').replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+
+
+class SearchHit:
+    """Результат поиска: запись ленты, ранг и сниппет (HTML)"""
+
+    def __init__(self, entry, rank, snippet):
+        self.entry = entry
+        self.rank = rank
+        self.snippet = snippet
+
+
+def search_alerts(query, limit=20):
+    """Ранжированный поиск по алертам; возвращает список SearchHit"""
+    backend = search_backend()
+    if not query or not query.strip():
+        return []
+
+    if backend == 'fts5':
+        match = fts5_query(query)
+        if not match:
+            return []
+        weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+        sql = (
+            f"SELECT rowid, bm25({SEARCH_TABLE}, {weights}) AS rank, "
+            f"snippet({SEARCH_TABLE}, -1, %s, %s, '…', 16) "
+            f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s ORDER BY rank LIMIT %s"
+        )
+        params = [MARK_START, MARK_END, match, limit]
+    elif backend == 'tsvector':
+        tsquery = "(websearch_to_tsquery('english', %s) || websearch_to_tsquery('russian', %s))"
+        sql = (
+            f"SELECT index_id, ts_rank_cd(document, {tsquery}) AS rank, "
+            f"ts_headline('english', original || ' ' || translated, {tsquery}, "
+            f"'StartSel=' || chr(2) || ', StopSel=' || chr(3) || ', MaxWords=30, MinWords=10') "
+            f"FROM {SEARCH_TABLE} WHERE document @@ {tsquery} ORDER BY rank DESC LIMIT %s"
+        )
+        params = [query, query, query, query, query, query, limit]
+    else:
+        entries = (
+            AlertIndex.objects.filter(title__icontains=query)
+            | AlertIndex.objects.filter(summary__icontains=query)
+            | AlertIndex.objects.filter(message_code__icontains=query)
+        )
+        return [SearchHit(entry, None, escape(entry.summary)) for entry in entries[:limit]]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    entries = AlertIndex.objects.in_bulk([row[0] for row in rows])
+    return [
+        SearchHit(entries[index_id], rank, highlight(snippet))
+        for index_id, rank, snippet in rows
+        if index_id in entries
+    ]
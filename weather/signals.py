@@ -0,0 +1,26 @@
+from django.db.models.signals import post_delete, post_save
+
+from .alert_index import index_alert, unindex_alert
+from .live import publish_new_alerts
+from .models import ALERT_MODELS
+from .notifications import enqueue_notifications
+
+
+def alert_saved(sender, instance, created=False, raw=False, **kwargs):
+    """Обновляет ленту алертов после сохранения, оповещает открытые страницы и подписчиков о новом алерте"""
+    if raw:
+        return
+    index_alert(instance)
+    if created:
+        publish_new_alerts([instance])
+        enqueue_notifications([instance])
+
+
+def alert_deleted(sender, instance, **kwargs):
+    """Убирает алерт из ленты после удаления"""
+    unindex_alert(instance)
+
+
+for alert_model in ALERT_MODELS:
+    post_save.connect(alert_saved, sender=alert_model, dispatch_uid=f'index_{alert_model.__name__}')
+    post_delete.connect(alert_deleted, sender=alert_model, dispatch_uid=f'unindex_{alert_model.__name__}')
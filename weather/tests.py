@@ -1,3 +1,1388 @@
-from django.test import TestCase
+import asyncio
+import json
+import math
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import numpy as np
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.db.models import Q
+from django.http import QueryDict
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .benchmarks.servers import StandInServers
+from .benchmarks.suite import fake_translator, load_corpus
+from .database import sqlite_pragma_values
+from .retention import archive_alerts
+from .search import search_alerts
+from .purge import active_purge_job, run_purge_job, start_purge_job
+from .timeseries import ingest_time_series, read_window
+from .charts import build_chart, cached_chart, lttb
+from .kp_stats import daily_stats, g_distribution, g_levels, rolling_max, storm_day_counts
+from .live import LiveHub, event_stream, events_after, format_event, hub, publish_scales
+from .ingest import import_alerts, ingest_alerts_payload, parse_api_datetime, write_new_alerts
+from .alert_chain import event_history, load_events, parse_alert_reference
+from .alert_index import rebuild_alert_index
+from .alert_stats import dashboard_stats, rebuild_alert_stats
+from .models import (
+    ALERT_MODELS, AlertChain, AlertComment, AlertDailyStat, AlertIndex, ArchivedAlert, IngestState, PurgeJob, SpaceWeatherAlert, TypeKGeomagneticAlert,
+    TypeAForecastAlert, TypeTRadioAlert, SolarWindPlasmaSample, KpIndexSample, LiveEvent, NotificationDelivery,
+    NotificationSubscription, noaa_scale_severity,
+)
+from .notifications import (
+    NOTIFY_MAX_ATTEMPTS, NOTIFY_RETRY_BASE, Channel, EmailChannel, NotificationEngine, WebhookChannel,
+    enqueue_notifications, retry_delay,
+)
+from .alert_filters import AlertListParams
+from .pagination import KeysetPaginator
+from .fetchers import (
+    FETCH_ERROR_RETRY, FetchError, FetchScheduler, Source, load_snapshot, parse_conditions, parse_forecast,
+    parse_magnetometer, parse_proton_flux, parse_xray_flux, save_source_data, save_source_error,
+)
+from .views.noaa_views import parse_alert_message
+
+
+class AlertCorpusTests(TestCase):
+    """Проверки парсинга и импорта на записанном корпусе алертов"""
+
+    def setUp(self):
+        self.corpus = load_corpus()
+
+    def test_corpus_messages_are_parsed(self):
+        for entry in self.corpus:
+            parsed = parse_alert_message(entry)
+            self.assertTrue(parsed.get('message_code'), entry['message'][:60])
+            self.assertTrue(parsed.get('serial_number'), entry['message'][:60])
+            self.assertIsNotNone(parsed.get('issue_time'), entry['message'][:60])
+
+    def test_scaled_corpus_has_unique_serials(self):
+        corpus = load_corpus(scale=3)
+        keys = {(p['message_code'], p['serial_number']) for p in map(parse_alert_message, corpus)}
+        self.assertEqual(len(keys), len(corpus))
+
+    def test_import_skips_existing_alerts(self):
+        with fake_translator():
+            first = import_alerts(self.corpus)
+            second = import_alerts(self.corpus)
+        self.assertEqual(first.loaded, len(self.corpus))
+        self.assertEqual(first.errors, [])
+        self.assertEqual(second.loaded, 0)
+        self.assertEqual(second.skipped, len(self.corpus))
+
+
+class StoredSeverityTests(TestCase):
+    """Хранимые severity и active_until у алертов всех семейств"""
+
+    def test_fields_are_computed_on_save(self):
+        now = timezone.now()
+        alert = TypeKGeomagneticAlert.objects.create(
+            message_code='WARK06', serial_number='1', issue_time=now, warning_type='WARNING',
+            full_message='message', noaa_scale='G3 - Strong', valid_to=now + timedelta(hours=2),
+        )
+        alert.refresh_from_db()
+        self.assertEqual(alert.severity, 3)
+        self.assertTrue(alert.is_active)
+        self.assertEqual(AlertIndex.objects.get().severity, 3)
+
+        alert.valid_to = now - timedelta(hours=1)
+        alert.save()
+        self.assertFalse(TypeKGeomagneticAlert.objects.get(pk=alert.pk).is_active)
+
+    def test_bulk_import_stores_fields(self):
+        with fake_translator():
+            import_alerts(load_corpus())
+        for model in (SpaceWeatherAlert, TypeKGeomagneticAlert):
+            for alert in model.objects.all():
+                self.assertEqual(alert.severity, noaa_scale_severity(alert.noaa_scale))
+                self.assertEqual(alert.active_until, alert.valid_to)
+
+    def test_active_severe_alerts_use_index(self):
+        now = timezone.now()
+        for serial_number, scale, hours in (('1', 'G3', 1), ('2', 'G1', 1), ('3', 'G4', -1)):
+            TypeKGeomagneticAlert.objects.create(
+                message_code='WARK05', serial_number=serial_number, issue_time=now, warning_type='WARNING',
+                full_message='message', noaa_scale=scale, valid_to=now + timedelta(hours=hours),
+            )
+        queryset = TypeKGeomagneticAlert.objects.active().min_severity(3)
+        self.assertEqual(list(queryset.values_list('serial_number', flat=True)), ['1'])
+        self.assertIn('USING INDEX', queryset.explain())
+
+
+class IncrementalIngestTests(TestCase):
+    """Инкрементальная загрузка: хеш выгрузки и high-water mark"""
+
+    def setUp(self):
+        self.corpus = load_corpus()
+        self.payload = json.dumps(self.corpus).encode()
+
+    def test_identical_payload_short_circuits(self):
+        with fake_translator():
+            first = ingest_alerts_payload(self.payload)
+            with self.assertNumQueries(1):
+                second = ingest_alerts_payload(self.payload)
+        self.assertEqual(first.loaded, len(self.corpus))
+        self.assertTrue(second.unchanged)
+        self.assertEqual(second.loaded, 0)
+
+    def test_only_entries_newer_than_watermark_are_processed(self):
+        with fake_translator():
+            ingest_alerts_payload(self.payload)
+            watermark = IngestState.objects.get(source='alerts').high_water_mark
+            newest = max(self.corpus, key=lambda entry: entry['issue_datetime'])
+            result = ingest_alerts_payload(json.dumps([newest] + self.corpus).encode())
+        # Обрабатываются только две копии самого нового алерта, обе уже в базе
+        self.assertEqual(result.loaded, 0)
+        self.assertEqual(result.skipped, 2)
+        self.assertEqual(result.below_watermark, len(self.corpus) - 1)
+        self.assertEqual(IngestState.objects.get(source='alerts').high_water_mark, watermark)
+
+    def test_malformed_entry_does_not_block_watermark(self):
+        newest = max(self.corpus, key=lambda entry: entry['issue_datetime'])
+        malformed = {'product_id': 'K05W', 'issue_datetime': newest['issue_datetime'], 'message': ''}
+        payload = json.dumps(self.corpus + [malformed]).encode()
+        with fake_translator():
+            first = ingest_alerts_payload(payload)
+            second = ingest_alerts_payload(payload)
+        self.assertEqual((first.loaded, len(first.errors), first.transient_errors), (len(self.corpus), 1, 0))
+        state = IngestState.objects.get(source='alerts')
+        self.assertEqual(state.high_water_mark, parse_api_datetime(newest['issue_datetime']))
+        self.assertTrue(second.unchanged)
+
+    def test_full_reprocesses_everything(self):
+        with fake_translator():
+            ingest_alerts_payload(self.payload)
+            result = ingest_alerts_payload(self.payload, full=True)
+        self.assertFalse(result.unchanged)
+        self.assertEqual(result.below_watermark, 0)
+        self.assertEqual(result.skipped, len(self.corpus))
+
+
+class AlertIndexTests(TestCase):
+    """Лента алертов поддерживается при сохранении и удалении"""
+
+    def create_alert(self, **kwargs):
+        data = {
+            'message_code': 'ALTK07',
+            'serial_number': '100',
+            'issue_time': timezone.now(),
+            'warning_type': 'ALERT: Geomagnetic K-index of 7',
+            'full_message': 'Space Weather Message Code: ALTK07',
+            'noaa_scale': 'G3 - Strong',
+            'valid_to': timezone.now() + timezone.timedelta(hours=3),
+        }
+        data.update(kwargs)
+        return TypeKGeomagneticAlert.objects.create(**data)
+
+    def test_save_and_delete_maintain_index(self):
+        alert = self.create_alert()
+        entry = AlertIndex.objects.get(object_id=alert.pk)
+        self.assertEqual(entry.alert, alert)
+        self.assertEqual(entry.severity, 3)
+        self.assertTrue(entry.is_active)
+
+        alert.noaa_scale = 'G4 - Severe'
+        alert.save()
+        self.assertEqual(AlertIndex.objects.get(object_id=alert.pk).severity, 4)
+
+        alert.delete()
+        self.assertFalse(AlertIndex.objects.exists())
+
+    def test_rebuild_matches_alert_tables(self):
+        with fake_translator():
+            import_alerts(load_corpus())
+        count = AlertIndex.objects.count()
+        AlertIndex.objects.all().delete()
+        self.assertEqual(rebuild_alert_index(), count)
+
+    def test_list_page_is_ordered_by_issue_time(self):
+        now = timezone.now()
+        for i in range(25):
+            self.create_alert(serial_number=str(i), issue_time=now - timezone.timedelta(hours=i))
+        response = self.client.get(reverse('admin_alerts'))
+        self.assertEqual(response.status_code, 200)
+        session = self.client.session
+        session['admin_authenticated'] = True
+        session.save()
+        response = self.client.get(reverse('admin_alerts'))
+        serials = [entry.serial_number for entry in response.context['alerts']]
+        self.assertEqual(serials, [str(i) for i in range(20)])
+
+
+class AlertChainTests(TestCase):
+    """Цепочки продлений, продолжений и отмен поддерживаются при загрузке"""
+
+    def chain(self, code, serial):
+        return AlertChain.objects.get(message_code=code, serial_number=serial)
+
+    def create_warning(self, serial, issue_time, reference=''):
+        message = f"Space Weather Message Code: WARK05\nSerial Number: {serial}\n"
+        if reference:
+            message += f"\nEXTENDED WARNING: Geomagnetic K-index of 5 expected\nExtension to Serial Number: {reference}\n"
+        return SpaceWeatherAlert.objects.create(
+            message_code='WARK05', serial_number=serial, issue_time=issue_time,
+            warning_type='WARNING', full_message=message, valid_to=issue_time + timedelta(hours=6),
+        )
+
+    def test_parser_extracts_reference_serials(self):
+        references = {
+            parse_alert_message(entry)['serial_number']: parse_alert_reference(entry['message'])
+            for entry in load_corpus()
+        }
+        self.assertEqual(references['4570'], ('extension', '4561'))
+        self.assertEqual(references['1012'], ('cancel', '4562'))
+        self.assertEqual(references['3371'], ('continuation', '3370'))
+        self.assertEqual(references['4561'], ('original', ''))
+
+    def test_import_links_events_and_current_state(self):
+        with fake_translator():
+            import_alerts(load_corpus(scale=2))
+        original, extension = self.chain('WARK05', '4561'), self.chain('WARK05', '4570')
+        self.assertEqual(extension.predecessor, original)
+        self.assertEqual((original.root_id, extension.root_id), (original.pk, original.pk))
+        self.assertEqual((original.is_current, extension.is_current), (False, True))
+        self.assertEqual(self.chain('WARK06', '1012').root, self.chain('WARK06', '4562'))
+        # Копия корпуса — отдельные события со своими номерами
+        self.assertEqual(self.chain('ALTEF3', '103371').predecessor, self.chain('ALTEF3', '103370'))
+
+        now = datetime(2024, 10, 11, 5, 55, tzinfo=dt_timezone.utc)
+        effective = set(AlertChain.objects.effective(now).values_list('message_code', 'serial_number'))
+        self.assertIn(('WARK05', '4570'), effective)
+        self.assertNotIn(('WARK05', '4561'), effective)
+        self.assertFalse({key for key in effective if key[0] == 'WARK06'})
+
+        continuation = TypeAForecastAlert.objects.get(serial_number='3371')
+        with self.assertNumQueries(1):
+            history = list(event_history(continuation))
+        self.assertEqual([entry.serial_number for entry in history], ['3370', '3371'])
+
+    def test_out_of_order_arrival_and_delete(self):
+        now = timezone.now()
+        extension = self.create_warning('20', now, reference='10')
+        self.assertIsNone(self.chain('WARK05', '20').predecessor)
+
+        original = self.create_warning('10', now - timedelta(hours=3))
+        self.assertEqual(self.chain('WARK05', '20').predecessor_id, self.chain('WARK05', '10').pk)
+        self.assertEqual(list(AlertChain.objects.current().values_list('serial_number', flat=True)), ['20'])
+
+        original.delete()
+        entry = self.chain('WARK05', '20')
+        self.assertEqual((entry.predecessor_id, entry.root_id, entry.is_current), (None, entry.pk, True))
+        extension.delete()
+        self.assertFalse(AlertChain.objects.exists())
+
+    def test_codes_sharing_a_serial_stay_in_separate_chains(self):
+        now = timezone.now()
+        self.create_warning('10', now - timedelta(hours=5))
+        self.create_warning('20', now - timedelta(hours=2), reference='10')
+        for serial, issue_time, reference in (('10', now - timedelta(hours=4), ''), ('30', now, '10')):
+            message = f"Space Weather Message Code: ALTEF3\nSerial Number: {serial}\n"
+            if reference:
+                message += f"Continuation of Serial Number: {reference}\n"
+            SpaceWeatherAlert.objects.create(
+                message_code='ALTEF3', serial_number=serial, issue_time=issue_time,
+                warning_type='ALERT', full_message=message,
+            )
+        # Тот же номер у того же кода год назад — другое событие
+        self.create_warning('40', now - timedelta(days=365))
+        self.create_warning('50', now - timedelta(hours=1), reference='40')
+
+        self.assertEqual(self.chain('WARK05', '20').predecessor, self.chain('WARK05', '10'))
+        self.assertEqual(self.chain('ALTEF3', '30').predecessor, self.chain('ALTEF3', '10'))
+        self.assertEqual(self.chain('WARK05', '10').root, self.chain('WARK05', '10'))
+        self.assertIsNone(self.chain('WARK05', '50').predecessor)
+        event = load_events([self.chain('WARK05', '20')])
+        self.assertEqual({(entry.message_code, entry.serial_number) for entry in event}, {('WARK05', '10'), ('WARK05', '20')})
+
+    def test_rebuild_matches_incremental_chain(self):
+        with fake_translator():
+            import_alerts(load_corpus())
+        fields = ('message_code', 'serial_number', 'relation', 'predecessor__serial_number', 'root__serial_number', 'is_current')
+        incremental = set(AlertChain.objects.values_list(*fields))
+        rebuild_alert_index()
+        self.assertEqual(set(AlertChain.objects.values_list(*fields)), incremental)
+
+
+class AlertStatsTests(TestCase):
+    """Статистика алертов поддерживается вместе с лентой"""
+
+    def snapshot(self):
+        return sorted(AlertDailyStat.objects.exclude(issued=0, expiring=0).values_list('family', 'day', 'issued', 'expiring'))
+
+    def test_import_and_delete_maintain_rollup(self):
+        with fake_translator():
+            import_alerts(load_corpus())
+        incremental = self.snapshot()
+        rebuild_alert_stats()
+        self.assertEqual(self.snapshot(), incremental)
+        self.assertEqual(dashboard_stats()['total_alerts'], AlertIndex.objects.count())
+
+        for model in ALERT_MODELS:
+            model.objects.all().delete()
+        self.assertEqual(self.snapshot(), [])
+
+    def test_rows_inserted_by_concurrent_ingest_are_not_counted_twice(self):
+        issue_time = timezone.now()
+        fields = {
+            'message_code': 'ALTK06', 'serial_number': '700', 'issue_time': issue_time,
+            'warning_type': 'ALERT', 'full_message': 'Space Weather Message Code: ALTK06',
+        }
+        # Параллельная загрузка успела вставить тот же алерт после проверки дубликатов
+        with self.captureOnCommitCallbacks(execute=True):
+            TypeKGeomagneticAlert.objects.create(**fields)
+        stats, events = self.snapshot(), LiveEvent.objects.count()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            saved = write_new_alerts({TypeKGeomagneticAlert: [TypeKGeomagneticAlert(**fields)]})
+        self.assertEqual(saved, [])
+        self.assertEqual(self.snapshot(), stats)
+        self.assertEqual(LiveEvent.objects.count(), events)
+
+    def test_active_and_recent_cards(self):
+        now = timezone.now()
+        for i, hours in enumerate((-2, 1, 30)):
+            TypeKGeomagneticAlert.objects.create(
+                message_code='ALTK05', serial_number=str(i), issue_time=now - timezone.timedelta(days=i * 5),
+                warning_type='ALERT', full_message='message', valid_to=now + timezone.timedelta(hours=hours),
+            )
+        with self.assertNumQueries(2):
+            stats = dashboard_stats(now)
+        self.assertEqual(stats, {'total_alerts': 3, 'active_alerts': 2, 'recent_alerts': 2})
+
+
+class AlertLookupTests(TestCase):
+    """Детальная страница адресуется типизированным идентификатором"""
+
+    def setUp(self):
+        ContentType.objects.get_for_models(*ALERT_MODELS)
+        fields = {'serial_number': '1', 'issue_time': timezone.now(), 'warning_type': 'ALERT', 'full_message': 'message'}
+        self.legacy = SpaceWeatherAlert.objects.create(message_code='WARK05', **fields)
+        self.k_alert = TypeKGeomagneticAlert.objects.create(message_code='ALTK05', **fields)
+        # id в разных таблицах совпадают
+        self.assertEqual(self.legacy.pk, self.k_alert.pk)
+
+    def test_detail_resolves_right_table_with_comments(self):
+        AlertComment.objects.create(alert=self.k_alert, author_name='Тест', content='Комментарий')
+        # Версия страницы (ETag), алерт, комментарии и история события
+        with self.assertNumQueries(4):
+            response = self.client.get(self.k_alert.get_absolute_url())
+        self.assertEqual(response.context['alert'], self.k_alert)
+        self.assertEqual(len(response.context['comments']), 1)
+        self.assertEqual(self.k_alert.get_absolute_url(), f'/alert/k-{self.k_alert.pk}/')
+
+    def test_old_links_redirect_in_previous_lookup_order(self):
+        response = self.client.get(f'/alert/{self.k_alert.pk}/')
+        self.assertRedirects(response, self.legacy.get_absolute_url(), status_code=301)
+        self.legacy.delete()
+        response = self.client.get(f'/alert/{self.k_alert.pk}/')
+        self.assertRedirects(response, self.k_alert.get_absolute_url(), status_code=301)
+
+    def test_comment_round_trip(self):
+        url = reverse('add_comment', kwargs={'kind': 'k', 'alert_id': self.k_alert.pk})
+        response = self.client.post(url, {'author_name': 'Тест', 'content': 'Комментарий'})
+        self.assertRedirects(response, self.k_alert.get_absolute_url())
+        comment = self.k_alert.comments.get()
+        self.assertFalse(self.legacy.comments.exists())
+
+        response = self.client.post(reverse('delete_comment', args=[comment.pk]))
+        self.assertRedirects(response, self.k_alert.get_absolute_url())
+        self.assertFalse(AlertComment.objects.exists())
+
+
+class RetentionTests(TestCase):
+    """Сжатие полного текста и перенос старых алертов в архив"""
+
+    def setUp(self):
+        with fake_translator():
+            import_alerts(load_corpus())
+
+    def test_full_message_is_stored_compressed(self):
+        alert = SpaceWeatherAlert.objects.first()
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT full_message FROM {SpaceWeatherAlert._meta.db_table} WHERE id = %s", [alert.pk])
+            raw = bytes(cursor.fetchone()[0])
+        self.assertIsInstance(alert.full_message, str)
+        self.assertLess(len(raw), len(alert.full_message.encode()))
+
+        # Значения, записанные до миграции несжатыми, читаются как есть
+        with connection.cursor() as cursor:
+            cursor.execute(f"UPDATE {SpaceWeatherAlert._meta.db_table} SET full_message = %s WHERE id = %s", ['plain text', alert.pk])
+        self.assertEqual(SpaceWeatherAlert.objects.get(pk=alert.pk).full_message, 'plain text')
+
+    def test_old_alerts_move_to_archive_and_stay_retrievable(self):
+        alert = TypeAForecastAlert.objects.first()
+        AlertComment.objects.create(alert=alert, author_name='Тест', content='Комментарий')
+        total = AlertIndex.objects.count()
+
+        moved = archive_alerts(days=0)
+        self.assertEqual(sum(moved.values()), total)
+        self.assertFalse(AlertIndex.objects.exists())
+        self.assertFalse(AlertComment.objects.exists())
+        self.assertEqual(ArchivedAlert.objects.count(), total)
+
+        response = self.client.get(reverse('alert_detail', kwargs={'kind': 'a', 'alert_id': alert.pk}))
+        self.assertTrue(response.context['archived'])
+        self.assertEqual(response.context['alert'].full_message, alert.full_message)
+        self.assertEqual(response.context['alert'].issue_time, alert.issue_time)
+        self.assertEqual([c['content'] for c in response.context['comments']], ['Комментарий'])
+
+
+class AlertSearchTests(TestCase):
+    """Полнотекстовый поиск по алертам всех семейств"""
+
+    def setUp(self):
+        with fake_translator():
+            import_alerts(load_corpus())
+
+    def test_ranked_results_with_snippets(self):
+        hits = search_alerts('proton')
+        self.assertTrue(hits)
+        self.assertIn('<mark>', hits[0].snippet)
+        self.assertTrue(all('PX' in hit.entry.message_code or 'PC' in hit.entry.message_code for hit in hits[:3]))
+        # Код сообщения весит больше текста
+        self.assertEqual(search_alerts('WARK05')[0].entry.message_code, 'WARK05')
+
+    def test_user_input_is_not_parsed_as_query_syntax(self):
+        for query in ['"unbalanced', 'K-index OR', 'NEAR(storm', '***', '<script>']:
+            search_alerts(query)
+        self.assertEqual(search_alerts('***'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        alert = TypeAForecastAlert.objects.first()
+        alert.full_message += '\nZebracorn anomaly observed'
+        alert.save()
+        self.assertEqual([hit.entry.object_id for hit in search_alerts('zebracorn')], [alert.pk])
+        alert.delete()
+        self.assertEqual(search_alerts('zebracorn'), [])
+
+    def test_api_returns_typed_ids(self):
+        response = self.client.get(reverse('alert_search_api'), {'q': 'geomagnetic storm', 'limit': 3})
+        results = response.json()['results']
+        self.assertEqual(len(results), 3)
+        self.assertRegex(results[0]['id'], r'^(legacy|[tkea])-\d+$')
+        self.assertEqual(self.client.get(reverse('alert_search'), {'q': 'storm'}).status_code, 200)
+
+
+class CommentQueryCountTests(TestCase):
+    """Комментарии и их количество загружаются фиксированным числом запросов"""
+
+    def setUp(self):
+        ContentType.objects.get_for_models(*ALERT_MODELS)
+        self.now = timezone.now()
+        self.serial = 0
+
+    def add_alerts(self, count):
+        alerts = []
+        for i in range(count):
+            self.serial += 1
+            model = TypeKGeomagneticAlert if i % 2 else SpaceWeatherAlert
+            alert = model.objects.create(
+                message_code='ALTK05', serial_number=str(self.serial), issue_time=self.now - timezone.timedelta(minutes=self.serial),
+                warning_type='ALERT', full_message='message',
+            )
+            AlertComment.objects.create(alert=alert, author_name='Тест', content='Комментарий')
+            alerts.append(alert)
+        return alerts
+
+    def count_queries(self, url):
+        cache.clear()  # приблизительный COUNT(*) кэшируется между запросами
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(queries)
+
+    def test_comment_admin_resolves_alerts_per_type(self):
+        User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.login(username='admin', password='password')
+        url = reverse('admin:weather_alertcomment_changelist')
+        self.add_alerts(2)
+        few = self.count_queries(url)
+        self.add_alerts(10)
+        self.assertEqual(self.count_queries(url), few)
+
+        comments = list(AlertComment.objects.with_alerts())
+        with self.assertNumQueries(0):
+            identifiers = [comment.alert_identifier for comment in comments]
+        self.assertTrue(all(identifier.startswith('ALTK05-') for identifier in identifiers))
+
+    def test_alert_lists_have_comment_counts(self):
+        session = self.client.session
+        session['admin_authenticated'] = True
+        session.save()
+        url = reverse('admin_alerts')
+        alert = self.add_alerts(2)[0]
+        AlertComment.objects.create(alert=alert, author_name='Тест', content='Еще один')
+        few = self.count_queries(url)
+        self.add_alerts(15)
+        self.assertEqual(self.count_queries(url), few)
+
+        counts = {entry.object_id: entry.comment_count for entry in AlertIndex.objects.with_comment_counts() if entry.kind == 'legacy'}
+        self.assertEqual(counts[alert.pk], 2)
+
+
+@override_settings(ALERT_PURGE_BACKGROUND=False)
+class PurgeTests(TestCase):
+    """Очистка базы пачками с прогрессом"""
+
+    def setUp(self):
+        with fake_translator():
+            import_alerts(load_corpus(scale=2))
+        alert = TypeAForecastAlert.objects.first()
+        AlertComment.objects.create(alert=alert, author_name='Тест', content='Комментарий')
+        # Комментарий, оставшийся от алерта, удаленного в обход ORM
+        AlertComment.objects.create(
+            content_type=ContentType.objects.get_for_model(TypeAForecastAlert), object_id=999999,
+            author_name='Тест', content='Сирота',
+        )
+
+    def assert_everything_deleted(self):
+        for model in ALERT_MODELS:
+            self.assertFalse(model.objects.exists())
+        self.assertFalse(AlertIndex.objects.exists())
+        self.assertFalse(AlertComment.objects.exists())
+        self.assertFalse(AlertDailyStat.objects.exclude(issued=0, expiring=0).exists())
+        self.assertEqual(search_alerts('storm'), [])
+
+    def test_purge_in_small_chunks(self):
+        total = AlertIndex.objects.count()
+        job = PurgeJob.objects.create(total=total)
+        job = run_purge_job(job.pk, chunk_size=5)
+        self.assertEqual(job.status, PurgeJob.STATUS_DONE)
+        self.assertEqual(job.deleted, total)
+        self.assertEqual(job.comments_deleted, 2)
+        self.assert_everything_deleted()
+
+    def test_abandoned_purge_does_not_block_a_new_one(self):
+        stale = PurgeJob.objects.create(status=PurgeJob.STATUS_RUNNING, updated_at=timezone.now() - timedelta(hours=1))
+        live = PurgeJob.objects.create(status=PurgeJob.STATUS_RUNNING)
+        self.assertEqual(active_purge_job(), live)
+        stale.refresh_from_db()
+        self.assertEqual(stale.status, PurgeJob.STATUS_FAILED)
+
+        PurgeJob.objects.filter(pk=live.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        job = start_purge_job(background=False)
+        self.assertNotIn(job.pk, (stale.pk, live.pk))
+        self.assertEqual(job.status, PurgeJob.STATUS_DONE)
+        self.assert_everything_deleted()
+
+    def test_admin_starts_purge_and_polls_progress(self):
+        session = self.client.session
+        session['admin_authenticated'] = True
+        session.save()
+        response = self.client.post(reverse('admin_alerts'), {'action': 'clear_alerts', 'clear_password': 'CLEAR_DB_2024'})
+        self.assertRedirects(response, reverse('admin_alerts'), fetch_redirect_response=False)
+        self.assert_everything_deleted()
+
+        job = PurgeJob.objects.get()
+        status = self.client.get(reverse('purge_status_api', args=[job.pk])).json()
+        self.assertEqual((status['status'], status['percent'], status['finished']), ('done', 100, True))
+        self.assertEqual(self.client.get(reverse('admin_alerts')).context['purge_job'], job)
+
+
+class KeysetPaginationTests(TestCase):
+    """Курсорная пагинация ленты алертов"""
+
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        # Одинаковое время выпуска у пар алертов разных типов проверяет разрешение ничьих
+        for i in range(13):
+            issue_time = now - timezone.timedelta(hours=i // 2)
+            for model in (TypeKGeomagneticAlert, TypeTRadioAlert):
+                model.objects.create(
+                    message_code='ALTK04', serial_number=str(i), issue_time=issue_time,
+                    warning_type='ALERT', full_message='message',
+                )
+        self.expected = list(AlertIndex.objects.order_by('-issue_time', '-content_type_id', '-object_id'))
+
+    def test_forward_and_backward_walk_cover_all_rows(self):
+        paginator = KeysetPaginator(AlertIndex.objects.all(), 4)
+        pages = [paginator.get_page()]
+        while pages[-1].has_next():
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+        self.assertEqual([row for page in pages for row in page], self.expected)
+        self.assertFalse(pages[0].has_previous())
+
+        back = [pages[-1]]
+        while back[-1].has_previous():
+            back.append(paginator.get_page(back[-1].prev_cursor))
+        self.assertEqual([list(page) for page in reversed(back)], [list(page) for page in pages])
+
+    def test_invalid_cursor_returns_first_page(self):
+        paginator = KeysetPaginator(AlertIndex.objects.all(), 5, with_total=True)
+        page = paginator.get_page('not-a-cursor')
+        self.assertEqual(list(page), self.expected[:5])
+        self.assertEqual(page.approximate_total, len(self.expected))
+
+    def test_page_is_single_query(self):
+        paginator = KeysetPaginator(AlertIndex.objects.all(), 5)
+        cursor = paginator.get_page().next_cursor
+        with self.assertNumQueries(1):
+            paginator.get_page(cursor)
+
+
+class AlertSortFilterTests(TestCase):
+    """Сортировка и фильтры ленты на сервере (по всей ленте, а не по странице)"""
+
+    def setUp(self):
+        cache.clear()
+        ContentType.objects.get_for_models(*ALERT_MODELS)
+        now = timezone.now()
+        for i, scale in enumerate(['G1', 'G4', None, 'G2', 'G4', 'G3', None]):
+            TypeKGeomagneticAlert.objects.create(
+                message_code='WARK04' if i % 2 else 'ALTK05', serial_number=str(i), issue_time=now - timedelta(hours=i),
+                warning_type='ALERT', full_message='message', noaa_scale=scale, valid_to=now + timedelta(hours=2 - i),
+            )
+        TypeTRadioAlert.objects.create(
+            message_code='ALTTP2', serial_number='9', issue_time=now, warning_type='ALERT', full_message='radio',
+        )
+
+    def walk(self, query, per_page=3):
+        params = AlertListParams.from_query(QueryDict(query))
+        paginator = KeysetPaginator(params.filter(AlertIndex.objects.all()), per_page, ordering=params.ordering)
+        pages = [paginator.get_page()]
+        while pages[-1].has_next():
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+        return [row for page in pages for row in page]
+
+    def test_severity_sort_spans_pages(self):
+        rows = self.walk('sort=-severity')
+        self.assertEqual([row.severity for row in rows], sorted((row.severity for row in rows), reverse=True))
+        self.assertEqual(len(rows), AlertIndex.objects.count())
+        self.assertEqual([row.severity for row in self.walk('sort=severity')][-2:], [4, 4])
+
+    def test_filters_combine_in_sql(self):
+        rows = self.walk('type=k&min_severity=2&active=1')
+        self.assertEqual([row.serial_number for row in rows], ['1'])
+        self.assertEqual({row.message_code for row in self.walk('code=wark')}, {'WARK04'})
+
+    def test_sort_uses_composite_index(self):
+        params = AlertListParams.from_query(QueryDict('sort=-severity'))
+        plan = AlertIndex.objects.order_by(*params.ordering)[:20].explain()
+        self.assertIn('weather_alertindex_severity', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_page_links_keep_sort_and_filters(self):
+        response = self.client.get(reverse('noaa_detailed'), {'sort': 'severity', 'type': 'k'})
+        self.assertContains(response, 'href="?sort=-severity&amp;type=k"')
+        self.assertContains(response, 'data-first-page="0"')
+
+        data = self.client.get(reverse('api_alerts'), {'sort': '-severity', 'fields': 'severity', 'limit': 2}).json()
+        self.assertEqual([row['severity'] for row in data['results']], [4, 4])
+        self.assertEqual(self.client.get(reverse('api_alerts'), {'sort': 'nope'}).status_code, 400)
+
+
+class BulkImportQueryBudgetTests(TestCase):
+    """Импорт выгрузки укладывается в фиксированное число запросов"""
+
+    # 5 проверок дубликатов + SAVEPOINT/RELEASE + вставка и перечитывание
+    # для каждой затронутой таблицы (пачками) + отсев строк, уже попавших
+    # в ленту (параллельная загрузка) + вставка в ленту, статистику
+    # и поисковый индекс + вставка звеньев цепочек, их догрузка по номерам
+    # и пересчет событий + отметка версии страниц
+    QUERY_BUDGET = 37
+
+    def setUp(self):
+        ContentType.objects.get_for_models(*ALERT_MODELS)
+        self.corpus = load_corpus(scale=4)
+
+    def test_import_of_hundred_alerts_fits_query_budget(self):
+        with fake_translator(), CaptureQueriesContext(connection) as queries:
+            result = import_alerts(self.corpus)
+        self.assertEqual(result.loaded, len(self.corpus))
+        self.assertEqual(AlertIndex.objects.count(), len(self.corpus))
+        self.assertLessEqual(len(queries), self.QUERY_BUDGET)
+
+    def test_repeated_import_only_checks_duplicates(self):
+        with fake_translator():
+            import_alerts(self.corpus)
+            with self.assertNumQueries(len(ALERT_MODELS)):
+                result = import_alerts(self.corpus)
+        self.assertEqual(result.skipped, len(self.corpus))
+
+
+class DatabaseProfileTests(TestCase):
+    """Профиль соединений с базой"""
+
+    @skipUnless(connection.vendor == 'sqlite', 'PRAGMA применяются только к SQLite')
+    def test_sqlite_pragmas_are_applied_on_connect(self):
+        values = sqlite_pragma_values(connection, ['synchronous', 'busy_timeout', 'temp_store'])
+        # synchronous=NORMAL -> 1, temp_store=MEMORY -> 2
+        self.assertEqual(values, {'synchronous': 1, 'busy_timeout': 5000, 'temp_store': 2})
+
+
+class SolarWindTimeSeriesTests(TestCase):
+    """Хранилище временных рядов солнечного ветра"""
+
+    HEADER = ['time_tag', 'density', 'speed', 'temperature']
+
+    def test_samples_are_deduplicated_by_time_tag(self):
+        ingest_time_series(SolarWindPlasmaSample, [
+            self.HEADER,
+            ['2024-05-10 17:00:00.000', '4.1', '410.5', '95000'],
+            ['2024-05-10 17:05:00.000', '4.3', '412.0', '97000'],
+        ])
+        # Следующая выгрузка пересекается с предыдущей и исправляет значение
+        ingest_time_series(SolarWindPlasmaSample, [
+            self.HEADER,
+            ['2024-05-10 17:05:00.000', '4.4', '413.0', '97000'],
+            ['2024-05-10 17:10:00.000', None, '415.0', '98000'],
+        ])
+        self.assertEqual(SolarWindPlasmaSample.objects.count(), 3)
+        self.assertEqual(SolarWindPlasmaSample.objects.get(time_tag__minute=5).speed, 413.0)
+
+    def test_read_window_returns_arrays_for_half_open_range(self):
+        ingest_time_series(SolarWindPlasmaSample, [self.HEADER] + [
+            [f'2024-05-10 17:{minute:02d}:00.000', None if minute == 10 else '4.0', str(400 + minute), '90000']
+            for minute in range(0, 30, 5)
+        ])
+        start = datetime(2024, 5, 10, 17, 5, tzinfo=dt_timezone.utc)
+        end = datetime(2024, 5, 10, 17, 20, tzinfo=dt_timezone.utc)
+        window = read_window(SolarWindPlasmaSample, start, end)
+
+        self.assertEqual(len(window), 3)
+        self.assertEqual(window.times[0], start.timestamp())
+        self.assertEqual(list(window['speed']), [405.0, 410.0, 415.0])
+        self.assertTrue(math.isnan(window['density'][1]))
+
+
+class SolarWindChartTests(TestCase):
+    """Прореженные графики солнечного ветра"""
+
+    HEADER = ['time_tag', 'density', 'speed', 'temperature']
+    NOW = datetime(2024, 5, 28, 0, 0, tzinfo=dt_timezone.utc)
+
+    def setUp(self):
+        cache.clear()
+
+    def ingest_minutes(self, start, minutes, speed=lambda minute: 400.0):
+        rows = []
+        for minute in range(minutes):
+            time_tag = start + timedelta(minutes=minute)
+            rows.append([time_tag.strftime('%Y-%m-%d %H:%M:%S.000'), '5.0', str(speed(minute)), '100000'])
+        ingest_time_series(SolarWindPlasmaSample, [self.HEADER] + rows)
+
+    def test_lttb_keeps_endpoints_and_spike(self):
+        x = np.arange(1000, dtype=np.float64)
+        y = np.zeros(1000)
+        y[537] = 50.0
+        selected = lttb(x, y, 50)
+        self.assertEqual(len(selected), 50)
+        self.assertEqual((selected[0], selected[-1]), (0, 999))
+        self.assertIn(537, selected)
+
+    def test_long_window_uses_rollups_and_keeps_extremes(self):
+        # Трое суток минутных отсчетов и одиночный выброс скорости
+        start = self.NOW - timedelta(days=3)
+        self.ingest_minutes(start, 3 * 24 * 60, speed=lambda minute: 900.0 if minute == 2000 else 400.0)
+        chart = build_chart(SolarWindPlasmaSample, 'speed', start.timestamp(), self.NOW.timestamp(), width=100)
+
+        self.assertEqual(chart['resolution'], 300)
+        self.assertLessEqual(len(chart['buckets']['time']), 100)
+        self.assertLessEqual(len(chart['series']['time']), 100)
+        self.assertEqual(max(chart['buckets']['max']), 900.0)
+        self.assertEqual(min(chart['buckets']['min']), 400.0)
+
+    def test_ingest_invalidates_cached_chart(self):
+        self.ingest_minutes(self.NOW - timedelta(hours=2), 60)
+        first = cached_chart(SolarWindPlasmaSample, 'speed', '24h', width=800, now=self.NOW)
+        self.assertEqual(first['points'], 60)
+
+        self.ingest_minutes(self.NOW - timedelta(hours=1), 30)
+        second = cached_chart(SolarWindPlasmaSample, 'speed', '24h', width=800, now=self.NOW)
+        self.assertEqual(second['points'], 90)
+
+    def test_chart_sees_samples_written_by_another_process(self):
+        # Загрузка в другом процессе не сбрасывает локальный кэш: отсчеты пишутся мимо invalidate_rollups
+        self.ingest_minutes(self.NOW - timedelta(days=2), 24 * 60)
+        self.ingest_minutes(self.NOW - timedelta(hours=6), 60)
+        first = cached_chart(SolarWindPlasmaSample, 'speed', '7d', width=800, now=self.NOW)
+        self.assertEqual(max(first['buckets']['max']), 400.0)
+
+        SolarWindPlasmaSample.objects.bulk_create([
+            SolarWindPlasmaSample(time_tag=self.NOW - timedelta(hours=1, minutes=minute), speed=750.0)
+            for minute in range(30)
+        ])
+        second = cached_chart(SolarWindPlasmaSample, 'speed', '7d', width=800, now=self.NOW)
+        self.assertEqual(max(second['buckets']['max']), 750.0)
+
+    def test_chart_api_validates_parameters(self):
+        response = self.client.get(reverse('solar_wind_chart_api'), {'field': 'bz', 'window': '24h'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('solar_wind_chart_api'), {'field': 'speed', 'window': '7d', 'width': '300'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['width'], 300)
+
+
+class KpStatsTests(TestCase):
+    """История индекса Kp и статистика на NumPy"""
+
+    DAY = datetime(2024, 5, 10, tzinfo=dt_timezone.utc).timestamp()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_g_levels(self):
+        kp = np.array([0.0, 4.67, 5.0, 5.33, 6.0, 7.67, 8.67, 9.0, np.nan])
+        self.assertEqual(g_levels(kp).tolist(), [0, 0, 1, 1, 2, 3, 4, 5, -1])
+
+    def test_daily_rolling_and_storms(self):
+        # Двое суток по 8 значений; во вторых сутках пропущен интервал 03:00
+        times = np.array([self.DAY + 3 * 3600 * i for i in range(16) if i != 9], dtype=np.float64)
+        kp = np.array([2, 3, 5, 4, 3, 2, 2, 2, 6.33, 3, 3, 3, 3, 3, np.nan], dtype=np.float64)
+        ap = np.array([7, 15, 48, 27, 15, 7, 7, 7, 94, 15, 15, 15, 15, 15, np.nan], dtype=np.float64)
+
+        daily = daily_stats(times, kp, ap)
+        self.assertEqual(daily.times.tolist(), [self.DAY, self.DAY + 86400])
+        self.assertEqual(daily.kp_max.tolist(), [5.0, 6.33])
+        self.assertEqual(daily.ap.tolist(), [16.625, 169 / 6])
+
+        rolling = rolling_max(times, kp)
+        self.assertEqual(rolling[1], 3.0)
+        # Максимум за 24 часа: значение 5 в 06:00 выпадает из окна в 06:00 следующих суток
+        self.assertEqual(rolling[times.tolist().index(self.DAY + 86400 - 3 * 3600)], 5.0)
+        self.assertEqual(rolling[times.tolist().index(self.DAY + 86400 + 6 * 3600)], 6.33)
+        self.assertEqual(rolling[-1], 6.33)
+
+        self.assertEqual(storm_day_counts(daily.kp_max), {'total': 2, 'G1': 1, 'G2': 1, 'G3': 0, 'G4': 0, 'G5': 0})
+        distribution = g_distribution(kp)
+        self.assertEqual(distribution['G0']['intervals'], 12)
+        self.assertEqual(distribution['G2'], {'intervals': 1, 'share': round(1 / 14, 4)})
+
+    def test_ingest_noaa_product_and_api(self):
+        rows = [
+            {'time_tag': f'2024-05-10T{hour:02d}:00:00', 'Kp': kp, 'a_running': ap, 'station_count': 8}
+            for hour, kp, ap in ((0, 3.0, 15), (3, 5.33, 56), (6, 4.0, 27))
+        ]
+        ingest_time_series(KpIndexSample, rows)
+        self.assertEqual(KpIndexSample.objects.get(time_tag__hour=3).ap, 56.0)
+
+        response = self.client.get(reverse('api_kp'), {'days': 2, 'fields': 'daily,storm_days'})
+        data = response.json()
+        self.assertEqual(data['samples'], 3)
+        self.assertEqual(data['daily']['kp_max'], [5.33])
+        self.assertEqual(data['storm_days']['G1'], 1)
+        self.assertNotIn('rolling_max_24h', data)
+        self.assertEqual(self.client.get(reverse('api_kp'), {'fields': 'bogus'}).status_code, 400)
+
+        # Новый отсчет виден сразу, несмотря на кэш ряда
+        ingest_time_series(KpIndexSample, [{'time_tag': '2024-05-10T09:00:00', 'Kp': 7.0, 'a_running': 154}])
+        data = self.client.get(reverse('api_kp'), {'days': 2}).json()
+        self.assertEqual(data['daily']['kp_max'], [7.0])
+        self.assertEqual(data['rolling_max_24h']['value'], [3.0, 5.33, 5.33, 7.0])
+
+
+class ConditionalResponseTests(TestCase):
+    """ETag / Last-Modified и Cache-Control страниц панели"""
+
+    def setUp(self):
+        cache.clear()
+        ContentType.objects.get_for_models(*ALERT_MODELS)
+        self.alert = TypeKGeomagneticAlert.objects.create(
+            message_code='ALTK05', serial_number='1', issue_time=timezone.now(),
+            warning_type='ALERT', full_message='message',
+        )
+
+    def test_unchanged_alert_page_is_not_modified(self):
+        url = self.alert.get_absolute_url()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+
+        # Только проверка версии, без запросов к алертам
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_new_comment_changes_etag(self):
+        url = self.alert.get_absolute_url()
+        etag = self.client.get(url)['ETag']
+        AlertComment.objects.create(alert=self.alert, author_name='Тест', content='Комментарий')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_noaa_page_shell_does_not_wait_for_noaa(self):
+        response = self.client.get(reverse('noaa_detailed'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('s-maxage', response['Cache-Control'])
+        self.assertContains(response, reverse('noaa_conditions_panel'))
+        self.assertContains(response, 'ALTK05-1')
+        # Страница строится без снимка NOAA
+        self.assertIsNone(load_snapshot())
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('noaa_detailed'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_noaa_panels_follow_source_versions(self):
+        save_source_data('current_conditions', {'current': {'G': {'Scale': '2'}}})
+        response = self.client.get(reverse('noaa_conditions_panel'))
+        self.assertContains(response, 'data-scale="G"')
+        self.assertIn('public', response['Cache-Control'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('noaa_conditions_panel'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        # Новые данные другого источника не меняют версию панели шкал
+        save_source_data('kp_index', {'time_tag': '2024-05-10 18:00:00', 'kp': 4.0, 'recent': []})
+        self.assertEqual(
+            self.client.get(reverse('noaa_conditions_panel'), HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304,
+        )
+        save_source_data('current_conditions', {'current': {'G': {'Scale': '3'}}})
+        self.assertEqual(
+            self.client.get(reverse('noaa_conditions_panel'), HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200,
+        )
+
+    def test_noaa_panel_placeholder_until_source_is_fetched(self):
+        response = self.client.get(reverse('noaa_solar_wind_panel'))
+        self.assertEqual(response.status_code, 503)
+        self.assertContains(response, 'Данные NOAA сейчас недоступны', status_code=503)
+
+        save_source_data('solar_wind', [
+            ['time_tag', 'density', 'speed', 'temperature'], ['2024-05-10 17:00:00', '4.1', '410.5', '95000'],
+        ])
+        self.assertContains(self.client.get(reverse('noaa_solar_wind_panel')), '410.5 км/с')
+
+        # Ошибка загрузки: панель показывает последние данные и предупреждение
+        save_source_error('solar_wind', 'API ошибка 502')
+        response = self.client.get(reverse('noaa_solar_wind_panel'))
+        self.assertContains(response, '410.5 км/с')
+        self.assertContains(response, 'API ошибка 502')
+
+
+class FragmentCacheTests(TestCase):
+    """Кэш фрагментов детальной страницы NOAA"""
+
+    def setUp(self):
+        cache.clear()
+        ContentType.objects.get_for_models(*ALERT_MODELS)
+
+    def create_alert(self, serial_number):
+        return TypeKGeomagneticAlert.objects.create(
+            message_code='ALTK05', serial_number=serial_number, issue_time=timezone.now(),
+            warning_type='ALERT', full_message='message',
+        )
+
+    def test_cached_alert_table_skips_queries_until_ingest(self):
+        self.create_alert('101')
+        self.client.get(reverse('noaa_detailed'))
+
+        # Повторный рендер: только проверка версии, таблица из кэша фрагментов
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('noaa_detailed'))
+        self.assertContains(response, 'ALTK05-101')
+
+        self.create_alert('102')
+        self.assertContains(self.client.get(reverse('noaa_detailed')), 'ALTK05-102')
+
+
+class JsonApiTests(TestCase):
+    """JSON API: фильтры, проекция полей, пагинация и условные ответы"""
+
+    def setUp(self):
+        cache.clear()
+        ContentType.objects.get_for_models(*ALERT_MODELS)
+        now = timezone.now()
+        self.k_alert = TypeKGeomagneticAlert.objects.create(
+            message_code='WARK07', serial_number='1', issue_time=now, warning_type='WARNING',
+            full_message='message', noaa_scale='G3',
+        )
+        self.t_alert = TypeTRadioAlert.objects.create(
+            message_code='ALTTP2', serial_number='2', issue_time=now - timezone.timedelta(hours=1),
+            warning_type='ALERT', full_message='radio',
+        )
+
+    def test_alert_list_filters_and_projects_fields(self):
+        response = self.client.get(reverse('api_alerts'), {'type': 'k', 'fields': 'id,noaa_scale'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [{'id': f'k-{self.k_alert.pk}', 'noaa_scale': 'G3'}])
+
+        response = self.client.get(reverse('api_alerts'), {'min_severity': 3, 'fields': 'id'})
+        self.assertEqual([row['id'] for row in response.json()['results']], [f'k-{self.k_alert.pk}'])
+
+        self.assertEqual(self.client.get(reverse('api_alerts'), {'fields': 'secret'}).status_code, 400)
+
+    def test_alert_list_cursor_pagination(self):
+        first = self.client.get(reverse('api_alerts'), {'limit': 1, 'fields': 'id'}).json()
+        second = self.client.get(reverse('api_alerts'), {'limit': 1, 'fields': 'id', 'cursor': first['next_cursor']}).json()
+        self.assertEqual(first['results'][0]['id'], f'k-{self.k_alert.pk}')
+        self.assertEqual(second['results'][0]['id'], f't-{self.t_alert.pk}')
+        self.assertIsNone(second['next_cursor'])
+
+    def test_alert_list_is_gzipped(self):
+        # GZip не сжимает короткие ответы, поэтому список наполняется заметным объемом
+        for serial in range(20):
+            TypeKGeomagneticAlert.objects.create(
+                message_code='WARK05', serial_number=str(100 + serial), issue_time=timezone.now(),
+                warning_type='WARNING', full_message='Geomagnetic K-index of 5 expected. ' * 10,
+            )
+        response = self.client.get(reverse('api_alerts'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_alert_detail_and_not_modified(self):
+        url = reverse('api_alert_detail', kwargs={'kind': 't', 'alert_id': self.t_alert.pk})
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+        response = self.client.get(url, {'fields': 'message_code,full_message,comments'})
+        self.assertEqual(response.json(), {'message_code': 'ALTTP2', 'full_message': 'radio', 'comments': []})
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'fields': 'message_code,full_message,comments'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_solar_wind_columns_with_gaps(self):
+        ingest_time_series(SolarWindPlasmaSample, [
+            ['time_tag', 'density', 'speed', 'temperature'],
+            ['2024-05-10 17:00:00.000', None, '410.5', '95000'],
+            ['2024-05-10 17:05:00.000', '4.3', '412.0', '97000'],
+        ])
+        data = self.client.get(reverse('api_solar_wind'), {'fields': 'density,speed'}).json()
+        self.assertEqual(data['density'], [None, 4.3])
+        self.assertEqual(data['speed'], [410.5, 412.0])
+        self.assertEqual(len(data['time']), 2)
+
+    def test_conditions_are_served_from_stored_snapshot_only(self):
+        self.assertEqual(self.client.get(reverse('api_conditions')).status_code, 503)
+        save_source_data('current_conditions', {'current': {'G': {'Scale': '3'}}})
+        data = self.client.get(reverse('api_conditions'), {'fields': 'current'}).json()
+        self.assertEqual(data['conditions'], {'current': {'G': {'Scale': '3'}}})
+
+
+class LiveEventTests(TestCase):
+    """Живые события: публикация после фиксации, дедупликация шкал и поток SSE"""
+
+    def test_new_alert_is_published_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            alert = TypeKGeomagneticAlert.objects.create(
+                message_code='WARK05', serial_number='7', issue_time=timezone.now(), warning_type='WARNING',
+                full_message='message', noaa_scale='G2',
+            )
+        event = LiveEvent.objects.get()
+        self.assertEqual(event.kind, 'alert')
+        self.assertEqual(event.payload['id'], f'k-{alert.pk}')
+        self.assertEqual(event.payload['severity'], 2)
+
+        # Правка существующего алерта не публикуется
+        with self.captureOnCommitCallbacks(execute=True):
+            alert.save()
+        self.assertEqual(LiveEvent.objects.count(), 1)
+
+    def test_scales_are_published_only_on_change(self):
+        conditions = {'current': {'R': {'Scale': '0'}, 'S': {'Scale': '0'}, 'G': {'Scale': '1'}}}
+        with self.captureOnCommitCallbacks(execute=True):
+            publish_scales(conditions)
+        with self.captureOnCommitCallbacks(execute=True):
+            publish_scales(conditions)
+        conditions['current']['G']['Scale'] = '3'
+        with self.captureOnCommitCallbacks(execute=True):
+            publish_scales(conditions)
+
+        payloads = list(LiveEvent.objects.filter(kind='conditions').values_list('payload', flat=True))
+        self.assertEqual([payload['scales']['G'] for payload in payloads], ['1', '3'])
+        self.assertEqual(payloads[1]['previous']['G'], '1')
+
+        # Журнал событий чистится через час: те же шкалы после очистки не публикуются повторно
+        LiveEvent.objects.all().delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            publish_scales(conditions)
+        self.assertFalse(LiveEvent.objects.exists())
+
+    def test_missed_events_are_replayed_in_order(self):
+        first = LiveEvent.objects.create(kind='alert', payload={'id': 'k-1'})
+        second = LiveEvent.objects.create(kind='alert', payload={'id': 'k-2'})
+
+        events = events_after(first.pk)
+        self.assertEqual([event['id'] for event in events], [second.pk])
+        self.assertEqual(format_event(events[0]), f'id: {second.pk}\nevent: alert\ndata: {{"id": "k-2"}}\n\n')
+
+    @override_settings(LIVE_EVENTS_BACKEND='memory')
+    def test_slow_subscriber_gets_resync(self):
+        async def read():
+            live = LiveHub()
+            subscriber = live.subscribe(size=2)
+            for number in range(3):
+                subscriber.offer({'id': None, 'type': 'alert', 'data': {'n': number}})
+            live.unsubscribe(subscriber)
+            return subscriber.overflowed, [subscriber.queue.get_nowait()['data']['n'] for _ in range(2)]
+
+        overflowed, kept = asyncio.run(read())
+        self.assertTrue(overflowed)
+        self.assertEqual(kept, [1, 2])
+
+    @override_settings(LIVE_EVENTS_BACKEND='memory')
+    def test_stream_sends_heartbeat_and_broadcasts(self):
+        async def read():
+            stream = event_stream(heartbeat=0.01)
+            await stream.__anext__()  # retry
+            ping = await stream.__anext__()
+            hub.broadcast({'id': None, 'type': 'conditions', 'data': {'scales': {'G': '2'}}})
+            event = await stream.__anext__()
+            await stream.aclose()
+            return ping, event
+
+        ping, event = asyncio.run(read())
+        self.assertEqual(ping, ': ping\n\n')
+        self.assertIn('event: conditions', event)
+        self.assertEqual(hub.subscribers, set())
+
+    def test_poller_survives_read_error(self):
+        calls = []
+
+        def flaky_events_after(last_id, limit=100):
+            calls.append(last_id)
+            if len(calls) == 1:
+                raise OperationalError('database is locked')
+            return events_after(last_id, limit)
+
+        async def read():
+            subscriber = hub.subscribe()
+            try:
+                while not calls:
+                    await asyncio.sleep(0.01)
+                await sync_to_async(LiveEvent.objects.create)(kind='alert', payload={'id': 'k-1'})
+                return await asyncio.wait_for(subscriber.queue.get(), 2)
+            finally:
+                hub.unsubscribe(subscriber)
+                await hub.poller
+
+        with mock.patch('weather.live.events_after', flaky_events_after), \
+                mock.patch('weather.live.LIVE_POLL_INTERVAL', 0.01), \
+                mock.patch('weather.live.LIVE_POLL_ERROR_DELAY', 0.01):
+            event = async_to_sync(read)()
+        self.assertEqual(event['data'], {'id': 'k-1'})
+        self.assertGreaterEqual(len(calls), 2)
+
+
+class StaticSource(Source):
+    """Источник с готовым ответом вместо запроса к NOAA"""
+
+    def __init__(self, name, response, interval=60, delay=0, stats=None, **kwargs):
+        super().__init__(name, '', interval, lambda raw: raw, **kwargs)
+        self.response = response
+        self.delay = delay
+        self.stats = stats if stats is not None else {}
+
+    async def fetch(self):
+        self.stats['active'] = self.stats.get('active', 0) + 1
+        self.stats['peak'] = max(self.stats.get('peak', 0), self.stats['active'])
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.stats['active'] -= 1
+        if isinstance(self.response, Exception):
+            raise self.response
+        return self.response
+
+
+class SourceFetcherTests(TestCase):
+    """Разбор продуктов SWPC и планировщик загрузки (без обращения к NOAA)"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_conditions_keys_and_text(self):
+        raw = {'0': {'G': {'Scale': '2', 'Text': 'moderate'}}, '1': {'G': {'Scale': None, 'Text': 'none'}}}
+        conditions = parse_conditions(raw)
+        self.assertEqual(conditions['current']['G'], {'Scale': '2', 'Text': 'умеренные'})
+        self.assertEqual(conditions['today_forecast']['G']['Text'], 'нет')
+        # Ответ NOAA не изменяется
+        self.assertEqual(raw['0']['G']['Text'], 'moderate')
+
+    def test_kp_forecast_by_day(self):
+        raw = [
+            ['time_tag', 'kp', 'observed', 'noaa_scale'],
+            ['2024-05-10 21:00:00', '3.00', 'observed', None],
+            ['2024-05-11 00:00:00', '4.67', 'predicted', None],
+            ['2024-05-11 03:00:00', '5.33', 'predicted', 'G1'],
+            ['2024-05-12 00:00:00', '2.67', 'predicted', None],
+        ]
+        self.assertEqual(parse_forecast(raw), [
+            {'date': '2024-05-11', 'kp_max': 5.33, 'noaa_scale': 'G1'},
+            {'date': '2024-05-12', 'kp_max': 2.67, 'noaa_scale': None},
+        ])
+
+    def test_goes_products(self):
+        xrays = [
+            {'time_tag': '2024-05-10T17:00:00Z', 'satellite': 16, 'flux': 1.2e-4, 'energy': '0.1-0.8nm'},
+            {'time_tag': '2024-05-10T17:05:00Z', 'satellite': 16, 'flux': 2.3e-6, 'energy': '0.1-0.8nm'},
+            {'time_tag': '2024-05-10T17:05:00Z', 'satellite': 16, 'flux': 9.9e-8, 'energy': '0.05-0.4nm'},
+        ]
+        data = parse_xray_flux(xrays)
+        self.assertEqual((data['flare_class'], data['peak_class']), ('C2.3', 'X1.2'))
+
+        protons = [
+            {'time_tag': '2024-05-10T17:05:00Z', 'satellite': 18, 'flux': 150.0, 'energy': '>=10 MeV'},
+            {'time_tag': '2024-05-10T17:05:00Z', 'satellite': 18, 'flux': 1.5, 'energy': '>=100 MeV'},
+        ]
+        self.assertEqual(parse_proton_flux(protons)['noaa_scale'], 'S2')
+
+        with self.assertRaises(ValueError):
+            parse_magnetometer([{'time_tag': '2024-05-10T17:05:00Z', 'Hp': None}])
+
+    def test_slots_and_timeouts(self):
+        stats = {}
+        sources = [StaticSource(f"s{i}", {'value': i}, delay=0.02, stats=stats, slot='test') for i in range(3)]
+        slow = StaticSource('slow', {'value': 'slow'}, delay=1, timeout=0.05, slot='other')
+        scheduler = FetchScheduler(sources + [slow], slots={'test': 1, 'other': 1})
+
+        results = async_to_sync(scheduler.run_once)()
+        self.assertEqual(results, {'s0': True, 's1': True, 's2': True, 'slow': False})
+        # Загрузки одного слота не пересекаются
+        self.assertEqual(stats['peak'], 1)
+
+        snapshot = load_snapshot()
+        self.assertEqual(snapshot['data']['s1'], {'value': 1})
+        self.assertNotIn('slow', snapshot['data'])
+        self.assertEqual(snapshot['sources']['slow']['status'], 'error')
+
+    def test_error_keeps_data_and_retries_early(self):
+        source = StaticSource('kp', {'kp': 3}, interval=600)
+        scheduler = FetchScheduler([source])
+        async_to_sync(scheduler.run_once)()
+        async_to_sync(scheduler.run_once)()
+        version = load_snapshot()['version']
+
+        source.response = FetchError('API ошибка 502')
+        self.assertEqual(async_to_sync(scheduler.run_once)(), {'kp': False})
+        snapshot = load_snapshot()
+        self.assertEqual(snapshot['data']['kp'], {'kp': 3})
+        self.assertEqual(snapshot['sources']['kp']['error'], 'API ошибка 502')
+        self.assertNotEqual(snapshot['version'], version)
+
+        # После ошибки повтор раньше интервала источника, и сроки переживают перезапуск
+        now = timezone.now()
+        restarted = FetchScheduler([source])
+        restarted.load_state()
+        for instance in (scheduler, restarted):
+            self.assertEqual(instance.due(now), [])
+            self.assertEqual(instance.due(now + timedelta(seconds=FETCH_ERROR_RETRY + 1)), [source])
+
+    def test_store_failure_still_schedules_next_run(self):
+        source = StaticSource('kp', {'kp': 3}, interval=600)
+        scheduler = FetchScheduler([source])
+
+        def locked(*args):
+            raise OperationalError('database is locked')
+
+        with mock.patch('weather.fetchers.store_source', locked):
+            self.assertEqual(async_to_sync(scheduler.run_once)(), {'kp': False})
+        now = timezone.now()
+        self.assertEqual(scheduler.due(now), [])
+        self.assertEqual(scheduler.due(now + timedelta(seconds=FETCH_ERROR_RETRY + 1)), [source])
+
+
+class CountingChannel(Channel):
+    """Канал без отправки: считает доставки в работе, чтобы проверить обратное давление"""
+
+    name = NotificationSubscription.CHANNEL_WEBHOOK
+    batch_size = 1
+
+    def __init__(self):
+        self.peak_in_flight = 0
+        self.delivered = []
+
+    async def send(self, deliveries):
+        in_flight = await sync_to_async(NotificationDelivery.objects.filter(status='sending').count)()
+        self.peak_in_flight = max(self.peak_in_flight, in_flight)
+        await asyncio.sleep(0.001)
+        self.delivered.extend(delivery.alert_id for delivery in deliveries)
+        return [None] * len(deliveries)
+
+
+class NotificationTests(TestCase):
+    """Подписки, очередь доставок и движок оповещений (с локальными серверами-заглушками)"""
+
+    def subscribe(self, channel, target, **kwargs):
+        return NotificationSubscription.objects.create(name=target, channel=channel, target=target, **kwargs)
+
+    def test_ingest_enqueues_matching_subscriptions(self):
+        email = self.subscribe('email', 'ops@example.com', min_severity=2, code_families='WARK, altk')
+        webhook = self.subscribe('webhook', 'http://127.0.0.1:9/hook')
+        self.subscribe('webhook', 'http://127.0.0.1:9/off', is_active=False)
+        with fake_translator():
+            import_alerts(load_corpus())
+
+        self.assertEqual(webhook.deliveries.count(), AlertIndex.objects.count())
+        expected = set(
+            AlertIndex.objects.filter(severity__gte=2).filter(
+                Q(message_code__startswith='WARK') | Q(message_code__startswith='ALTK')
+            ).values_list('message_code', 'serial_number')
+        )
+        self.assertTrue(expected)
+        queued = {(d.payload['message_code'], d.payload['serial_number']) for d in email.deliveries.all()}
+        self.assertEqual(queued, expected)
+        self.assertEqual(NotificationDelivery.objects.count(), webhook.deliveries.count() + len(expected))
+
+    def test_engine_delivers_batches_over_smtp_and_webhooks(self):
+        with fake_translator():
+            import_alerts(load_corpus())
+        alerts = AlertIndex.objects.count()
+        with StandInServers() as servers, override_settings(EMAIL_HOST='127.0.0.1', EMAIL_PORT=servers.smtp_port):
+            self.subscribe('email', 'ops@example.com')
+            self.subscribe('webhook', servers.webhook_url('a'))
+            self.subscribe('webhook', servers.webhook_url('b'))
+            enqueue_notifications([entry.alert for entry in AlertIndex.objects.all()])
+            engine = NotificationEngine([
+                EmailChannel(batch_size=10, backend='django.core.mail.backends.smtp.EmailBackend'),
+                WebhookChannel(batch_size=10),
+            ])
+            result = async_to_sync(engine.run)(until_idle=True)
+
+        self.assertEqual(result['sent'], {'email': alerts, 'webhook': 2 * alerts})
+        self.assertEqual(servers.messages, alerts)
+        self.assertEqual(servers.alerts, 2 * alerts)
+        # Пачками: одно соединение SMTP на пачку, один запрос на адрес в пачке
+        self.assertLessEqual(servers.smtp_sessions, math.ceil(alerts / 10) + 1)
+        self.assertLess(servers.requests, 2 * alerts)
+        self.assertFalse(NotificationDelivery.objects.exclude(status='sent').exists())
+
+    def test_failures_retry_with_backoff_then_give_up(self):
+        with StandInServers(webhook_status=503) as servers:
+            subscription = self.subscribe('webhook', servers.webhook_url())
+            alert = TypeKGeomagneticAlert.objects.create(
+                message_code='ALTK07', serial_number='1', issue_time=timezone.now(),
+                warning_type='ALERT', full_message='message', noaa_scale='G3',
+            )
+            engine = NotificationEngine([WebhookChannel()])
+            async_to_sync(engine.run)(until_idle=True)
+            delivery = subscription.deliveries.get()
+            self.assertEqual((delivery.status, delivery.attempts, delivery.last_error), ('pending', 1, 'HTTP 503'))
+            self.assertGreater(delivery.next_attempt_at, timezone.now() + timedelta(seconds=NOTIFY_RETRY_BASE - 5))
+
+            # Срок повтора не наступил — движок ничего не отправляет
+            async_to_sync(NotificationEngine([WebhookChannel()]).run)(until_idle=True)
+            self.assertEqual(servers.requests, 1)
+
+            NotificationDelivery.objects.update(attempts=NOTIFY_MAX_ATTEMPTS - 1, next_attempt_at=timezone.now())
+            async_to_sync(NotificationEngine([WebhookChannel()]).run)(until_idle=True)
+        delivery.refresh_from_db()
+        self.assertEqual((delivery.status, delivery.attempts), ('failed', NOTIFY_MAX_ATTEMPTS))
+        self.assertEqual(delivery.alert_id, f"k-{alert.pk}")
+        self.assertEqual(retry_delay(2), timedelta(seconds=2 * NOTIFY_RETRY_BASE))
+
+    def test_bounded_queue_limits_claimed_deliveries(self):
+        subscription = self.subscribe('webhook', 'http://127.0.0.1:9/hook')
+        NotificationDelivery.objects.bulk_create(
+            NotificationDelivery(subscription=subscription, channel='webhook', alert_id=f"k-{i}", payload={})
+            for i in range(30)
+        )
+        channel = CountingChannel()
+        engine = NotificationEngine([channel], queue_size=3, senders=1)
+        async_to_sync(engine.run)(until_idle=True)
+
+        self.assertEqual(len(channel.delivered), 30)
+        # Одна пачка в отправке и не больше трех доставок в очереди
+        self.assertLessEqual(channel.peak_in_flight, 4)
+        self.assertEqual(NotificationDelivery.objects.filter(status='sent').count(), 30)
@@ -0,0 +1,162 @@
+"""
+Хранилище временных рядов NOAA (плазма солнечного ветра, индекс Kp и др.).
+
+Каждый ряд — узкая таблица-наследник TimeSeriesSample: уникальный индекс
+по time_tag, несколько колонок REAL. Выгрузки NOAA пересекаются по времени
+(plasma-5-minute, plasma-7-day), поэтому загрузка идет upsert'ом по time_tag:
+повторный отсчет не дублируется, а исправленные NOAA значения обновляются.
+
+Чтение окна времени возвращает массивы NumPy (float64, пропуски — NaN),
+которые можно сразу агрегировать без циклов на Python.
+"""
+
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+import numpy as np
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import KpIndexSample, SolarWindPlasmaSample
+
+
+# Ряды: имя -> (модель, выгрузки NOAA по длине окна)
+TIME_SERIES = {
+    'plasma': (SolarWindPlasmaSample, {
+        '5-minute': 'https://services.swpc.noaa.gov/products/solar-wind/plasma-5-minute.json',
+        '2-hour': 'https://services.swpc.noaa.gov/products/solar-wind/plasma-2-hour.json',
+        '1-day': 'https://services.swpc.noaa.gov/products/solar-wind/plasma-1-day.json',
+        '7-day': 'https://services.swpc.noaa.gov/products/solar-wind/plasma-7-day.json',
+    }),
+    'kp': (KpIndexSample, {
+        '7-day': 'https://services.swpc.noaa.gov/products/noaa-planetary-k-index.json',
+    }),
+}
+
+INGEST_BATCH_SIZE = 1000
+
+
+def parse_time_tag(value):
+    """time_tag NOAA ('2024-05-10 17:00:00.000') -> aware datetime UTC"""
+    if not value:
+        return None
+    parsed = parse_datetime(str(value).replace('T', ' ').rstrip('Z'))
+    if parsed is None:
+        return None
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+def parse_float(value):
+    try:
+        return float(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_noaa_table(model, data):
+    """
+    Табличная выгрузка NOAA (первая строка — заголовки) -> экземпляры model.
+
+    Колонки сопоставляются по имени с model.VALUE_FIELDS (или по
+    model.SOURCE_COLUMNS, если в выгрузке они называются иначе), поэтому
+    порядок и лишние колонки выгрузки не важны. Выгрузка в виде списка
+    объектов приводится к таблице. Строки без корректного time_tag
+    пропускаются; при повторе time_tag в одной выгрузке берется последняя.
+    """
+    if isinstance(data, list) and data and isinstance(data[0], dict):
+        header = list(data[0])
+        data = [header] + [[row.get(name) for name in header] for row in data if isinstance(row, dict)]
+    if not isinstance(data, list) or len(data) < 2 or not isinstance(data[0], list):
+        return []
+    header = [str(name) for name in data[0]]
+    if 'time_tag' not in header:
+        return []
+    time_column = header.index('time_tag')
+    source_columns = getattr(model, 'SOURCE_COLUMNS', {})
+    columns = {
+        name: header.index(source_columns.get(name, name))
+        for name in model.VALUE_FIELDS if source_columns.get(name, name) in header
+    }
+
+    samples = {}
+    for row in data[1:]:
+        if not isinstance(row, list) or len(row) != len(header):
+            continue
+        time_tag = parse_time_tag(row[time_column])
+        if time_tag is None:
+            continue
+        values = {name: parse_float(row[index]) for name, index in columns.items()}
+        samples[time_tag] = model(time_tag=time_tag, **values)
+    return list(samples.values())
+
+
+def ingest_time_series(model, data, batch_size=INGEST_BATCH_SIZE):
+    """Сохраняет выгрузку NOAA в ряд (upsert по time_tag); возвращает число строк"""
+    samples = parse_noaa_table(model, data)
+    if samples:
+        model.objects.bulk_create(
+            samples,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['time_tag'],
+            update_fields=list(model.VALUE_FIELDS),
+        )
+        # Импорт здесь: модуль графиков сам читает ряды через этот модуль
+        from .charts import invalidate_rollups
+        invalidate_rollups(model, [sample.time_tag for sample in samples])
+    return len(samples)
+
+
+class TimeSeriesWindow:
+    """
+    Окно временного ряда в виде массивов NumPy.
+
+    times — секунды Unix (float64), values — {поле: float64}, пропуски — NaN.
+    """
+
+    def __init__(self, times, values):
+        self.times = times
+        self.values = values
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getitem__(self, name):
+        return self.values[name]
+
+    @property
+    def datetimes(self):
+        """Время отсчетов как datetime64[s] (UTC)"""
+        return self.times.astype('datetime64[s]')
+
+
+def to_datetime(value):
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, dt_timezone.utc)
+    return value
+
+
+def read_window(model, start=None, end=None, fields=None):
+    """
+    Отсчеты ряда за полуинтервал [start, end) в виде TimeSeriesWindow.
+
+    Выборка идет по уникальному индексу time_tag и читает только нужные
+    колонки; границы — datetime или секунды Unix, None — без ограничения.
+    """
+    fields = list(fields or model.VALUE_FIELDS)
+    samples = model.objects.order_by('time_tag')
+    if start is not None:
+        samples = samples.filter(time_tag__gte=to_datetime(start))
+    if end is not None:
+        samples = samples.filter(time_tag__lt=to_datetime(end))
+    rows = list(samples.values_list('time_tag', *fields))
+
+    times = np.fromiter((row[0].timestamp() for row in rows), dtype=np.float64, count=len(rows))
+    # None в массиве float64 превращается в NaN
+    values = {
+        name: np.array([row[column] for row in rows], dtype=np.float64)
+        for column, name in enumerate(fields, start=1)
+    }
+    return TimeSeriesWindow(times, values)
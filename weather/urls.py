@@ -1,16 +1,39 @@
-from django.urls import path
+from django.urls import path, register_converter
+from .converters import AlertKindConverter
 from .views import main_views
-from .views.noaa_views import noaa_detailed, alert_detail, add_comment, delete_comment
-from .views.settings_views import settings_view, test_connection, proxy_status_api, admin_alerts_view
+from .views.noaa_views import (
+    noaa_detailed, noaa_panel, alert_detail, legacy_alert_redirect, add_comment, delete_comment,
+)
+from .views.api_views import api_alert_detail, api_alerts, api_conditions, api_kp, api_solar_wind
+from .views.chart_views import solar_wind_chart_api
+from .views.live_views import live_events
+from .views.search_views import alert_search, alert_search_api
+from .views.settings_views import settings_view, test_connection, proxy_status_api, admin_alerts_view, purge_status_api
+
+register_converter(AlertKindConverter, 'alert_kind')
 
 urlpatterns = [
     path('', main_views.home, name='home'),
     path('noaa-detailed/', noaa_detailed, name='noaa_detailed'),
-    path('alert/<int:alert_id>/', alert_detail, name='alert_detail'),
-    path('alert/<int:alert_id>/comment/', add_comment, name='add_comment'),
+    path('noaa-detailed/panels/conditions/', noaa_panel, {'panel': 'conditions'}, name='noaa_conditions_panel'),
+    path('noaa-detailed/panels/solar-wind/', noaa_panel, {'panel': 'solar_wind'}, name='noaa_solar_wind_panel'),
+    path('noaa-detailed/panels/indices/', noaa_panel, {'panel': 'indices'}, name='noaa_indices_panel'),
+    path('alert/<alert_kind:kind>-<int:alert_id>/', alert_detail, name='alert_detail'),
+    path('alert/<alert_kind:kind>-<int:alert_id>/comment/', add_comment, name='add_comment'),
+    path('alert/<int:alert_id>/', legacy_alert_redirect, name='legacy_alert_detail'),
     path('comment/<int:comment_id>/delete/', delete_comment, name='delete_comment'),
+    path('search/', alert_search, name='alert_search'),
+    path('api/search/', alert_search_api, name='alert_search_api'),
+    path('api/alerts/', api_alerts, name='api_alerts'),
+    path('api/alerts/<alert_kind:kind>-<int:alert_id>/', api_alert_detail, name='api_alert_detail'),
+    path('api/conditions/', api_conditions, name='api_conditions'),
+    path('api/solar-wind/', api_solar_wind, name='api_solar_wind'),
+    path('api/solar-wind/chart/', solar_wind_chart_api, name='solar_wind_chart_api'),
+    path('api/kp/', api_kp, name='api_kp'),
+    path('live/events/', live_events, name='live_events'),
     path('settings/', settings_view, name='settings'),
     path('test-connection/', test_connection, name='test_connection'),
     path('api/proxy-status/', proxy_status_api, name='proxy_status_api'),
     path('alerts-admin/', admin_alerts_view, name='admin_alerts'),
+    path('alerts-admin/purge/<int:job_id>/', purge_status_api, name='purge_status_api'),
 ]
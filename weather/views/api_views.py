@@ -0,0 +1,304 @@
+"""
+JSON API только для чтения: алерты, условия NOAA, солнечный ветер и индекс Kp.
+
+Ответы строятся только из локального состояния (база, снимок источников
+NOAA из SourceSnapshot) и никогда не обращаются к NOAA. Строки выбираются через .values()
+без создания моделей и сериализуются orjson, если он установлен.
+?fields=a,b ограничивает набор полей (и колонок в запросе). Ответы сжимаются
+gzip и поддерживают ETag / Last-Modified (304 без запросов к алертам).
+"""
+
+import json
+import math
+from datetime import timezone as dt_timezone
+from functools import wraps
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.gzip import gzip_page
+
+from ..alert_filters import AlertListParams
+from ..conditional import conditional_page, content_version
+from ..fetchers import load_snapshot, sources_version
+from ..kp_stats import window_statistics
+from ..models import ALERT_KINDS, AlertComment, AlertIndex, KpIndexSample, SolarWindPlasmaSample, alert_kind, alert_url
+from ..pagination import KeysetPaginator
+from ..timeseries import read_window
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+API_MAX_AGE = 30  # секунд для прокси и браузера
+API_PAGE_SIZE = 50
+MAX_API_PAGE_SIZE = 200
+MAX_SOLAR_WIND_HOURS = 7 * 24
+KP_DAYS = 30
+MAX_KP_DAYS = 100 * 366
+
+# Поля ленты: вычисляемые id/kind/url строятся из content_type_id и object_id
+ALERT_LIST_FIELDS = (
+    'id', 'kind', 'url', 'message_code', 'serial_number', 'issue_time', 'noaa_scale', 'severity',
+    'valid_from', 'active_until', 'title', 'summary', 'comment_count',
+)
+ALERT_LIST_DEFAULT_FIELDS = tuple(name for name in ALERT_LIST_FIELDS if name != 'comment_count')
+CONDITION_FIELDS = ('current', 'today_forecast', 'tomorrow_forecast', 'day_after_forecast')
+KP_FIELDS = ('daily', 'rolling_max_24h', 'storm_days', 'g_distribution')
+
+
+class ApiError(Exception):
+    """Ошибка параметров запроса (ответ 400)"""
+
+
+def api_response(data, status=200):
+    """JSON-ответ (orjson, если установлен)"""
+    if ORJSON_AVAILABLE:
+        content = orjson.dumps(data, option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS)
+    else:
+        content = json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+    return HttpResponse(content, status=status, content_type='application/json')
+
+
+def api_view(version):
+    """Общая обертка API: gzip, ETag / Cache-Control и ответ 400 на ApiError"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            try:
+                return view(request, *args, **kwargs)
+            except ApiError as e:
+                return api_response({'error': str(e)}, status=400)
+        return gzip_page(conditional_page(version, public_max_age=API_MAX_AGE)(wrapper))
+    return decorator
+
+
+def requested_fields(request, allowed, default=None):
+    """Поля из ?fields= (через запятую) с проверкой по allowed"""
+    raw = request.GET.get('fields', '').strip()
+    if not raw:
+        return list(default or allowed)
+    fields = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in allowed]
+    if unknown:
+        raise ApiError(f"Неизвестные поля: {', '.join(unknown)}; доступны: {', '.join(allowed)}")
+    return fields
+
+
+def int_param(request, name, default, minimum, maximum):
+    value = request.GET.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        return max(minimum, min(int(value), maximum))
+    except ValueError:
+        raise ApiError(f"Параметр {name} должен быть целым числом")
+
+
+def datetime_param(request, name):
+    value = request.GET.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ApiError(f"Параметр {name}: ожидается дата и время ISO 8601")
+    # Время без часового пояса считается UTC, как и все времена NOAA
+    return timezone.make_aware(parsed, dt_timezone.utc) if timezone.is_naive(parsed) else parsed
+
+
+def query_version(request):
+    """Параметры запроса в стабильном порядке (часть ETag)"""
+    return sorted(request.GET.lists())
+
+
+def kind_for_content_type(content_type_id):
+    return alert_kind(ContentType.objects.get_for_id(content_type_id).model_class())
+
+
+# --- Алерты ---
+
+def alerts_version(request, *args, **kwargs):
+    changed = content_version(request)
+    return changed, ['api-alerts', changed, kwargs, query_version(request)]
+
+
+def alert_list_row(row, fields):
+    kind = kind_for_content_type(row['content_type_id'])
+    computed = {'id': f"{kind}-{row['object_id']}", 'kind': kind, 'url': alert_url(kind, row['object_id'])}
+    return {name: computed[name] if name in computed else row[name] for name in fields}
+
+
+@api_view(alerts_version)
+def api_alerts(request):
+    """Лента алертов: keyset-пагинация, сортировка sort, фильтры type, since, until, min_severity, active, code"""
+    fields = requested_fields(request, ALERT_LIST_FIELDS, ALERT_LIST_DEFAULT_FIELDS)
+
+    try:
+        list_params = AlertListParams.from_query(request.GET, strict=True)
+    except ValueError as e:
+        raise ApiError(str(e))
+
+    queryset = list_params.filter(AlertIndex.objects.all())
+    since, until = datetime_param(request, 'since'), datetime_param(request, 'until')
+    if since:
+        queryset = queryset.filter(issue_time__gte=since)
+    if until:
+        queryset = queryset.filter(issue_time__lt=until)
+    if 'comment_count' in fields:
+        queryset = queryset.with_comment_counts()
+
+    # Только нужные колонки: ключ пагинации (поля сортировки) и запрошенные поля
+    ordering = list_params.ordering
+    columns = {name.lstrip('-') for name in ordering} | {name for name in fields if name not in ('id', 'kind', 'url')}
+    paginator = KeysetPaginator(
+        queryset.values(*columns), int_param(request, 'limit', API_PAGE_SIZE, 1, MAX_API_PAGE_SIZE), ordering=ordering,
+    )
+    page = paginator.get_page(request.GET.get('cursor'))
+
+    return api_response({
+        'results': [alert_list_row(row, fields) for row in page],
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.prev_cursor,
+    })
+
+
+def alert_detail_fields(model):
+    """Поля детального ответа для модели алерта"""
+    names = ['id', 'kind', 'url']
+    names += [field.attname for field in model._meta.concrete_fields if field.attname != 'id']
+    return tuple(names) + ('comments',)
+
+
+@api_view(alerts_version)
+def api_alert_detail(request, kind, alert_id):
+    """Отдельный алерт со всеми полями и комментариями"""
+    model = ALERT_KINDS[kind]
+    fields = requested_fields(request, alert_detail_fields(model))
+    columns = [name for name in fields if name not in ('id', 'kind', 'url', 'comments')]
+
+    row = model.objects.filter(pk=alert_id).values(*columns).first()
+    if row is None:
+        return api_response({'error': 'Событие не найдено'}, status=404)
+    row.update({'id': f"{kind}-{alert_id}", 'kind': kind, 'url': alert_url(kind, alert_id)})
+    if 'comments' in fields:
+        row['comments'] = list(
+            AlertComment.objects.filter(
+                content_type=ContentType.objects.get_for_model(model), object_id=alert_id,
+            ).values('id', 'author_name', 'content', 'created_at')
+        )
+    return api_response({name: row[name] for name in fields})
+
+
+# --- Условия NOAA ---
+
+def conditions_snapshot():
+    """Снимок NOAA, если в нем уже есть шкалы R/S/G"""
+    snapshot = load_snapshot()
+    return snapshot if snapshot and 'current_conditions' in snapshot['data'] else None
+
+
+def conditions_version(request):
+    snapshot = conditions_snapshot()
+    if snapshot is None:
+        return None
+    changed_at, version = sources_version(snapshot, ['current_conditions'])
+    return changed_at, ['api-conditions', version, query_version(request)]
+
+
+@api_view(conditions_version)
+def api_conditions(request):
+    """Шкалы R/S/G и прогноз из сохраненного снимка NOAA (без запроса к NOAA)"""
+    fields = requested_fields(request, CONDITION_FIELDS)
+    snapshot = conditions_snapshot()
+    if snapshot is None:
+        return api_response({'error': 'Данные NOAA еще не загружены'}, status=503)
+    conditions = snapshot['data']['current_conditions']
+    return api_response({
+        'fetched_at': snapshot['sources']['current_conditions']['fetched_at'],
+        'conditions': {name: conditions.get(name) for name in fields},
+    })
+
+
+# --- Солнечный ветер ---
+
+def latest_solar_wind_time(request):
+    """Время последнего отсчета плазмы (запоминается на запросе)"""
+    if not hasattr(request, '_latest_solar_wind_time'):
+        request._latest_solar_wind_time = SolarWindPlasmaSample.objects.aggregate(latest=Max('time_tag'))['latest']
+    return request._latest_solar_wind_time
+
+
+def solar_wind_version(request):
+    latest = latest_solar_wind_time(request)
+    return latest, ['api-solar-wind', latest, query_version(request)]
+
+
+def nullable(values):
+    """float64 -> список для JSON (NaN -> null)"""
+    return [None if math.isnan(value) else value for value in values.tolist()]
+
+
+@api_view(solar_wind_version)
+def api_solar_wind(request):
+    """
+    Отсчеты плазмы солнечного ветра за hours часов до until (по умолчанию —
+    2 часа до последнего отсчета) по колонкам; time — секунды Unix.
+    """
+    fields = requested_fields(request, SolarWindPlasmaSample.VALUE_FIELDS)
+    latest = latest_solar_wind_time(request)
+    if latest is None:
+        return api_response({'time': [], **{name: [] for name in fields}})
+
+    hours = int_param(request, 'hours', 2, 1, MAX_SOLAR_WIND_HOURS)
+    until = datetime_param(request, 'until')
+    end = until.timestamp() if until else latest.timestamp() + 1
+    window = read_window(SolarWindPlasmaSample, end - hours * 3600, end, fields=fields)
+    return api_response({
+        'time': [int(value) for value in window.times.tolist()],
+        **{name: nullable(window[name]) for name in fields},
+    })
+
+
+# --- Индекс Kp ---
+
+def latest_kp_time(request):
+    """Время последнего отсчета Kp (запоминается на запросе)"""
+    if not hasattr(request, '_latest_kp_time'):
+        request._latest_kp_time = KpIndexSample.objects.aggregate(latest=Max('time_tag'))['latest']
+    return request._latest_kp_time
+
+
+def kp_version(request):
+    latest = latest_kp_time(request)
+    return latest, ['api-kp', latest, query_version(request)]
+
+
+@api_view(kp_version)
+def api_kp(request):
+    """
+    Статистика Kp за окно: суточный максимум Kp и Ap, скользящий максимум
+    за 24 часа, число суток с бурей и распределение уровней G. Окно —
+    since..until или days суток до until (по умолчанию — до последнего отсчета).
+    """
+    fields = requested_fields(request, KP_FIELDS)
+    latest = latest_kp_time(request)
+    until, since = datetime_param(request, 'until'), datetime_param(request, 'since')
+    end = until.timestamp() if until else (latest.timestamp() + 1 if latest else timezone.now().timestamp())
+    start = since.timestamp() if since else end - int_param(request, 'days', KP_DAYS, 1, MAX_KP_DAYS) * 86400
+
+    statistics = window_statistics(start, end)
+    return api_response({
+        'start': int(start),
+        'end': int(end),
+        'samples': statistics['samples'],
+        **{name: statistics[name] for name in fields},
+    })
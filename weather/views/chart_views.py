@@ -0,0 +1,25 @@
+from django.http import JsonResponse
+
+from ..charts import CHART_WINDOWS, DEFAULT_CHART_WIDTH, MAX_CHART_WIDTH, cached_chart
+from ..models import SolarWindPlasmaSample
+
+
+def chart_width(request):
+    """Ширина графика в пикселях из ?width= (в пределах MAX_CHART_WIDTH)"""
+    try:
+        return max(10, min(int(request.GET.get('width', DEFAULT_CHART_WIDTH)), MAX_CHART_WIDTH))
+    except ValueError:
+        return DEFAULT_CHART_WIDTH
+
+
+def solar_wind_chart_api(request):
+    """API графика солнечного ветра: полосы min/mean/max и линия LTTB за окно"""
+    field = request.GET.get('field', 'speed')
+    window = request.GET.get('window', '24h')
+    if field not in SolarWindPlasmaSample.VALUE_FIELDS:
+        return JsonResponse({'error': f"Неизвестное поле, доступны: {', '.join(SolarWindPlasmaSample.VALUE_FIELDS)}"}, status=400)
+    if window not in CHART_WINDOWS:
+        return JsonResponse({'error': f"Неизвестное окно, доступны: {', '.join(CHART_WINDOWS)}"}, status=400)
+    
+    chart = cached_chart(SolarWindPlasmaSample, field, window, width=chart_width(request))
+    return JsonResponse(chart, json_dumps_params={'ensure_ascii': False})
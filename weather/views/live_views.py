@@ -0,0 +1,22 @@
+from django.http import StreamingHttpResponse
+
+from ..live import event_stream
+
+
+async def live_events(request):
+    """
+    Поток Server-Sent Events: новые алерты и смена шкал NOAA.
+
+    Нужен ASGI-сервер (cosmo.asgi:application): под WSGI каждый клиент
+    занимал бы рабочий поток на все время соединения.
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    
+    response = StreamingHttpResponse(event_stream(last_event_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # прокси не должны буферизовать поток
+    return response
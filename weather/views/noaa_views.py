@@ -1,28 +1,25 @@
-from django.shortcuts import render
+from django.shortcuts import render, redirect
+from django.contrib import messages
+from django.conf import settings
 from django.http import JsonResponse
-import asyncio
 import re
 from datetime import datetime
 from django.utils import timezone
 from datetime import timezone as dt_timezone
 from django.utils.dateparse import parse_datetime
-from utils.proxy_utils import make_request_with_proxy
+from django.utils.functional import SimpleLazyObject
 from utils.translation import translate_space_weather_text, translate_alert_data
-from ..models import SpaceWeatherAlert, TypeTRadioAlert, TypeKGeomagneticAlert, TypeEElectronAlert, TypeAForecastAlert, AlertComment
+from ..models import (
+    ALERT_KINDS, ALERT_MODELS, SpaceWeatherAlert, TypeTRadioAlert, TypeKGeomagneticAlert, TypeEElectronAlert,
+    TypeAForecastAlert, AlertComment, AlertIndex, ArchivedAlert, SourceSnapshot, alert_kind, update_stored_fields,
+)
+from ..retention import find_archived_alert, restore_archived_alert
+from ..alert_chain import event_history
+from ..alert_filters import ALERT_KIND_LABELS, AlertListParams
+from ..conditional import conditional_page, content_version
+from ..fetchers import load_snapshot, sources_version
 from django.contrib.contenttypes.models import ContentType
-
-
-def translate_condition_text(text):
-    """Переводит английские значения на русский"""
-    translations = {
-        'none': 'нет',
-        'minor': 'слабые',
-        'moderate': 'умеренные',
-        'strong': 'сильные',
-        'severe': 'очень сильные',
-        'extreme': 'экстремальные'
-    }
-    return translations.get(text.lower() if text else '', text)
+from ..pagination import KeysetPaginator
 
 
 def translate_alert_text(text):
@@ -119,7 +116,7 @@ def parse_type_k_geomagnetic(message):
     """Парсер для K* - K-index Events"""
     parsed = {}
     
-    alert_match = re.search(r'(ALERT|WARNING|EXTENDED WARNING):\s*([^\r\n]+)', message)
+    alert_match = re.search(r'(ALERT|WARNING|EXTENDED WARNING|CANCEL WARNING):\s*([^\r\n]+)', message)
     if alert_match:
         parsed['warning_type'] = f"{alert_match.group(1)}: {alert_match.group(2).strip()}"
     
@@ -222,7 +219,7 @@ def parse_type_w_watch(message):
     parsed = {}
     
     # Ищем различные типы предупреждений
-    alert_match = re.search(r'(ALERT|WARNING|WATCH|EXTENDED WARNING):\s*([^\r\n]+)', message)
+    alert_match = re.search(r'(ALERT|WARNING|WATCH|EXTENDED WARNING|CANCEL WARNING|CANCEL WATCH):\s*([^\r\n]+)', message)
     if alert_match:
         parsed['warning_type'] = f"{alert_match.group(1)}: {alert_match.group(2).strip()}"
     
@@ -265,7 +262,7 @@ def parse_unknown_type(message):
     parsed = {}
     
     # Ищем различные типы предупреждений
-    alert_match = re.search(r'(ALERT|WARNING|WATCH|EXTENDED WARNING|CONTINUED ALERT):\s*([^\r\n]+)', message)
+    alert_match = re.search(r'(ALERT|WARNING|WATCH|EXTENDED WARNING|CONTINUED ALERT|CANCEL WARNING|CANCEL WATCH):\s*([^\r\n]+)', message)
     if alert_match:
         parsed['warning_type'] = f"{alert_match.group(1)}: {alert_match.group(2).strip()}"
     
@@ -325,7 +322,8 @@ def parse_alert_message(alert_data):
     else:
         print(f"DEBUG: No message_code found in message")
     
-    serial_match = re.search(r'Serial Number:\s*(\d+)', message)
+    # Только собственный номер: строки "Extension to Serial Number" и т.п. — ссылки
+    serial_match = re.search(r'^Serial Number:\s*(\d+)', message, re.MULTILINE)
     if serial_match:
         parsed['serial_number'] = serial_match.group(1)
     
@@ -358,25 +356,15 @@ def parse_alert_message(alert_data):
     return parsed
 
 
-def save_alert_to_db(parsed_alert):
-    """Сохранение алерта в соответствующую таблицу по типу"""
-    if not parsed_alert:
-        return None
-    
-    # Определяем тип по первой букве message_code
+def build_alert_instance(parsed_alert):
+    """Создает (не сохраняя) алерт нужного типа по первой букве message_code"""
     first_letter = parsed_alert.get('message_code', '')[0:1].upper()
     
-    # Отладочная информация
-    print(f"DEBUG: Saving alert with first_letter: {first_letter}, message_code: {parsed_alert.get('message_code', '')}")
-    print(f"DEBUG: Full parsed_alert keys: {list(parsed_alert.keys())}")
-    print(f"DEBUG: Product_id: {parsed_alert.get('product_id', '')}")
-    print(f"DEBUG: Message_code: {parsed_alert.get('message_code', '')}")
-    
     # Переводим текстовые поля с помощью translation.py
     translated_alert = translate_alert_data(parsed_alert)
     
     # Базовые данные для всех типов
-    base_data = {
+    alert_data = {
         'message_code': translated_alert.get('message_code', ''),
         'serial_number': translated_alert.get('serial_number', ''),
         'issue_time': translated_alert.get('issue_time'),
@@ -384,309 +372,209 @@ def save_alert_to_db(parsed_alert):
         'full_message': translated_alert.get('raw_message', '')
     }
     
-    # Удаляем None значения из базовых данных
-    base_data = {k: v for k, v in base_data.items() if v is not None}
+    if first_letter == 'T':
+        # T* - Type II Radio Emission
+        model = TypeTRadioAlert
+        alert_data.update({
+            'begin_time': translated_alert.get('begin_time'),
+            'estimated_velocity': translated_alert.get('estimated_velocity', ''),
+            'description': translated_alert.get('description', '')
+        })
+    elif first_letter == 'K':
+        # K* - K-index Events
+        model = TypeKGeomagneticAlert
+        alert_data.update({
+            'valid_from': translated_alert.get('valid_from'),
+            'valid_to': translated_alert.get('valid_to'),
+            'begin_time': translated_alert.get('begin_time'),
+            'warning_condition': translated_alert.get('warning_condition', ''),
+            'noaa_scale': translated_alert.get('noaa_scale', ''),
+            'potential_impacts': translated_alert.get('potential_impacts', '')
+        })
+    elif first_letter == 'E':
+        # E* - Electron Flux Events
+        model = TypeEElectronAlert
+        alert_data.update({
+            'begin_time': translated_alert.get('begin_time'),
+            'maximum_flux': translated_alert.get('maximum_flux', ''),
+            'potential_impacts': translated_alert.get('potential_impacts', '')
+        })
+    elif first_letter == 'A':
+        # A* - Storm Watch/Forecast
+        model = TypeAForecastAlert
+        alert_data.update({
+            'forecast_data': translated_alert.get('forecast_data', ''),
+            'potential_impacts': translated_alert.get('potential_impacts', '')
+        })
+    else:
+        # W* - Watch/Alert и неизвестные типы - основная таблица со всеми полями
+        model = SpaceWeatherAlert
+        alert_data.update({
+            'valid_from': translated_alert.get('valid_from'),
+            'valid_to': translated_alert.get('valid_to'),
+            'begin_time': translated_alert.get('begin_time'),
+            'end_time': translated_alert.get('end_time'),
+            'warning_condition': translated_alert.get('warning_condition', ''),
+            'noaa_scale': translated_alert.get('noaa_scale', ''),
+            'potential_impacts': translated_alert.get('potential_impacts', ''),
+            'description': translated_alert.get('description', ''),
+            'estimated_velocity': translated_alert.get('estimated_velocity', ''),
+            'maximum_flux': translated_alert.get('maximum_flux', ''),
+            'forecast_data': translated_alert.get('forecast_data', '')
+        })
+    
+    # Удаляем None значения
+    alert_data = {k: v for k, v in alert_data.items() if v is not None}
+    # Серьезность и период действия считаются сразу: пакетная загрузка идет через bulk_create
+    return update_stored_fields(model(**alert_data))
+
+
+def save_alert_to_db(parsed_alert):
+    """Сохранение алерта в соответствующую таблицу по типу"""
+    if not parsed_alert:
+        return None
+    
+    # Отладочная информация
+    print(f"DEBUG: Saving alert with first_letter: {parsed_alert.get('message_code', '')[0:1].upper()}, message_code: {parsed_alert.get('message_code', '')}")
+    print(f"DEBUG: Full parsed_alert keys: {list(parsed_alert.keys())}")
+    print(f"DEBUG: Product_id: {parsed_alert.get('product_id', '')}")
+    print(f"DEBUG: Message_code: {parsed_alert.get('message_code', '')}")
     
     try:
-        if first_letter == 'T':
-            # T* - Type II Radio Emission
-            existing = TypeTRadioAlert.objects.filter(**{k: v for k, v in base_data.items() if k in ['message_code', 'serial_number', 'issue_time']}).first()
-            if existing:
-                return existing
-            
-            alert_data = base_data.copy()
-            alert_data.update({
-                'begin_time': translated_alert.get('begin_time'),
-                'estimated_velocity': translated_alert.get('estimated_velocity', ''),
-                'description': translated_alert.get('description', '')
-            })
-            alert_data = {k: v for k, v in alert_data.items() if v is not None}
-            return TypeTRadioAlert.objects.create(**alert_data)
-            
-        elif first_letter == 'K':
-            # K* - K-index Events
-            existing = TypeKGeomagneticAlert.objects.filter(**{k: v for k, v in base_data.items() if k in ['message_code', 'serial_number', 'issue_time']}).first()
-            if existing:
-                return existing
-            
-            alert_data = base_data.copy()
-            alert_data.update({
-                'valid_from': translated_alert.get('valid_from'),
-                'valid_to': translated_alert.get('valid_to'),
-                'begin_time': translated_alert.get('begin_time'),
-                'warning_condition': translated_alert.get('warning_condition', ''),
-                'noaa_scale': translated_alert.get('noaa_scale', ''),
-                'potential_impacts': translated_alert.get('potential_impacts', '')
-            })
-            alert_data = {k: v for k, v in alert_data.items() if v is not None}
-            return TypeKGeomagneticAlert.objects.create(**alert_data)
-            
-        elif first_letter == 'E':
-            # E* - Electron Flux Events
-            existing = TypeEElectronAlert.objects.filter(**{k: v for k, v in base_data.items() if k in ['message_code', 'serial_number', 'issue_time']}).first()
-            if existing:
-                return existing
-            
-            alert_data = base_data.copy()
-            alert_data.update({
-                'begin_time': translated_alert.get('begin_time'),
-                'maximum_flux': translated_alert.get('maximum_flux', ''),
-                'potential_impacts': translated_alert.get('potential_impacts', '')
-            })
-            alert_data = {k: v for k, v in alert_data.items() if v is not None}
-            return TypeEElectronAlert.objects.create(**alert_data)
-            
-        elif first_letter == 'A':
-            # A* - Storm Watch/Forecast
-            existing = TypeAForecastAlert.objects.filter(**{k: v for k, v in base_data.items() if k in ['message_code', 'serial_number', 'issue_time']}).first()
-            if existing:
-                return existing
-            
-            alert_data = base_data.copy()
-            alert_data.update({
-                'forecast_data': translated_alert.get('forecast_data', ''),
-                'potential_impacts': translated_alert.get('potential_impacts', '')
-            })
-            alert_data = {k: v for k, v in alert_data.items() if v is not None}
-            return TypeAForecastAlert.objects.create(**alert_data)
-            
-        elif first_letter == 'W':
-            # W* - Watch/Alert (сохраняем в основную таблицу с дополнительными полями)
-            existing = SpaceWeatherAlert.objects.filter(**{k: v for k, v in base_data.items() if k in ['message_code', 'serial_number', 'issue_time']}).first()
-            if existing:
-                return existing
-            
-            alert_data = base_data.copy()
-            alert_data.update({
-                'valid_from': translated_alert.get('valid_from'),
-                'valid_to': translated_alert.get('valid_to'),
-                'begin_time': translated_alert.get('begin_time'),
-                'end_time': translated_alert.get('end_time'),
-                'warning_condition': translated_alert.get('warning_condition', ''),
-                'noaa_scale': translated_alert.get('noaa_scale', ''),
-                'potential_impacts': translated_alert.get('potential_impacts', ''),
-                'description': translated_alert.get('description', ''),
-                'estimated_velocity': translated_alert.get('estimated_velocity', ''),
-                'maximum_flux': translated_alert.get('maximum_flux', ''),
-                'forecast_data': translated_alert.get('forecast_data', '')
-            })
-            alert_data = {k: v for k, v in alert_data.items() if v is not None}
-            return SpaceWeatherAlert.objects.create(**alert_data)
-            
-        else:
-            # Неизвестный тип - сохраняем в старую таблицу
-            existing = SpaceWeatherAlert.objects.filter(**{k: v for k, v in base_data.items() if k in ['message_code', 'serial_number', 'issue_time']}).first()
-            if existing:
-                return existing
-            
-            # Для неизвестных типов добавляем все возможные поля
-            alert_data = base_data.copy()
-            alert_data.update({
-                'valid_from': translated_alert.get('valid_from'),
-                'valid_to': translated_alert.get('valid_to'),
-                'begin_time': translated_alert.get('begin_time'),
-                'end_time': translated_alert.get('end_time'),
-                'warning_condition': translated_alert.get('warning_condition', ''),
-                'noaa_scale': translated_alert.get('noaa_scale', ''),
-                'potential_impacts': translated_alert.get('potential_impacts', ''),
-                'description': translated_alert.get('description', ''),
-                'estimated_velocity': translated_alert.get('estimated_velocity', ''),
-                'maximum_flux': translated_alert.get('maximum_flux', ''),
-                'forecast_data': translated_alert.get('forecast_data', '')
-            })
-            alert_data = {k: v for k, v in alert_data.items() if v is not None}
-            return SpaceWeatherAlert.objects.create(**alert_data)
+        alert = build_alert_instance(parsed_alert)
+        
+        lookup = {'message_code': alert.message_code, 'serial_number': alert.serial_number}
+        if alert.issue_time is not None:
+            lookup['issue_time'] = alert.issue_time
+        existing = type(alert).objects.filter(**lookup).first()
+        if existing:
+            return existing
+        
+        alert.save(force_insert=True)
+        return alert
             
     except Exception as e:
         return None
 
 
-async def fetch_noaa_current_conditions():
-    """Получение текущих условий космической погоды"""
-    url = "https://services.swpc.noaa.gov/products/noaa-scales.json"
-    status, data = await make_request_with_proxy(url)
-    if status == 200 and (not isinstance(data, dict) or 'error' not in data):
-        return {"source": "Current Conditions", "data": data, "status": "success"}
-    message = data.get('message', f"API ошибка {status}") if isinstance(data, dict) else f"API ошибка {status}"
-    return {"source": "Current Conditions", "data": {}, "status": "error", "message": message}
-
-
-async def fetch_noaa_alerts():
-    """Получение активных предупреждений"""
-    url = "https://services.swpc.noaa.gov/products/alerts.json"
-    status, data = await make_request_with_proxy(url)
-    if status == 200 and isinstance(data, list):
-        # Парсим алерты, но НЕ сохраняем в базу (это будет делаться отдельно в админке)
-        parsed_alerts = []
-        for alert_data in data:
-            parsed_alert = parse_alert_message(alert_data)
-            if parsed_alert:
-                parsed_alerts.append(parsed_alert)
-        
-        return {"source": "Alerts", "data": data, "status": "success", "parsed_count": len(parsed_alerts)}
-    return {"source": "Alerts", "data": [], "status": "error", "message": f"API ошибка {status}"}
-
-
-async def fetch_noaa_solar_wind():
-    """Получение данных солнечного ветра"""
-    url = "https://services.swpc.noaa.gov/products/solar-wind/plasma-5-minute.json"
-    status, data = await make_request_with_proxy(url)
-    if status == 200 and isinstance(data, list) and len(data) > 1:
-        rows = data[1:]
-        last_rows = rows[-3:]
-        result = [["time_tag","density","speed","temperature"]]
-        for r in last_rows:
-            if isinstance(r, list) and len(r) >= 4:
-                result.append([str(r[0]), str(r[1]), str(r[2]), str(r[3])])
-        return {"source": "Solar Wind", "data": result, "status": "success"}
-    return {"source": "Solar Wind", "data": [], "status": "error", "message": f"API ошибка {status}"}
-
-
-async def fetch_noaa_detailed_data():
-    """Получение всех детальных данных NOAA SWPC"""
-    tasks = [
-        fetch_noaa_current_conditions(),
-        fetch_noaa_alerts(),
-        fetch_noaa_solar_wind()
-    ]
-    
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    
-    # Обработка результатов
-    detailed_data = {}
-    for result in results:
-        if isinstance(result, dict) and result.get('status') == 'success':
-            source = result['source']
-            # Преобразуем ключи для безопасного использования в шаблонах
-            if source == '3-Day Forecast':
-                detailed_data['forecast'] = result['data']
-            elif source == 'Current Conditions':
-                # Преобразуем отрицательные ключи в безопасные имена
-                conditions_data = result['data']
-                if isinstance(conditions_data, dict):
-                    # Создаем новый словарь с безопасными ключами и переводом
-                    safe_conditions = {}
-                    for key, value in conditions_data.items():
-                        # Переводим текстовые значения
-                        if isinstance(value, dict):
-                            translated_value = value.copy()
-                            for scale in ['R', 'S', 'G']:
-                                if scale in translated_value and 'Text' in translated_value[scale]:
-                                    translated_value[scale]['Text'] = translate_condition_text(translated_value[scale]['Text'])
-                        else:
-                            translated_value = value
-                            
-                        if key == '-1':
-                            safe_conditions['past_24h'] = translated_value
-                        elif key == '0':
-                            safe_conditions['current'] = translated_value
-                        elif key == '1':
-                            safe_conditions['today_forecast'] = translated_value
-                        elif key == '2':
-                            safe_conditions['tomorrow_forecast'] = translated_value
-                        elif key == '3':
-                            safe_conditions['day_after_forecast'] = translated_value
-                        else:
-                            safe_conditions[key] = translated_value
-                    detailed_data['current_conditions'] = safe_conditions
-                else:
-                    detailed_data['current_conditions'] = conditions_data
-            elif source == 'Alerts':
-                detailed_data['alerts'] = result['data']
-            elif source == 'Summary':
-                detailed_data['summary'] = result['data']
-            elif source == 'Solar Wind':
-                detailed_data['solar_wind'] = result['data']
-        elif isinstance(result, Exception):
-            detailed_data['error'] = str(result)
-    
-    # Алерты из БД будут добавлены в синхронной части
-    
-    return detailed_data
+# Панели детальной страницы: шаблон и источники снимка NOAA
+NOAA_PANELS = {
+    'conditions': ('panels/noaa_conditions.html', ('current_conditions',)),
+    'solar_wind': ('panels/noaa_solar_wind.html', ('solar_wind',)),
+    'indices': ('panels/noaa_indices.html', ('kp_index', 'forecast', 'xray_flux', 'proton_flux', 'magnetometer')),
+}
+# Сколько секунд прокси и браузер хранят страницу и панели без проверки
+NOAA_PAGE_MAX_AGE = 60
+
 
+def noaa_detailed_version(request):
+    """Версия детальной страницы: изменения в базе, сортировка, фильтры и курсор (данные NOAA грузятся панелями)"""
+    changed = content_version(request)
+    return changed, ['noaa', changed, sorted(request.GET.lists())]
 
+
+@conditional_page(noaa_detailed_version, public_max_age=NOAA_PAGE_MAX_AGE)
 def noaa_detailed(request):
-    """Детальная страница NOAA SWPC с полными метриками"""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        noaa_data = loop.run_until_complete(fetch_noaa_detailed_data())
-    finally:
-        loop.close()
-    
-    # Добавляем алерты из всех таблиц БД с пагинацией
-    from itertools import chain
-    from operator import attrgetter
-    from django.core.paginator import Paginator
-    
-    t_alerts = list(TypeTRadioAlert.objects.all())
-    k_alerts = list(TypeKGeomagneticAlert.objects.all()) 
-    e_alerts = list(TypeEElectronAlert.objects.all())
-    a_alerts = list(TypeAForecastAlert.objects.all())
-    old_alerts = list(SpaceWeatherAlert.objects.all())
-    
-    # Объединяем и сортируем по времени
-    all_alerts = list(chain(t_alerts, k_alerts, e_alerts, a_alerts, old_alerts))
-    all_alerts.sort(key=attrgetter('issue_time'), reverse=True)
-    
-    # Пагинация
-    paginator = Paginator(all_alerts, 20)  # 20 алертов на страницу
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    
-    noaa_data['db_alerts'] = page_obj
+    """
+    Детальная страница NOAA SWPC с полными метриками.
+    
+    Страница строится только из локальных данных (таблица алертов из базы),
+    поэтому первый байт не ждет NOAA. Панели условий, солнечного ветра и
+    индексов загружаются отдельными запросами к noaa_panel.
+    """
+    # Алерты из ленты всех таблиц БД: сортировка и фильтры в SQL, keyset-пагинация
+    list_params = AlertListParams.from_query(request.GET)
+    paginator = KeysetPaginator(
+        list_params.filter(AlertIndex.objects.with_comment_counts()), 20,  # 20 алертов на страницу
+        ordering=list_params.ordering, with_total=True,
+    )
+    cursor = request.GET.get('cursor', '')
     
     context = {
         'title': 'NOAA Space Weather Prediction Center - Детальные метрики',
-        'noaa_data': noaa_data,
-        'last_updated': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # Страница загружается лениво: при попадании в кэш фрагмента таблицы запросов нет
+        'db_alerts': SimpleLazyObject(lambda: paginator.get_page(cursor)),
+        'list_params': list_params,
+        'alert_kinds': ALERT_KIND_LABELS,
+        'panel_timeout': settings.NOAA_PANEL_TIMEOUT,
+        # Ключи кэша фрагментов шаблона
+        'fragment_ttl': settings.NOAA_FRAGMENT_TTL,
+        'content_version': content_version(request),
+        'cursor': cursor,
     }
     
     return render(request, 'noaa_detailed.html', context)
 
 
-def alert_detail(request, alert_id):
-    """Детальная страница отдельного события"""
-    alert = None
-    alert_type = None
+def noaa_panel_version(request, panel):
+    """Версия панели NOAA: версии ее источников в сохраненном снимке"""
+    snapshot = load_snapshot()
+    if snapshot is None:
+        return None
+    changed_at, version = sources_version(snapshot, NOAA_PANELS[panel][1])
+    return changed_at, ['noaa-panel', panel, version]
+
+
+@conditional_page(noaa_panel_version, public_max_age=NOAA_PAGE_MAX_AGE)
+def noaa_panel(request, panel):
+    """
+    HTML-фрагмент панели из снимка источников NOAA.
     
-    # Ищем алерт во всех таблицах
-    try:
-        alert = SpaceWeatherAlert.objects.get(id=alert_id)
-        alert_type = 'Legacy'
-    except SpaceWeatherAlert.DoesNotExist:
-        try:
-            alert = TypeTRadioAlert.objects.get(id=alert_id)
-            alert_type = 'T-Radio'
-        except TypeTRadioAlert.DoesNotExist:
-            try:
-                alert = TypeKGeomagneticAlert.objects.get(id=alert_id)
-                alert_type = 'K-Geomagnetic'
-            except TypeKGeomagneticAlert.DoesNotExist:
-                try:
-                    alert = TypeEElectronAlert.objects.get(id=alert_id)
-                    alert_type = 'E-Electron'
-                except TypeEElectronAlert.DoesNotExist:
-                    try:
-                        alert = TypeAForecastAlert.objects.get(id=alert_id)
-                        alert_type = 'A-Forecast'
-                    except TypeAForecastAlert.DoesNotExist:
-                        pass
+    Снимок обновляет планировщик (manage.py run_fetchers), представление
+    только читает его. 503 с заглушкой — данных источников панели еще нет.
+    """
+    template_name, names = NOAA_PANELS[panel]
+    snapshot = load_snapshot()
+    if snapshot is None or not any(name in snapshot['data'] for name in names):
+        return render(request, 'panels/noaa_unavailable.html', status=503)
+    
+    states = [snapshot['sources'][name] for name in names if name in snapshot['sources']]
+    fetched_at = max(state['fetched_at'] for state in states if state['fetched_at'])
+    context = {
+        'noaa_data': snapshot['data'],
+        'source_errors': [state['error'] for state in states if state['status'] == SourceSnapshot.STATUS_ERROR],
+        'stale': any(state['stale'] for state in states),
+        'last_updated': timezone.localtime(fetched_at, dt_timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+        'fragment_ttl': settings.NOAA_FRAGMENT_TTL,
+        'snapshot_version': sources_version(snapshot, names)[1],
+    }
+    return render(request, template_name, context)
+
+
+def alert_detail_version(request, kind, alert_id):
+    """Версия страницы события: изменения в базе (алерты, комментарии) и адрес"""
+    changed = content_version(request)
+    return changed, ['alert', kind, alert_id, changed]
+
+
+@conditional_page(alert_detail_version)
+def alert_detail(request, kind, alert_id):
+    """Детальная страница отдельного события (по типизированному идентификатору)"""
+    # Один запрос к нужной таблице и один — за комментариями
+    alert = ALERT_KINDS[kind].objects.prefetch_related('comments').filter(pk=alert_id).first()
+    archived = False
+    
+    if alert:
+        comments = alert.comments.all()
+    else:
+        # Алерт мог быть перенесен в архив по политике хранения
+        archived_alert = find_archived_alert(kind, alert_id)
+        if archived_alert:
+            alert, comments = restore_archived_alert(archived_alert)
+            alert.pk = alert_id
+            archived = True
     
     if alert:
-        # Получаем комментарии для любого типа алерта через GenericForeignKey
-        alert_content_type = ContentType.objects.get_for_model(alert)
-        comments = AlertComment.objects.filter(
-            content_type=alert_content_type,
-            object_id=alert.id
-        ).order_by('-created_at')
-        
         # Создаем контекст с дополнительной информацией
         context = {
             'alert': alert,
-            'alert_type': alert_type,
+            'alert_kind': kind,
+            'alert_type': ALERT_KIND_LABELS[kind],
             'comments': comments,
-            'comments_available': True,  # Теперь комментарии доступны для всех типов
+            'archived': archived,
+            'comments_available': not archived,  # Архивные алерты доступны только для чтения
+            # Продления, продолжения и отмена того же события (один запрос)
+            'event_history': [] if archived else list(event_history(alert)),
             'page_title': f'Событие {alert.message_code}-{alert.serial_number}',
             'breadcrumbs': [
                 {'title': 'NOAA Детально', 'url': 'noaa_detailed'},
@@ -696,45 +584,39 @@ def alert_detail(request, alert_id):
         
         return render(request, 'alert_detail.html', context)
     else:
-        from django.contrib import messages
-        from django.shortcuts import redirect
         messages.error(request, 'Событие не найдено.')
         return redirect('noaa_detailed')
 
 
-def add_comment(request, alert_id):
+def legacy_alert_redirect(request, alert_id):
+    """
+    Совместимость со старыми ссылками /alert/<id>/.
+    
+    Раньше id искался по таблицам по очереди, поэтому выбираем первое
+    совпадение в том же порядке (legacy, T, K, E, A) одним запросом к ленте.
+    """
+    content_types = ContentType.objects.get_for_models(*ALERT_MODELS)
+    kind_by_content_type = {content_types[model].pk: kind for kind, model in ALERT_KINDS.items()}
+    found = set(AlertIndex.objects.filter(object_id=alert_id).values_list('content_type_id', flat=True))
+    for content_type_id, kind in kind_by_content_type.items():
+        if content_type_id in found:
+            return redirect('alert_detail', kind=kind, alert_id=alert_id, permanent=True)
+    
+    archived_kinds = set(ArchivedAlert.objects.filter(original_id=alert_id).values_list('kind', flat=True))
+    for kind in ALERT_KINDS:
+        if kind in archived_kinds:
+            return redirect('alert_detail', kind=kind, alert_id=alert_id, permanent=True)
+    
+    messages.error(request, 'Событие не найдено.')
+    return redirect('noaa_detailed')
+
+
+def add_comment(request, kind, alert_id):
     """Добавление комментария к предупреждению"""
     if request.method == 'POST':
         try:
-            # Находим алерт среди всех типов
-            alert = None
-            alert_type = None
-            
-            # Ищем алерт во всех таблицах
-            try:
-                alert = SpaceWeatherAlert.objects.get(id=alert_id)
-                alert_type = 'Legacy'
-            except SpaceWeatherAlert.DoesNotExist:
-                try:
-                    alert = TypeTRadioAlert.objects.get(id=alert_id)
-                    alert_type = 'T-Radio'
-                except TypeTRadioAlert.DoesNotExist:
-                    try:
-                        alert = TypeKGeomagneticAlert.objects.get(id=alert_id)
-                        alert_type = 'K-Geomagnetic'
-                    except TypeKGeomagneticAlert.DoesNotExist:
-                        try:
-                            alert = TypeEElectronAlert.objects.get(id=alert_id)
-                            alert_type = 'E-Electron'
-                        except TypeEElectronAlert.DoesNotExist:
-                            try:
-                                alert = TypeAForecastAlert.objects.get(id=alert_id)
-                                alert_type = 'A-Forecast'
-                            except TypeAForecastAlert.DoesNotExist:
-                                pass
-            
-            if not alert:
-                from django.contrib import messages
+            model = ALERT_KINDS[kind]
+            if not model.objects.filter(pk=alert_id).exists():
                 messages.error(request, 'Событие не найдено.')
                 return redirect('noaa_detailed')
             
@@ -744,38 +626,31 @@ def add_comment(request, alert_id):
             
             # Валидация
             if not author_name or not content:
-                from django.contrib import messages
                 messages.error(request, 'Пожалуйста, заполните все поля.')
-                return redirect('alert_detail', alert_id=alert_id)
+                return redirect('alert_detail', kind=kind, alert_id=alert_id)
             
             if len(author_name) > 100:
-                from django.contrib import messages
                 messages.error(request, 'Имя не должно превышать 100 символов.')
-                return redirect('alert_detail', alert_id=alert_id)
+                return redirect('alert_detail', kind=kind, alert_id=alert_id)
                 
             if len(content) > 1000:
-                from django.contrib import messages
                 messages.error(request, 'Комментарий не должен превышать 1000 символов.')
-                return redirect('alert_detail', alert_id=alert_id)
+                return redirect('alert_detail', kind=kind, alert_id=alert_id)
             
             # Создаем комментарий с использованием GenericForeignKey
-            alert_content_type = ContentType.objects.get_for_model(alert)
-            comment = AlertComment.objects.create(
-                content_type=alert_content_type,
-                object_id=alert.id,
+            AlertComment.objects.create(
+                content_type=ContentType.objects.get_for_model(model),
+                object_id=alert_id,
                 author_name=author_name,
                 content=content
             )
             
-            from django.contrib import messages
             messages.success(request, 'Комментарий успешно добавлен!')
             
         except Exception as e:
-            from django.contrib import messages
             messages.error(request, f'Ошибка при добавлении комментария: {str(e)}')
     
-    from django.shortcuts import redirect
-    return redirect('alert_detail', alert_id=alert_id)
+    return redirect('alert_detail', kind=kind, alert_id=alert_id)
 
 
 def delete_comment(request, comment_id):
@@ -783,23 +658,21 @@ def delete_comment(request, comment_id):
     if request.method == 'POST':
         try:
             comment = AlertComment.objects.get(id=comment_id)
-            alert_id = comment.alert.id
+            # Адрес алерта строим по content_type, не загружая сам алерт
+            kind = alert_kind(ContentType.objects.get_for_id(comment.content_type_id).model_class())
+            alert_id = comment.object_id
             comment.delete()
             
-            from django.contrib import messages
             messages.success(request, 'Комментарий успешно удален!')
             
-            from django.shortcuts import redirect
-            return redirect('alert_detail', alert_id=alert_id)
+            if kind:
+                return redirect('alert_detail', kind=kind, alert_id=alert_id)
             
         except AlertComment.DoesNotExist:
-            from django.contrib import messages
             messages.error(request, 'Комментарий не найден.')
         except Exception as e:
-            from django.contrib import messages
             messages.error(request, f'Ошибка при удалении комментария: {str(e)}')
     
-    from django.shortcuts import redirect
     return redirect('noaa_detailed')
 
 
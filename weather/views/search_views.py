@@ -0,0 +1,53 @@
+from django.http import JsonResponse
+from django.shortcuts import render
+
+from ..search import search_alerts, search_backend
+
+
+SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+
+def search_limit(request):
+    """Количество результатов из ?limit= (в пределах MAX_SEARCH_LIMIT)"""
+    try:
+        return max(1, min(int(request.GET.get('limit', SEARCH_LIMIT)), MAX_SEARCH_LIMIT))
+    except ValueError:
+        return SEARCH_LIMIT
+
+
+def alert_search(request):
+    """Страница полнотекстового поиска по алертам"""
+    query = request.GET.get('q', '').strip()
+    hits = search_alerts(query, limit=search_limit(request)) if query else []
+    
+    return render(request, 'search.html', {
+        'query': query,
+        'hits': hits,
+        'ranked': search_backend() is not None,
+        'page_title': 'Поиск по алертам',
+    })
+
+
+def alert_search_api(request):
+    """API поиска: ранжированные результаты со сниппетами (HTML с <mark>)"""
+    query = request.GET.get('q', '').strip()
+    hits = search_alerts(query, limit=search_limit(request)) if query else []
+    
+    return JsonResponse({
+        'query': query,
+        'backend': search_backend() or 'icontains',
+        'results': [
+            {
+                'id': f"{hit.entry.kind}-{hit.entry.object_id}",
+                'url': hit.entry.get_absolute_url(),
+                'message_code': hit.entry.message_code,
+                'serial_number': hit.entry.serial_number,
+                'issue_time': hit.entry.issue_time.isoformat(),
+                'title': hit.entry.title,
+                'rank': hit.rank,
+                'snippet': hit.snippet,
+            }
+            for hit in hits
+        ],
+    }, json_dumps_params={'ensure_ascii': False})
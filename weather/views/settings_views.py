@@ -1,18 +1,22 @@
 from django.shortcuts import render, redirect
 from django.http import JsonResponse
 from django.contrib import messages
+from django.core.exceptions import ObjectDoesNotExist
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import user_passes_test
-from django.core.paginator import Paginator
 from django.utils import timezone
-from datetime import datetime
 import asyncio
+import os
 import requests
 from utils.proxy_utils import proxy_manager, make_request_with_proxy
-from utils.translation import translate_space_weather_text
-from ..models import SpaceWeatherAlert, TypeTRadioAlert, TypeKGeomagneticAlert, TypeEElectronAlert, TypeAForecastAlert
-from ..views.noaa_views import parse_alert_message, save_alert_to_db
+from ..models import ALERT_KINDS, AlertIndex, PurgeJob
+from ..alert_filters import ALERT_KIND_LABELS, AlertListParams
+from ..alert_stats import daily_alert_counts, dashboard_stats
+from ..conditional import conditional_page, content_version
+from ..ingest import ALERTS_URL, ingest_alerts_payload
+from ..pagination import KeysetPaginator
+from ..purge import active_purge_job, start_purge_job
 
 
 def check_admin_password(user):
@@ -41,57 +45,17 @@ def admin_alerts_view(request):
             'page_title': 'Доступ к админ-панели'
         })
     
-    # Подсчет алертов во всех таблицах
-    total_alerts = (
-        SpaceWeatherAlert.objects.count() +
-        TypeTRadioAlert.objects.count() +
-        TypeKGeomagneticAlert.objects.count() +
-        TypeEElectronAlert.objects.count() +
-        TypeAForecastAlert.objects.count()
-    )
-    
-    # Активные алерты (с учетом valid_to где применимо)
-    now = timezone.now()
-    active_alerts = (
-        SpaceWeatherAlert.objects.filter(valid_to__gte=now).count() +
-        TypeKGeomagneticAlert.objects.filter(valid_to__gte=now).count()
-    )
+    # Карточки и график читаются из предагрегированной статистики (AlertDailyStat)
+    stats = dashboard_stats()
+    daily_counts = daily_alert_counts()
     
-    # Недавние алерты (за последнюю неделю)
-    week_ago = now - timezone.timedelta(days=7)
-    recent_alerts = (
-        SpaceWeatherAlert.objects.filter(created_at__gte=week_ago).count() +
-        TypeTRadioAlert.objects.filter(created_at__gte=week_ago).count() +
-        TypeKGeomagneticAlert.objects.filter(created_at__gte=week_ago).count() +
-        TypeEElectronAlert.objects.filter(created_at__gte=week_ago).count() +
-        TypeAForecastAlert.objects.filter(created_at__gte=week_ago).count()
+    # Получение ленты алертов из всех таблиц: сортировка и фильтры в SQL, keyset-пагинация
+    list_params = AlertListParams.from_query(request.GET)
+    paginator = KeysetPaginator(
+        list_params.filter(AlertIndex.objects.with_comment_counts()), 20,  # 20 алертов на страницу
+        ordering=list_params.ordering, with_total=True,
     )
-    
-    stats = {
-        'total_alerts': total_alerts,
-        'active_alerts': active_alerts,
-        'recent_alerts': recent_alerts,
-    }
-    
-    # Получение объединенного списка алертов для пагинации
-    from itertools import chain
-    from operator import attrgetter
-    
-    t_alerts = list(TypeTRadioAlert.objects.all())
-    k_alerts = list(TypeKGeomagneticAlert.objects.all()) 
-    e_alerts = list(TypeEElectronAlert.objects.all())
-    a_alerts = list(TypeAForecastAlert.objects.all())
-    old_alerts = list(SpaceWeatherAlert.objects.all())
-    
-    # Объединяем и сортируем по времени
-    all_alerts = list(chain(t_alerts, k_alerts, e_alerts, a_alerts, old_alerts))
-    all_alerts.sort(key=attrgetter('issue_time'), reverse=True)
-    
-    # Пагинация объединенного списка
-    alerts_list = all_alerts
-    paginator = Paginator(alerts_list, 20)  # 20 алертов на страницу
-    page_number = request.GET.get('page')
-    alerts = paginator.get_page(page_number)
+    alerts = paginator.get_page(request.GET.get('cursor'))
     
     if request.method == 'POST':
         action = request.POST.get('action')
@@ -112,36 +76,39 @@ def admin_alerts_view(request):
                 messages.error(request, '❌ Неверный пароль для очистки базы данных!')
                 return redirect('admin_alerts')
             
-            # Подсчитываем и удаляем из всех таблиц
-            deleted_count = (
-                SpaceWeatherAlert.objects.count() +
-                TypeTRadioAlert.objects.count() +
-                TypeKGeomagneticAlert.objects.count() +
-                TypeEElectronAlert.objects.count() +
-                TypeAForecastAlert.objects.count()
-            )
-            
-            SpaceWeatherAlert.objects.all().delete()
-            TypeTRadioAlert.objects.all().delete()
-            TypeKGeomagneticAlert.objects.all().delete()
-            TypeEElectronAlert.objects.all().delete()
-            TypeAForecastAlert.objects.all().delete()
-            
-            messages.success(request, f'🗑️ Удалено {deleted_count} алертов из всех таблиц базы данных.')
+            # Удаление идет пачками в фоне, страница опрашивает прогресс
+            job = start_purge_job()
+            from django.contrib import messages
+            messages.info(request, f'🗑️ Очистка базы данных запущена ({job.total} алертов).')
             return redirect('admin_alerts')
         elif action == 'delete_alert':
             alert_id = request.POST.get('alert_id')
+            model = ALERT_KINDS.get(request.POST.get('alert_kind', 'legacy'))
+            from django.contrib import messages
             try:
-                alert = SpaceWeatherAlert.objects.get(id=alert_id)
+                if model is None:
+                    raise ValueError
+                alert = model.objects.get(id=alert_id)
                 alert.delete()
                 messages.success(request, 'Алерт успешно удален.')
-            except SpaceWeatherAlert.DoesNotExist:
+            except (ValueError, ObjectDoesNotExist):
                 messages.error(request, 'Алерт не найден.')
             return redirect('admin_alerts')
     
+    # Текущая или только что завершенная очистка для индикатора прогресса
+    # (active_purge_job заодно помечает брошенную очистку ошибкой)
+    active_purge_job()
+    purge_job = PurgeJob.objects.first()
+    if purge_job and purge_job.is_finished and purge_job.finished_at < timezone.now() - timezone.timedelta(minutes=5):
+        purge_job = None
+    
     context = {
         'alerts': alerts,
+        'list_params': list_params,
+        'alert_kinds': ALERT_KIND_LABELS,
         'stats': stats,
+        'purge_job': purge_job,
+        'daily_counts': daily_counts,
         'page_title': 'Админ-панель: Управление алертами'
     }
     
@@ -152,120 +119,32 @@ def load_alerts_from_api(request):
     """Загружает алерты из NOAA API"""
     try:
         # Загружаем данные из API
-        response = requests.get('https://services.swpc.noaa.gov/products/alerts.json', timeout=10)
+        response = requests.get(ALERTS_URL, timeout=10)
         response.raise_for_status()
-        alerts_data = response.json()
         
-        loaded_count = 0
-        skipped_count = 0
-        errors = []
+        full = request.POST.get('full_reload') == 'on'
+        result = ingest_alerts_payload(response.content, full=full)
+        if result.unchanged:
+            messages.info(request, 'ℹ️ Данные NOAA не изменились с последней загрузки.')
+            return redirect('admin_alerts')
         
-        for alert_data in alerts_data:
-            try:
-                message = alert_data.get('message', '')
-                if message:
-                    parsed_data = parse_alert_message(alert_data)  # Передаем весь объект, а не только message
-                    if parsed_data:
-                        # Добавляем данные из API (issue_datetime)
-                        if 'issue_datetime' in alert_data:
-                            try:
-                                # Парсим timestamp из API
-                                issue_dt = datetime.strptime(alert_data['issue_datetime'], '%Y-%m-%d %H:%M:%S.%f')
-                                parsed_data['issue_time_from_api'] = timezone.make_aware(issue_dt, timezone.utc)
-                            except:
-                                pass
-                        
-                        # Проверяем, существует ли уже такой алерт во всех таблицах
-                        message_code = parsed_data.get('message_code', '')
-                        serial_number = parsed_data.get('serial_number', '')
-                        
-                        existing_alert = (
-                            SpaceWeatherAlert.objects.filter(message_code=message_code, serial_number=serial_number).exists() or
-                            TypeTRadioAlert.objects.filter(message_code=message_code, serial_number=serial_number).exists() or
-                            TypeKGeomagneticAlert.objects.filter(message_code=message_code, serial_number=serial_number).exists() or
-                            TypeEElectronAlert.objects.filter(message_code=message_code, serial_number=serial_number).exists() or
-                            TypeAForecastAlert.objects.filter(message_code=message_code, serial_number=serial_number).exists()
-                        )
-                        
-                        if existing_alert:
-                            skipped_count += 1
-                            continue
-                        
-                        # Перевод будет выполнен автоматически в save_alert_to_db
-                        
-                        # Сохраняем в базу (только новые)
-                        saved_alert = save_alert_to_db(parsed_data)
-                        if saved_alert:
-                            loaded_count += 1
-                    else:
-                        # Если парсинг не удался, сохраняем как есть с минимальными данными
-                        try:
-                            # Используем базовую информацию из API
-                            product_id = alert_data.get('product_id', 'UNKNOWN')
-                            issue_datetime = alert_data.get('issue_datetime', '')
-                            
-                            # Парсим время
-                            issue_time = timezone.now()
-                            if issue_datetime:
-                                try:
-                                    issue_time = datetime.strptime(issue_datetime, '%Y-%m-%d %H:%M:%S.%f')
-                                    issue_time = timezone.make_aware(issue_time, timezone.utc)
-                                except:
-                                    pass
-                            
-                            # Создаем уникальный код на основе product_id и времени
-                            message_code = product_id
-                            serial_number = str(int(issue_time.timestamp()))
-                            
-                            # Проверяем дубликат во всех таблицах
-                            existing = (
-                                SpaceWeatherAlert.objects.filter(message_code=message_code, serial_number=serial_number).exists() or
-                                TypeTRadioAlert.objects.filter(message_code=message_code, serial_number=serial_number).exists() or
-                                TypeKGeomagneticAlert.objects.filter(message_code=message_code, serial_number=serial_number).exists() or
-                                TypeEElectronAlert.objects.filter(message_code=message_code, serial_number=serial_number).exists() or
-                                TypeAForecastAlert.objects.filter(message_code=message_code, serial_number=serial_number).exists()
-                            )
-                            
-                            if existing:
-                                skipped_count += 1
-                                continue
-                            
-                            # Переводим сообщение для warning_type
-                            translated_message = translate_space_weather_text(message[:200] + '...' if len(message) > 200 else message)
-                            
-                            # Создаем алерт
-                            alert = SpaceWeatherAlert.objects.create(
-                                message_code=message_code,
-                                serial_number=serial_number,
-                                issue_time=issue_time,
-                                warning_type=translated_message,
-                                full_message=message,
-                                warning_condition='API Import',
-                                noaa_scale='Неизвестно',
-                                potential_impacts='Требует ручного анализа',
-                            )
-                            
-                            if alert:
-                                loaded_count += 1
-                                
-                        except Exception as e2:
-                            errors.append(f"Ошибка создания базового алерта: {str(e2)}")
-                else:
-                    errors.append("Пустое сообщение в алерте")
-                    
-            except Exception as e:
-                errors.append(f"Ошибка обработки алерта: {str(e)}")
+        loaded_count = result.loaded
+        skipped_count = result.skipped
+        errors = result.errors
         
         # Формируем сообщения
-        total_processed = len(alerts_data)
+        total_processed = result.total
         
         if loaded_count > 0:
             messages.success(request, f'✅ Успешно загружено {loaded_count} новых алертов из NOAA API.')
         
         if skipped_count > 0:
             messages.info(request, f'ℹ️ Пропущено {skipped_count} алертов (уже существуют в базе).')
+        
+        if result.below_watermark > 0:
+            messages.info(request, f'ℹ️ Пропущено {result.below_watermark} алертов старше последней загрузки.')
             
-        if loaded_count == 0 and skipped_count == 0 and total_processed > 0:
+        if loaded_count == 0 and skipped_count == 0 and result.below_watermark == 0 and total_processed > 0:
             messages.warning(request, f'⚠️ Обработано {total_processed} алертов из API, но новых не найдено.')
         elif total_processed == 0:
             messages.warning(request, '⚠️ API не вернул никаких алертов.')
@@ -288,6 +167,17 @@ def load_alerts_from_api(request):
     return redirect('admin_alerts')
 
 
+def settings_version(request):
+    """Версия страницы настроек: изменения в базе, статус прокси и файл списка прокси"""
+    changed = content_version(request)
+    try:
+        proxy_list_mtime = os.path.getmtime(proxy_manager.proxy_file)
+    except OSError:
+        proxy_list_mtime = None
+    return changed, ['settings', changed, proxy_manager.get_proxy_status(), proxy_list_mtime]
+
+
+@conditional_page(settings_version)
 def settings_view(request):
     """Страница настроек приложения"""
     if request.method == 'POST':
@@ -310,19 +200,7 @@ def settings_view(request):
     proxy_count = len(proxy_list)
     
     # Получение последних алертов из всех таблиц
-    from itertools import chain
-    from operator import attrgetter
-    
-    t_alerts = list(TypeTRadioAlert.objects.all()[:5])
-    k_alerts = list(TypeKGeomagneticAlert.objects.all()[:5]) 
-    e_alerts = list(TypeEElectronAlert.objects.all()[:5])
-    a_alerts = list(TypeAForecastAlert.objects.all()[:5])
-    old_alerts = list(SpaceWeatherAlert.objects.all()[:5])
-    
-    # Объединяем и сортируем по времени
-    all_alerts = list(chain(t_alerts, k_alerts, e_alerts, a_alerts, old_alerts))
-    all_alerts.sort(key=attrgetter('issue_time'), reverse=True)
-    recent_alerts = all_alerts[:10]
+    recent_alerts = list(AlertIndex.objects.with_comment_counts()[:10])
     
     context = {
         'title': 'Настройки',
@@ -363,6 +241,30 @@ def test_connection(request):
     })
 
 
+def purge_status_api(request, job_id):
+    """API прогресса очистки базы (опрашивается админ-панелью)"""
+    if not request.session.get('admin_authenticated', False):
+        return JsonResponse({'error': 'Доступ запрещен'}, status=403)
+    
+    active_purge_job()
+    job = PurgeJob.objects.filter(pk=job_id).first()
+    if job is None:
+        return JsonResponse({'error': 'Очистка не найдена'}, status=404)
+    
+    return JsonResponse({
+        'id': job.pk,
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'total': job.total,
+        'deleted': job.deleted,
+        'comments_deleted': job.comments_deleted,
+        'current_kind': job.current_kind,
+        'percent': job.percent,
+        'finished': job.is_finished,
+        'error': job.error,
+    })
+
+
 def proxy_status_api(request):
     """API для получения статуса прокси"""
     proxy_enabled = proxy_manager.get_proxy_status()